@@ -1,5 +1,5 @@
 from django.contrib import admin
-from apps.common.models import VersionHistory
+from apps.common.models import VersionHistory, TelegramOutbox, TransactionIndex, TransactionRollup
 
 
 @admin.register(VersionHistory)
@@ -8,4 +8,28 @@ class VersionHistoryAdmin(admin.ModelAdmin):
     list_display_links = ("id", "version")
     list_filter = ("required",)
     search_fields = ("version",)
-    readonly_fields = ("created_at", "updated_at")
\ No newline at end of file
+    readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(TelegramOutbox)
+class TelegramOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "chat_id", "status", "attempts", "created_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("text",)
+    readonly_fields = ("created_at", "updated_at", "sent_at", "last_error")
+
+
+@admin.register(TransactionIndex)
+class TransactionIndexAdmin(admin.ModelAdmin):
+    list_display = ("id", "unique_id", "section", "kind", "direction", "status", "amount", "currency_type", "date")
+    list_display_links = ("id", "unique_id")
+    list_filter = ("section", "kind", "status")
+    search_fields = ("unique_id", "description")
+    readonly_fields = [field.name for field in TransactionIndex._meta.fields]
+
+
+@admin.register(TransactionRollup)
+class TransactionRollupAdmin(admin.ModelAdmin):
+    list_display = ("id", "period", "date", "section", "source", "direction", "currency_type", "count", "amount")
+    list_filter = ("period", "section", "source", "direction")
+    readonly_fields = [field.name for field in TransactionRollup._meta.fields]
@@ -0,0 +1,14 @@
+from drf_yasg.inspectors import FilterInspector, NotHandled
+
+from apps.common.filters import DateRangeFilterBackend
+
+
+class DateRangeFilterInspector(FilterInspector):
+    """
+    SWAGGER_SETTINGS["DEFAULT_FILTER_INSPECTORS"] da: start_date/end_date parametrlari
+    DateRangeFilterBackend li har bir list view ga avtomatik qo'shiladi.
+    """
+    def get_filter_parameters(self, filter_backend):
+        if isinstance(filter_backend, DateRangeFilterBackend):
+            return filter_backend.swagger_parameters()
+        return NotHandled
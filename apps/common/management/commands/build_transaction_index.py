@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.common.services import transaction_index
+
+
+class Command(BaseCommand):
+    help = "TransactionIndex jadvalini manba modellardan qayta to'ldiradi (qayta ishga tushirish xavfsiz)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        counts = transaction_index.rebuild(chunk_size=options["chunk_size"])
+        for label, count in counts.items():
+            self.stdout.write(f"{label}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Indexed: {sum(counts.values())}"))
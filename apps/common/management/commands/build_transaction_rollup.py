@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.common.services import rollup
+
+
+class Command(BaseCommand):
+    help = "TransactionRollup jadvalini TransactionIndex dan qayta hisoblaydi (qayta ishga tushirish xavfsiz)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        counts = rollup.rebuild(batch_size=options["batch_size"])
+        for period, count in counts.items():
+            self.stdout.write(f"{period}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Rollup rows: {sum(counts.values())}"))
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0004_telegramoutbox'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unique_id', models.CharField(max_length=30, unique=True)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('section', models.CharField(blank=True, choices=[('logistic', 'Logistika'), ('fridge', 'Muzlatgich'), ('garden', "Bog'"), ('factory', 'Zavod'), ('general', 'Umumiy')], max_length=30, null=True)),
+                ('kind', models.CharField(max_length=30)),
+                ('direction', models.CharField(choices=[('income', 'Kirim'), ('outcome', 'Chiqim')], max_length=10)),
+                ('status', models.CharField(blank=True, choices=[('new', 'Yangi'), ('verified', 'Tasdiqlangan'), ('canceled', 'Bekor qilingan')], max_length=20, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('date', models.DateField()),
+                ('amount', models.FloatField()),
+                ('currency_type', models.CharField(choices=[('USD', 'USD🇺🇸'), ('UZS', 'UZS🇺🇿'), ('RUB', 'RUB🇷🇺')], max_length=20)),
+                ('amount_uzs', models.FloatField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('creator', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tranzaksiya ',
+                'verbose_name_plural': 'Tranzaksiyalar ',
+                'ordering': ['-date', '-created_at'],
+                'indexes': [models.Index(fields=['creator', 'date'], name='common_tran_creator_15cc41_idx'), models.Index(fields=['section', 'date'], name='common_tran_section_600904_idx'), models.Index(fields=['status', 'created_at'], name='common_tran_status_b8c642_idx'), models.Index(fields=['content_type', 'object_id'], name='common_tran_content_e08749_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.5 on 2026-10-18 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0005_transactionindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Kun'), ('month', 'Oy')], max_length=10)),
+                ('date', models.DateField()),
+                ('section', models.CharField(blank=True, choices=[('logistic', 'Logistika'), ('fridge', 'Muzlatgich'), ('garden', "Bog'"), ('factory', 'Zavod'), ('general', 'Umumiy')], default='', max_length=30)),
+                ('source', models.CharField(max_length=30)),
+                ('direction', models.CharField(choices=[('income', 'Kirim'), ('outcome', 'Chiqim')], max_length=10)),
+                ('currency_type', models.CharField(choices=[('USD', 'USD🇺🇸'), ('UZS', 'UZS🇺🇿'), ('RUB', 'RUB🇷🇺')], max_length=20)),
+                ('creator_id', models.PositiveBigIntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('amount', models.FloatField(default=0)),
+                ('amount_uzs', models.FloatField(default=0)),
+            ],
+            options={
+                'verbose_name': "Tranzaksiya yig'indisi ",
+                'verbose_name_plural': "Tranzaksiya yig'indilari ",
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['period', 'section', 'date'], name='common_tran_period_9507a4_idx'), models.Index(fields=['period', 'creator_id', 'date'], name='common_tran_period_b3cbda_idx')],
+                'constraints': [models.UniqueConstraint(fields=('period', 'date', 'section', 'source', 'direction', 'currency_type', 'creator_id'), name='unique_transaction_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.5 on 2026-10-18 12:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0006_transactionrollup'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transactionindex',
+            index=models.Index(condition=models.Q(('status', 'new')), fields=['created_at', 'id'], name='transaction_index_pending'),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.core.cache import cache
+from django.contrib.contenttypes.models import ContentType
 from django.db import models, transaction
 
 from apps.users.models import User
@@ -36,6 +36,22 @@ STATUS_CHOICES = (
     ('canceled', 'Bekor qilingan')
 )
 
+TRANSACTION_DIRECTION_CHOICES = (
+    ('income', 'Kirim'),
+    ('outcome', 'Chiqim')
+)
+
+ROLLUP_PERIOD_CHOICES = (
+    ('day', 'Kun'),
+    ('month', 'Oy')
+)
+
+OUTBOX_STATUS_CHOICES = (
+    ('pending', 'Kutilmoqda'),
+    ('sent', 'Yuborilgan'),
+    ('failed', 'Yuborilmadi')
+)
+
 class BaseModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated at")
@@ -68,12 +84,13 @@ class CurrencyRate(BaseModel):
 
 
     def save(self, *args, **kwargs):
+        from apps.common.utils import publish_rates, rates_version
+
         with transaction.atomic():
+            edited = self.pk is not None
             super().save(*args, **kwargs)
-
-            cache.set("UZS_rate", self.usd)
-            cache.set("RUB_rate", round(self.usd / self.rub, 2))
-            print(cache.get("RUB_rate"))
+            version, usd, rub = rates_version(self, edited), self.usd, self.usd / self.rub
+            transaction.on_commit(lambda: publish_rates(version, usd, rub))
 
 
 class BasePerson(BaseModel):
@@ -121,3 +138,105 @@ class VersionHistory(BaseModel):
 
     def __str__(self):
         return self.version
+
+
+class TelegramOutbox(BaseModel):
+    """
+    Telegramga yuboriladigan xabarlar navbati. Xabar tranzaksiya ichida yoziladi
+    va commitdan keyin Celery worker tomonidan yuboriladi.
+    """
+    chat_id = models.CharField(max_length=64)
+    text = models.TextField()
+    app_url = models.CharField(max_length=255, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=OUTBOX_STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    creator = None
+
+    class Meta:
+        verbose_name = "Telegram xabari "
+        verbose_name_plural = "Telegram xabarlari "
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.chat_id} | {self.status} | {self.created_at}"
+
+
+class TransactionIndex(models.Model):
+    """
+    Barcha pul harakatlari bitta jadvalda: tarix, tasdiqlash va hisobotlar uchun.
+    Manba modelning save()/delete() ida yangilanadi, build_transaction_index bilan qayta quriladi.
+    """
+    unique_id = models.CharField(max_length=30, unique=True)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    section = models.CharField(max_length=30, choices=SECTION_CHOICES, null=True, blank=True)
+    kind = models.CharField(max_length=30)
+    direction = models.CharField(max_length=10, choices=TRANSACTION_DIRECTION_CHOICES)
+    creator = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, null=True, blank=True)
+    description = models.TextField(null=True, blank=True)
+    date = models.DateField()
+    amount = models.FloatField()
+    currency_type = models.CharField(max_length=20, choices=CURRENCY_TYPE)
+    amount_uzs = models.FloatField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Tranzaksiya "
+        verbose_name_plural = "Tranzaksiyalar "
+        ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['creator', 'date']),
+            models.Index(fields=['section', 'date']),
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['content_type', 'object_id']),
+            # Tasdiq navbati: faqat status='new' qatorlar, (created_at, id) kamayish tartibida o'qiladi
+            models.Index(fields=['created_at', 'id'], condition=models.Q(status='new'),
+                         name='transaction_index_pending'),
+        ]
+
+    def __str__(self):
+        return self.unique_id
+
+
+class TransactionRollup(models.Model):
+    """
+    TransactionIndex ning (davr, sana, bo'lim, manba, yo'nalish, valyuta, yaratuvchi) bo'yicha yig'indisi.
+    transaction_index.index()/remove() da farq bilan yangilanadi, build_transaction_rollup bilan qayta quriladi.
+    """
+    period = models.CharField(max_length=10, choices=ROLLUP_PERIOD_CHOICES)
+    # kun yoki oyning birinchi kuni
+    date = models.DateField()
+    section = models.CharField(max_length=30, choices=SECTION_CHOICES, blank=True, default="")
+    source = models.CharField(max_length=30)
+    direction = models.CharField(max_length=10, choices=TRANSACTION_DIRECTION_CHOICES)
+    currency_type = models.CharField(max_length=20, choices=CURRENCY_TYPE)
+    # 0 - yaratuvchisiz, unique constraint NULL bilan ishlamagani uchun FK emas
+    creator_id = models.PositiveBigIntegerField(default=0)
+    count = models.IntegerField(default=0)
+    amount = models.FloatField(default=0)
+    amount_uzs = models.FloatField(default=0)
+
+    class Meta:
+        verbose_name = "Tranzaksiya yig'indisi "
+        verbose_name_plural = "Tranzaksiya yig'indilari "
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['period', 'date', 'section', 'source', 'direction', 'currency_type', 'creator_id'],
+                name='unique_transaction_rollup',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'section', 'date']),
+            models.Index(fields=['period', 'creator_id', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.period}:{self.date} {self.section} {self.source} {self.amount} {self.currency_type}"
@@ -0,0 +1,169 @@
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from apps.common.utils import decode_cursor, encode_cursor
+
+CURSOR = "cursor"
+OFFSET = "offset"
+EXACT = "exact"
+APPROX = "approx"
+NONE = "none"
+
+
+def estimate_count(queryset):
+    """
+    PostgreSQL da planner bahosi (EXPLAIN, jadval o'qilmaydi), boshqa bazalarda aniq COUNT(*).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    # Drayverga qarab [{"Plan": ...}] yoki {"Plan": ...} qaytadi
+    if isinstance(plan, list):
+        plan = plan[0]
+    return int(plan["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """
+    Standart holatda LimitOffsetPagination. View da keyset_field (masalan "-created_at" yoki "-date")
+    berilgan bo'lsa ?pagination=cursor yoki ?cursor= bilan (maydon, id) bo'yicha keyset rejimiga o'tadi:
+    OFFSET yo'q, har bir sahifa birinchisi kabi indeks bo'yicha o'qiladi, tartib keyset_field ga qat'iy.
+    View da pagination_mode = "cursor" bo'lsa keyset standart bo'ladi (?pagination=offset bilan qaytariladi).
+
+    ?count=exact|approx|none - jami son: aniq COUNT(*), planner bahosi yoki umuman hisoblanmaydi.
+    Standart: offset rejimida exact (none bu rejimda yo'q), cursor rejimida none.
+    """
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor."
+
+    def get_mode(self, request, view):
+        if not getattr(view, "keyset_field", None):
+            return OFFSET
+        if request.query_params.get(self.cursor_query_param):
+            return CURSOR
+        mode = request.query_params.get(self.mode_query_param) or getattr(view, "pagination_mode", OFFSET)
+        return CURSOR if mode == CURSOR else OFFSET
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param)
+        if self.mode == OFFSET:
+            # Offset rejimida keyingi sahifa havolasi uchun son baribir kerak
+            return APPROX if mode == APPROX else EXACT
+        return mode if mode in (EXACT, APPROX) else NONE
+
+    def get_count(self, queryset):
+        if self.count_mode == APPROX:
+            return estimate_count(queryset)
+        return super().get_count(queryset)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.mode = self.get_mode(request, view)
+        self.count_mode = self.get_count_mode(request)
+        if self.mode == OFFSET:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = 0
+        field = view.keyset_field.lstrip("-")
+        descending = view.keyset_field.startswith("-")
+        self.count = None if self.count_mode == NONE else self.get_count(queryset)
+
+        # NULL qiymatlar ikkala yo'nalishda ham oxirida
+        key = F(field).desc(nulls_last=True) if descending else F(field).asc(nulls_last=True)
+        queryset = queryset.order_by(key, "-pk" if descending else "pk")
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.after(queryset.model, field, descending, cursor))
+
+        rows = list(queryset[:self.limit + 1])
+        self.next_cursor = None
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            last = rows[-1]
+            value = getattr(last, field)
+            self.next_cursor = encode_cursor(value.isoformat() if value is not None else None, last.pk)
+        return rows
+
+    def after(self, model, field, descending, cursor):
+        """
+        Cursor dagi (qiymat, id) dan keyingi qatorlar sharti, tartib bilan bir xil.
+        """
+        try:
+            value, pk = decode_cursor(cursor)
+            pk = model._meta.pk.to_python(pk)
+            if value is not None:
+                value = model._meta.get_field(field).to_python(value)
+        except (ValueError, TypeError, DjangoValidationError):
+            raise ValidationError({self.cursor_query_param: self.invalid_cursor_message})
+
+        lookup = "lt" if descending else "gt"
+        if value is None:
+            return Q(**{f"{field}__isnull": True, f"pk__{lookup}": pk})
+        return (Q(**{f"{field}__{lookup}": value}) | Q(**{field: value, f"pk__{lookup}": pk})
+                | Q(**{f"{field}__isnull": True}))
+
+    def get_next_link(self):
+        if self.mode == OFFSET:
+            return super().get_next_link()
+        if self.next_cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        if self.mode == OFFSET:
+            return super().get_paginated_response(data)
+        return Response({
+            "count": self.count,
+            "next": self.get_next_link(),
+            "next_cursor": self.next_cursor,
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count"]["nullable"] = True
+        response_schema["properties"]["next_cursor"] = {
+            "type": "string",
+            "nullable": True,
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            "name": self.count_query_param,
+            "required": False,
+            "in": "query",
+            "description": "Jami son: exact (COUNT(*)), approx (planner bahosi) yoki none (faqat cursor rejimida)",
+            "schema": {"type": "string", "enum": [EXACT, APPROX, NONE]},
+        })
+        if getattr(view, "keyset_field", None):
+            parameters += [
+                {
+                    "name": self.mode_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": f"Sahifalash rejimi, cursor - ({view.keyset_field.lstrip('-')}, id) bo'yicha keyset",
+                    "schema": {"type": "string", "enum": [OFFSET, CURSOR]},
+                },
+                {
+                    "name": self.cursor_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": "Oldingi javobdagi next_cursor",
+                    "schema": {"type": "string"},
+                },
+            ]
+        return parameters
@@ -0,0 +1,79 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from apps.common.models import TransactionIndex, SECTION_CHOICES
+
+# Admin kiritib, CEO tasdig'ini kutadigan tranzaksiyalar turlari (TransactionIndex.kind)
+KINDS = (
+    "raw_material", "worker_salary", "sale", "gardener_salary", "car_expense", "driver_salary", "expense", "income",
+)
+# Bo'limsiz yozuvlar "" ostida sanaladi
+SECTIONS = tuple(section for section, _ in SECTION_CHOICES) + ("",)
+COUNT_KEY = "approval_queue:count:{}"
+
+
+def pending():
+    return TransactionIndex.objects.filter(creator__role="admin", status="new", kind__in=KINDS)
+
+
+def _is_pending(entry):
+    return (entry is not None and entry.status == "new" and entry.kind in KINDS
+            and entry.creator_id is not None and entry.creator.role == "admin")
+
+
+def apply(old=None, new=None):
+    """
+    TransactionIndex qatori o'zgarganda bo'lim hisoblagichlarini farq bilan yangilaydi.
+    old/new da creator oldindan yuklangan bo'lishi kerak (select_related).
+    """
+    changes = defaultdict(int)
+    if _is_pending(old):
+        changes[old.section or ""] -= 1
+    if _is_pending(new):
+        changes[new.section or ""] += 1
+    adjust({section: delta for section, delta in changes.items() if delta})
+
+
+def adjust(changes):
+    """
+    {bo'lim: farq} ni commitdan keyin keshdagi hisoblagichlarga qo'shadi.
+    """
+    if changes:
+        transaction.on_commit(lambda: _incr(changes))
+
+
+def _incr(changes):
+    for section, delta in changes.items():
+        try:
+            cache.incr(COUNT_KEY.format(section), delta)
+        except ValueError:
+            # Hisoblagich keshda yo'q: keyingi counts() bazadan qayta hisoblaydi
+            pass
+
+
+def counts():
+    """
+    Bo'limlar bo'yicha tasdiq kutayotganlar soni. Odatda keshdan (bitta get_many), kesh bo'sh
+    bo'lsa bitta GROUP BY bilan qayta hisoblanadi. Parallel yozuvlardagi kichik farqlar
+    APPROVAL_COUNTS_TIMEOUT o'tgach qayta hisoblashda to'g'rilanadi.
+    """
+    keys = {section: COUNT_KEY.format(section) for section in SECTIONS}
+    cached = cache.get_many(list(keys.values()))
+    if len(cached) == len(keys):
+        return {section: cached[key] for section, key in keys.items()}
+
+    values = dict.fromkeys(SECTIONS, 0)
+    for section, total in pending().order_by().values_list("section").annotate(total=Count("id")):
+        if (section or "") in values:
+            values[section or ""] += total
+    cache.set_many({keys[section]: value for section, value in values.items()},
+                   timeout=settings.APPROVAL_COUNTS_TIMEOUT)
+    return values
+
+
+def reset():
+    cache.delete_many([COUNT_KEY.format(section) for section in SECTIONS])
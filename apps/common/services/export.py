@@ -0,0 +1,107 @@
+import csv
+import tempfile
+from datetime import datetime
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+FORMATS = ("csv", "xlsx")
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+# Excel varag'idagi qatorlar chegarasi (sarlavha bilan), oshsa keyingi varaqqa o'tiladi
+XLSX_SHEET_ROWS = 1048576
+
+
+class ExportUnavailable(Exception):
+    pass
+
+
+class _Echo:
+    # csv.writer yozgan qatorni saqlamasdan qaytaradi
+    def write(self, value):
+        return value
+
+
+def _cell(row, key):
+    value = key(row) if callable(key) else row.get(key)
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        # openpyxl vaqt zonali sanalarni qabul qilmaydi
+        value = timezone.localtime(value).replace(tzinfo=None, microsecond=0)
+    return value
+
+
+def csv_lines(columns, rows):
+    """
+    Qatorlarni bittalab CSV satrlariga aylantiradi, xotirada faqat joriy qator turadi.
+    Excel kirill harflarini to'g'ri ochishi uchun boshida BOM.
+    """
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow([header for header, _ in columns])
+    for row in rows:
+        yield writer.writerow([_cell(row, key) for _, key in columns])
+
+
+def write_xlsx(columns, rows, target):
+    """
+    openpyxl write-only workbook: qatorlar diskdagi vaqtinchalik faylga yoziladi, xotira o'smaydi.
+    """
+    if openpyxl is None:
+        raise ExportUnavailable("xlsx eksport uchun openpyxl o'rnatilmagan, csv dan foydalaning.")
+
+    headers = [header for header, _ in columns]
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet, written = None, XLSX_SHEET_ROWS
+    for row in rows:
+        if written >= XLSX_SHEET_ROWS:
+            sheet = workbook.create_sheet()
+            sheet.append(headers)
+            written = 1
+        sheet.append([_cell(row, key) for _, key in columns])
+        written += 1
+    if sheet is None:
+        workbook.create_sheet().append(headers)
+    workbook.save(target)
+
+
+def filename(name, file_format):
+    return f"{name}-{timezone.localdate():%Y%m%d}.{file_format}"
+
+
+def response(name, file_format, columns, rows):
+    """
+    CSV StreamingHttpResponse bilan qatorma-qator yuboriladi; xlsx vaqtinchalik faylga
+    yozilib FileResponse bilan bo'laklab o'qiladi (yopilganda fayl o'chadi).
+    """
+    if file_format == "csv":
+        result = StreamingHttpResponse(csv_lines(columns, rows), content_type=CONTENT_TYPES["csv"])
+        result["Content-Disposition"] = f'attachment; filename="{filename(name, file_format)}"'
+        return result
+
+    handle = tempfile.TemporaryFile()
+    write_xlsx(columns, rows, handle)
+    handle.seek(0)
+    return FileResponse(handle, as_attachment=True, filename=filename(name, file_format),
+                        content_type=CONTENT_TYPES["xlsx"])
+
+
+def save(path, file_format, columns, rows):
+    """
+    Eksportni default_storage ga yozadi (Celery task uchun). Qaytaradi: saqlangan fayl yo'li.
+    """
+    with tempfile.TemporaryFile() as handle:
+        if file_format == "csv":
+            for line in csv_lines(columns, rows):
+                handle.write(line.encode("utf-8"))
+        else:
+            write_xlsx(columns, rows, handle)
+        handle.seek(0)
+        return default_storage.save(path, File(handle))
@@ -0,0 +1,210 @@
+import asyncio
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) soniyalarda
+DEFAULT_TIMEOUT = (3.05, 15)
+# 429 bu yerda retry qilinmaydi: Telegram outbox retry_after bo'yicha o'zi qayta rejalashtiradi
+RETRY_STATUSES = (502, 503, 504)
+# Status bo'yicha faqat shu metodlar qayta yuboriladi: 5xx javobdan oldin POST upstreamda bajarilgan bo'lishi mumkin
+IDEMPOTENT_METHODS = Retry.DEFAULT_ALLOWED_METHODS
+
+
+class CircuitOpenError(requests.RequestException):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Host bo'yicha ketma-ket xatoliklar soni chegaradan oshsa, reset_timeout davomida
+    so'rovlar yuborilmaydi, keyin bitta sinov so'roviga ruxsat beriladi.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # half-open: bitta so'rov o'tadi, xato bo'lsa yana ochiladi
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class HttpClient:
+    """
+    Tashqi servislar uchun umumiy HTTP klient: keep-alive connection pool,
+    connect/read timeout, backoff bilan retry va host bo'yicha circuit breaker.
+    Session har bir jarayon (fork) uchun alohida yaratiladi.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries=3, backoff_factor=0.5, pool_maxsize=10,
+                 failure_threshold=5, reset_timeout=30):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_maxsize = pool_maxsize
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._session = None
+        self._pid = None
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    self._session = self._build_session()
+                    self._pid = os.getpid()
+        return self._session
+
+    def _build_session(self):
+        # POST ikki marta ketmasligi uchun read xatoliklari retry qilinmaydi, status retry faqat idempotent metodlarga
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=0,
+            status=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=IDEMPOTENT_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=self.pool_maxsize, pool_maxsize=self.pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def breaker(self, url):
+        host = urlsplit(url).netloc
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers.setdefault(host, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+        return breaker
+
+    def request(self, method, url, **kwargs):
+        breaker = self.breaker(url)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit is open for {urlsplit(url).netloc}")
+
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+class AsyncHttpClient:
+    """
+    HttpClient ning asyncio varianti (aiohttp). Session birinchi so'rovda joriy event loop ichida yaratiladi.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries=3, backoff_factor=0.5, pool_maxsize=10,
+                 failure_threshold=5, reset_timeout=30):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_maxsize = pool_maxsize
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._session = None
+        self._breakers = {}
+
+    async def session(self):
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            connect, read = self.timeout
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_maxsize),
+                timeout=aiohttp.ClientTimeout(connect=connect, sock_read=read),
+            )
+        return self._session
+
+    def breaker(self, url):
+        host = urlsplit(url).netloc
+        return self._breakers.setdefault(host, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+
+    async def request(self, method, url, **kwargs):
+        """
+        Javob tanasini o'qib (status, matn) qaytaradi, shunda connection darhol poolga qaytadi.
+        """
+        import aiohttp
+
+        breaker = self.breaker(url)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit is open for {urlsplit(url).netloc}")
+
+        session = await self.session()
+        for attempt in range(self.retries + 1):
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    body = await response.text()
+                    if (response.status in RETRY_STATUSES and method.upper() in IDEMPOTENT_METHODS
+                            and attempt < self.retries):
+                        await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+                        continue
+            except aiohttp.ClientConnectorError:
+                # Faqat ulanish xatosi: so'rov yuborilmagan. Read timeout (ServerTimeoutError) retry qilinmaydi
+                if attempt < self.retries:
+                    await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+                    continue
+                breaker.record_failure()
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                breaker.record_failure()
+                raise
+
+            if response.status >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return response.status, body
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+http_client = HttpClient()
@@ -1,8 +1,19 @@
+import logging
+import threading
 import traceback
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import transaction
 
 from apps.common.services.telegram import TelegramService
 from core.settings.base import env
 
+TELEGRAM_MESSAGE_LIMIT = 4096
+DIGEST_SEPARATOR = "\n\n"
+
+logger = logging.getLogger(__name__)
+
 
 class LoggingException(Exception):
     def __init__(self, message, extra_kwargs: dict = None):
@@ -11,32 +22,103 @@ class LoggingException(Exception):
         super().__init__(self.message)
 
 
+def build_digests(items, limit=TELEGRAM_MESSAGE_LIMIT):
+    """
+    (id, matn, app_url) qatorlarini ketma-ketligi saqlangan holda limit dan oshmaydigan
+    digestlarga birlashtiradi. Qaytaradi: [(matn, app_url, [id, ...]), ...]
+    """
+    digests = []
+    for item_id, text, app_url in items:
+        parts = [text[i:i + limit] for i in range(0, len(text), limit)] or [""]
+        for part in parts:
+            if digests:
+                digest_text, digest_url, digest_ids = digests[-1]
+                if digest_url == app_url and len(digest_text) + len(DIGEST_SEPARATOR) + len(part) <= limit:
+                    digests[-1] = (digest_text + DIGEST_SEPARATOR + part, digest_url, digest_ids)
+                    if item_id not in digest_ids:
+                        digest_ids.append(item_id)
+                    continue
+            digests.append((part, app_url, [item_id]))
+    return digests
+
+
 class TelegramLogging:
     def __init__(self):
         self.bot_token = env.str('TELEGRAM_BOT_TOKEN')
         self.chat_id = env.str("TELEGRAM_GROUP_ID")
         self.app_url = env.str("APP_URL")
+        self.api_url = env.str("TELEGRAM_API_URL", "https://api.telegram.org")
+        # Shu oyna ichida yozilgan xabarlar bitta digest qilib yuboriladi
+        self.digest_window = env.int("TELEGRAM_DIGEST_WINDOW", 2)
 
-        self.telegram_service = TelegramService(bot_token=self.bot_token)
+        self.telegram_service = TelegramService(bot_token=self.bot_token, api_url=self.api_url)
+        self._local = threading.local()
 
     def send_log(self, message, app_button=False):
-        # Send the exception details to the admin
-        # extra = getattr(exception, "extra_kwargs", None)
+        app_url = self.app_url if app_button else None
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is not None:
+            buffer.append((None, message, app_url))
+            return
+        self._write_outbox(message, app_url)
+
+    @contextmanager
+    def batch(self):
+        """
+        Buferlash rejimi: blok ichidagi send_log xabarlari yig'iladi va blok tugagach
+        4096 belgidan oshmaydigan digestlar sifatida outboxga yoziladi.
+        """
+        if getattr(self._local, "buffer", None) is not None:
+            yield
+            return
 
+        self._local.buffer = []
         try:
-            # tb_list = traceback.format_exception(None, exception)
-            # tb_string = "".join(tb_list)
-            # msg = "<b>ERROR | Kindergarten MS</b>\n\n"
-            # if extra:
-            #     for key, value in extra.items():
-            #         msg += f"{key}: {value}\n"
-            # msg += f"\n<code>{tb_string[-4000 + len(msg):]}</code>"
-            if app_button:
-                self.telegram_service.send_message(self.chat_id, message, self.app_url)
-            else:
-                self.telegram_service.send_message(self.chat_id, message)
-        except Exception as e:
-            print(e)
+            yield
+        except BaseException:
+            self._local.buffer = None
+            raise
+        buffer, self._local.buffer = self._local.buffer, None
+        for text, app_url, _ in build_digests(buffer):
+            self._write_outbox(text, app_url)
 
-Telegram = TelegramLogging()
+    def _write_outbox(self, message, app_url):
+        # Xabar darhol yuborilmaydi: outboxga yoziladi va commitdan keyin Celery orqali yuboriladi
+        from apps.common.models import TelegramOutbox
 
+        try:
+            # Alohida savepoint: INSERT xatosi chaqiruvchining tranzaksiyasini buzmasligi uchun
+            with transaction.atomic():
+                TelegramOutbox.objects.create(chat_id=self.chat_id, text=message, app_url=app_url)
+        except Exception:
+            logger.exception("Telegram outbox ga yozib bo'lmadi")
+            return
+        transaction.on_commit(lambda: self.schedule_flush(self.chat_id))
+
+    def schedule_flush(self, chat_id, countdown=None):
+        from apps.common.tasks import flush_telegram_outbox
+
+        # Oyna davomida chat uchun faqat bitta flush rejalashtiriladi
+        if countdown is None and not cache.add(f"telegram_flush_scheduled:{chat_id}", 1, self.digest_window):
+            return
+        try:
+            flush_telegram_outbox.apply_async(
+                (chat_id,), countdown=self.digest_window if countdown is None else countdown, retry=False
+            )
+        except Exception:
+            # Broker ishlamasa xabar outboxda qoladi va retry_telegram_outbox uni yuboradi
+            logger.exception("Telegram outbox flush ni rejalashtirib bo'lmadi")
+
+    def send(self, chat_id, text, app_url=None):
+        """
+        Xabarni to'g'ridan-to'g'ri yuboradi. Muvaffaqiyatli bo'lsa None,
+        aks holda (xatolik matni, retry_after) qaytaradi.
+        """
+        response = self.telegram_service.send_message(chat_id, text, app_url)
+        if response and response.get("ok"):
+            return None
+        if not response:
+            return "No response from Telegram", None
+        return response.get("description"), response.get("parameters", {}).get("retry_after")
+
+Telegram = TelegramLogging()
@@ -0,0 +1,29 @@
+import time
+
+from django.core.cache import cache
+
+
+class TokenBucket:
+    """
+    Kesh (Redis) da saqlanadigan token bucket. Holat kalit bo'yicha saqlanadi,
+    shuning uchun bir kalitni bir vaqtda faqat bitta jarayon ishlatishi kerak
+    (masalan, chat bo'yicha lock ostida).
+    """
+
+    def __init__(self, key, rate, capacity):
+        self.key = f"token_bucket:{key}"
+        self.rate = rate
+        self.capacity = capacity
+
+    def take(self):
+        """
+        Token olinsa 0, aks holda keyingi token uchun kutish kerak bo'lgan soniyalarni qaytaradi.
+        """
+        now = time.time()
+        tokens, updated_at = cache.get(self.key) or (self.capacity, now)
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+        if tokens >= 1:
+            cache.set(self.key, (tokens - 1, now), timeout=3600)
+            return 0
+        cache.set(self.key, (tokens, now), timeout=3600)
+        return (1 - tokens) / self.rate
@@ -0,0 +1,129 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+from apps.common.models import TransactionIndex, TransactionRollup
+from apps.common.utils import convert_values, _as_date
+
+DAY = "day"
+MONTH = "month"
+PERIODS = (DAY, MONTH)
+NO_CREATOR = 0
+KEY_FIELDS = ("period", "date", "section", "source", "direction", "currency_type", "creator_id")
+
+
+def period_start(day, period):
+    return day.replace(day=1) if period == MONTH else day
+
+
+def _keys(entry):
+    base = (entry.section or "", entry.kind, entry.direction, entry.currency_type, entry.creator_id or NO_CREATOR)
+    return [(period, period_start(entry.date, period)) + base for period in PERIODS]
+
+
+def apply(old=None, new=None):
+    """
+    TransactionIndex qatori o'zgarganda (old -> new) yig'indilarga faqat farq qo'shiladi.
+    Yangi qator uchun old=None, o'chirilgan qator uchun new=None.
+    """
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    for entry, sign in ((old, -1), (new, 1)):
+        if entry is None:
+            continue
+        for key in _keys(entry):
+            delta = deltas[key]
+            delta[0] += sign
+            delta[1] += sign * (entry.amount or 0)
+            delta[2] += sign * (entry.amount_uzs or 0)
+
+    for key, (count, amount, amount_uzs) in deltas.items():
+        if count or amount or amount_uzs:
+            _bump(dict(zip(KEY_FIELDS, key)), count, amount, amount_uzs)
+
+
+def _bump(lookup, count, amount, amount_uzs):
+    queryset = TransactionRollup.objects.filter(**lookup)
+    changes = {
+        "count": F("count") + count,
+        "amount": F("amount") + amount,
+        "amount_uzs": F("amount_uzs") + amount_uzs,
+    }
+    if not queryset.update(**changes):
+        _, created = TransactionRollup.objects.get_or_create(
+            **lookup, defaults={"count": count, "amount": amount, "amount_uzs": amount_uzs},
+        )
+        if not created:
+            queryset.update(**changes)
+    if count < 0:
+        queryset.filter(count__lte=0).delete()
+
+
+def rebuild(batch_size=1000):
+    """
+    Jadvalni TransactionIndex dan qayta hisoblaydi (har bir davr uchun bitta GROUP BY).
+    Qaytaradi: {davr: qatorlar soni}
+    """
+    counts = {}
+    with transaction.atomic():
+        TransactionRollup.objects.all().delete()
+        for period in PERIODS:
+            rows = (TransactionIndex.objects.order_by()
+                    .annotate(period_date=F("date") if period == DAY else TruncMonth("date"),
+                              section_key=Coalesce("section", Value("")),
+                              creator_key=Coalesce("creator_id", Value(NO_CREATOR)))
+                    .values("period_date", "section_key", "kind", "direction", "currency_type", "creator_key")
+                    .annotate(total_count=Count("id"), total_amount=Sum("amount"), total_uzs=Sum("amount_uzs")))
+            created = TransactionRollup.objects.bulk_create(
+                (TransactionRollup(
+                    period=period, date=_as_date(row["period_date"]), section=row["section_key"],
+                    source=row["kind"], direction=row["direction"], currency_type=row["currency_type"],
+                    creator_id=row["creator_key"], count=row["total_count"],
+                    amount=row["total_amount"] or 0, amount_uzs=row["total_uzs"] or 0,
+                ) for row in rows.iterator()),
+                batch_size=batch_size,
+            )
+            counts[period] = len(created)
+    return counts
+
+
+def totals(start_day, end_day, *conditions, target="UZS", **filters):
+    """
+    Davrdagi kirim va chiqim jami target valyutada. Kunlik qatorlar (valyuta, kun) bo'yicha
+    yig'iladi va har biri o'z sanasidagi kurs bilan o'tkaziladi, natija manba jadvallardagi bilan bir xil.
+    """
+    rows = list(TransactionRollup.objects
+                .filter(*conditions, period=DAY, date__range=(_as_date(start_day), _as_date(end_day)), **filters)
+                .values("direction", "currency_type", "date").order_by()
+                .annotate(total=Sum("amount")))
+    result = {}
+    for direction in ("income", "outcome"):
+        _, result[direction] = convert_values(
+            ((row["currency_type"], row["total"], row["date"]) for row in rows if row["direction"] == direction),
+            target,
+        )
+    return result
+
+
+def series(start_day, end_day, period=DAY, group_by=("section",), *conditions, **filters):
+    """
+    Davr (kun yoki oy) va group_by maydonlari bo'yicha kirim/chiqim qatorlari, UZS da
+    (har bir tranzaksiya o'z sanasidagi kurs bilan). Oy bo'yicha to'liq oylar olinadi.
+    """
+    start_day, end_day = period_start(_as_date(start_day), period), _as_date(end_day)
+    rows = (TransactionRollup.objects
+            .filter(*conditions, period=period, date__range=(start_day, end_day), **filters)
+            .values("date", *group_by, "direction").order_by("-date", *group_by)
+            .annotate(total=Sum("amount_uzs"), total_count=Sum("count")))
+
+    merged = {}
+    for row in rows:
+        key = (row["date"],) + tuple(row[field] for field in group_by)
+        item = merged.get(key)
+        if item is None:
+            item = merged[key] = {"date": row["date"], **{field: row[field] for field in group_by},
+                                  "income": 0.0, "outcome": 0.0, "count": 0}
+        item[row["direction"]] = round(item[row["direction"]] + (row["total"] or 0), 2)
+        item["count"] += row["total_count"] or 0
+    return list(merged.values())
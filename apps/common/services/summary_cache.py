@@ -0,0 +1,102 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.common.utils import _as_date
+
+# Bo'lim bo'yicha umumiy (foydalanuvchiga bog'lanmagan) summary uchun scope
+ALL = "all"
+KINDS = ("incomes", "outcomes")
+
+
+def day_bounds(start_day, end_day):
+    # View lardagi kabi: start_day 00:00:00 dan end_day 23:59:59 gacha, mahalliy vaqtda
+    start = timezone.make_aware(datetime.combine(start_day, time.min))
+    end = timezone.make_aware(datetime.combine(end_day, time(23, 59, 59)))
+    return start, end
+
+
+def created_day(obj):
+    return timezone.localdate(obj.created_at)
+
+
+def _version_key(section, scope, day):
+    return f"summary:{section}:{scope}:{day.isoformat()}:version"
+
+
+def _data_key(section, scope, day, version):
+    return f"summary:{section}:{scope}:{day.isoformat()}:{version}"
+
+
+def _split(rows, days):
+    parts = {day: {kind: [] for kind in KINDS} for day in days}
+    for day, kind, row in rows:
+        part = parts.get(day)
+        if part is not None:
+            part[kind].append(row)
+    return parts
+
+
+def collect(section, scope, start_day, end_day, build):
+    """
+    Davrdagi kirim/chiqim qatorlari kunlik keshlangan qismlardan yig'iladi (kunlar kamayish tartibida).
+    build(start, end) -> (kun, "incomes"|"outcomes", qator) ketma-ketligi, faqat keshda yo'q kunlar
+    uchun bitta davr bilan chaqiriladi. Kesh kalitlari (bo'lim, scope, kun) bo'yicha, invalidate()
+    faqat shu kun versiyasini oshiradi.
+    """
+    days = [end_day - timedelta(days=n) for n in range((end_day - start_day).days + 1)]
+    if len(days) > settings.SUMMARY_CACHE_MAX_DAYS:
+        parts = _split(build(*day_bounds(start_day, end_day)), days)
+        return {kind: [row for day in days for row in parts[day][kind]] for kind in KINDS}
+
+    version_keys = {day: _version_key(section, scope, day) for day in days}
+    versions = cache.get_many(list(version_keys.values()))
+    keys = {day: _data_key(section, scope, day, versions.get(version_keys[day], 0)) for day in days}
+    cached = cache.get_many(list(keys.values()))
+
+    missing = [day for day in days if keys[day] not in cached]
+    if missing:
+        built = _split(build(*day_bounds(min(missing), max(missing))), missing)
+        fresh = {keys[day]: built[day] for day in missing}
+        cache.set_many(fresh, timeout=settings.SUMMARY_CACHE_TIMEOUT)
+        cached.update(fresh)
+
+    return {kind: [row for day in days for row in cached[keys[day]][kind]] for kind in KINDS}
+
+
+def invalidate(buckets):
+    """
+    (bo'lim, scope, kun) bo'yicha keshlangan qismlarni eskirgan deb belgilaydi.
+    """
+    for section, scope, day in set(buckets):
+        day = _as_date(day)
+        if day is None:
+            continue
+        key = _version_key(section, scope, day)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 0, timeout=None)
+            cache.incr(key)
+
+
+def stored_buckets(obj):
+    """
+    Saqlashdan oldin bazadagi holat bo'yicha bucketlar (sana o'zgarsa eski kun ham tozalanadi).
+    """
+    if obj.pk is None:
+        return []
+    stored = type(obj).objects.filter(pk=obj.pk).first()
+    return stored.summary_buckets() if stored is not None else []
+
+
+def touch(obj, stale=()):
+    """
+    Obyekt tushadigan (va stale) bucketlarni tranzaksiya commit bo'lgandan keyin tozalaydi,
+    shunda parallel so'rov commit qilinmagan holatni keshga yozib qo'ymaydi.
+    """
+    buckets = list(stale) + list(obj.summary_buckets())
+    transaction.on_commit(lambda: invalidate(buckets))
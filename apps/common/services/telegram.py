@@ -1,15 +1,17 @@
 import json
 import urllib.parse
-import requests
+
+from apps.common.services.http import http_client
 
 
 class TelegramService:
-    def __init__(self, bot_token):
+    def __init__(self, bot_token, api_url="https://api.telegram.org"):
         self.bot_token = bot_token
+        self.api_url = api_url.rstrip("/")
 
     def send_message(self, chat_id, text, app_url=None):
         # encoded_message = urllib.parse.quote(text)
-        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+        url = f"{self.api_url}/bot{self.bot_token}/sendMessage"
 
         try:
             prev_params = {
@@ -30,7 +32,7 @@ class TelegramService:
                         ]
                     }
                 )
-            response = requests.post(
+            response = http_client.post(
                 url=url,
                 params=prev_params,
             )
@@ -0,0 +1,139 @@
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+from apps.common.models import TransactionIndex
+from apps.common.services import approval_queue, rollup
+from apps.common.utils import convert_currency_on, _as_date
+
+# TransactionIndex ga yoziladigan modellar; har biri index_row() metodiga ega
+INDEXED_MODELS = (
+    "factory.RawMaterialHistory",
+    "factory.SalaryPayment",
+    "factory.Sale",
+    "factory.PayDebt",
+    "garden.GardenSalaryPayment",
+    "logistic.CarExpense",
+    "logistic.LogisticSalaryPayment",
+    "logistic.WaybillPayout",
+    "logistic.ContractIncome",
+    "main.MoneyCirculation",
+    "main.Expense",
+    "main.Income",
+)
+
+INDEX_FIELDS = (
+    "content_type", "object_id", "section", "kind", "direction", "creator", "status", "description",
+    "date", "amount", "currency_type", "amount_uzs", "created_at", "updated_at",
+)
+
+
+def row(obj, prefix, section, kind, direction, **overrides):
+    """
+    index_row() uchun standart qiymatlar: creator, status, description, date, amount, currency_type
+    modelning shu nomdagi maydonlaridan olinadi, kerak bo'lsa overrides bilan almashtiriladi.
+    """
+    values = {
+        "unique_id": f"{prefix}-{obj.pk}",
+        "section": section,
+        "kind": kind,
+        "direction": direction,
+        "creator": getattr(obj, "creator", None),
+        "status": getattr(obj, "status", None),
+        "description": getattr(obj, "description", None),
+        "date": getattr(obj, "date", None),
+        "amount": getattr(obj, "amount", 0),
+        "currency_type": getattr(obj, "currency_type", "UZS"),
+    }
+    values.update(overrides)
+    return values
+
+
+def build(obj):
+    """
+    Manba obyekt uchun saqlanmagan TransactionIndex qatori.
+    """
+    values = obj.index_row()
+    date = _as_date(values.pop("date")) or timezone.localdate(obj.created_at)
+    amount = values.pop("amount") or 0
+    currency_type = values.pop("currency_type")
+    return TransactionIndex(
+        content_type=ContentType.objects.get_for_model(obj),
+        object_id=obj.pk,
+        date=date,
+        amount=amount,
+        currency_type=currency_type,
+        amount_uzs=convert_currency_on(currency_type, "UZS", amount, date),
+        created_at=obj.created_at,
+        updated_at=getattr(obj, "updated_at", None) or obj.created_at,
+        **values,
+    )
+
+
+def index(obj):
+    entry = build(obj)
+    stored = TransactionIndex.objects.select_related("creator").filter(unique_id=entry.unique_id).first()
+    TransactionIndex.objects.update_or_create(
+        unique_id=entry.unique_id,
+        defaults={field: getattr(entry, field) for field in INDEX_FIELDS},
+    )
+    rollup.apply(stored, entry)
+    approval_queue.apply(stored, entry)
+
+
+def remove(obj):
+    entries = TransactionIndex.objects.filter(content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk)
+    for entry in entries.select_related("creator"):
+        rollup.apply(entry, None)
+        approval_queue.apply(entry, None)
+    entries.delete()
+
+
+def resolve(unique_id):
+    """
+    unique_id bo'yicha manba obyekt, topilmasa None.
+    """
+    entry = TransactionIndex.objects.select_related("content_type").filter(unique_id=unique_id).first()
+    if entry is None:
+        return None
+    return entry.content_type.model_class().objects.filter(pk=entry.object_id).first()
+
+
+def rebuild(chunk_size=500):
+    """
+    Barcha indekslangan modellar bo'yicha jadvalni qayta yozadi (mavjud qatorlar yangilanadi),
+    bulk yozuv apply() dan o'tmagani uchun oxirida TransactionRollup qayta quriladi va
+    tasdiq navbati hisoblagichlari tozalanadi.
+    Qaytaradi: {model: qatorlar soni}
+    """
+    counts = {}
+    for label in INDEXED_MODELS:
+        model = apps.get_model(label)
+        queryset = model.objects.all()
+        if any(field.name == "creator" and field.is_relation for field in model._meta.get_fields()):
+            queryset = queryset.select_related("creator")
+        if label == "factory.Sale":
+            queryset = queryset.prefetch_related("sale_items")
+        count = 0
+        batch = []
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            batch.append(build(obj))
+            count += 1
+            if len(batch) >= chunk_size:
+                _upsert(batch)
+                batch = []
+        _upsert(batch)
+        # manbasi o'chirilgan qatorlar
+        TransactionIndex.objects.filter(content_type=ContentType.objects.get_for_model(model)) \
+            .exclude(object_id__in=model.objects.values("pk")).delete()
+        counts[label] = count
+    rollup.rebuild()
+    approval_queue.reset()
+    return counts
+
+
+def _upsert(batch):
+    if batch:
+        TransactionIndex.objects.bulk_create(
+            batch, update_conflicts=True, unique_fields=["unique_id"], update_fields=list(INDEX_FIELDS),
+        )
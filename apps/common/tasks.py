@@ -1,21 +1,83 @@
-from django.core.cache import cache
-import requests
+from datetime import timedelta
+
 from celery import shared_task
-from .services.logging import Telegram
-# from .utils import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import TelegramOutbox
+from .services.logging import Telegram, build_digests
+from .services.rate_limit import TokenBucket
+from .utils import fetch_currency_rate as _fetch_currency_rate
+
+TELEGRAM_MAX_ATTEMPTS = 6
+TELEGRAM_FLUSH_BATCH = 200
 
 
 @shared_task
 def fetch_currency_rate():
-    response = requests.get("https://api.exchangerate-api.com/v4/latest/USD")
-
-    if response.status_code == 200:
-        data = response.json()
-        UZS_rate = data.get("rates", {}).get("UZS")
-        RUB_rate = data.get("rates", {}).get("RUB")
-        if UZS_rate and RUB_rate:
-            cache.set("UZS_rate", UZS_rate)
-            cache.set("RUB_rate", RUB_rate)
-            Telegram.send_log(f"Rate updated: UZS: {UZS_rate}, RUB: {RUB_rate}")
-            return f"Rate cached: UZS: {UZS_rate}, RUB: {RUB_rate}"
-    return "Failed to update rate"
+    return _fetch_currency_rate()
+
+
+@shared_task
+def flush_telegram_outbox(chat_id):
+    """
+    Chatdagi kutilayotgan xabarlarni digestlarga birlashtirib yuboradi.
+    Chat bo'yicha bir vaqtda faqat bitta flush ishlaydi, yuborish token bucket bilan cheklanadi.
+    """
+    cache.delete(f"telegram_flush_scheduled:{chat_id}")
+    lock_key = f"telegram_flush_lock:{chat_id}"
+    if not cache.add(lock_key, 1, timeout=120):
+        Telegram.schedule_flush(chat_id, countdown=Telegram.digest_window)
+        return "Locked"
+
+    try:
+        rows = list(TelegramOutbox.objects.filter(chat_id=chat_id, status="pending")
+                    .order_by("id").values_list("id", "text", "app_url")[:TELEGRAM_FLUSH_BATCH])
+        bucket = TokenBucket(f"telegram:{chat_id}", settings.TELEGRAM_CHAT_RATE, settings.TELEGRAM_CHAT_BURST)
+        sent = 0
+        for text, app_url, outbox_ids in build_digests(rows):
+            wait = bucket.take()
+            if wait:
+                Telegram.schedule_flush(chat_id, countdown=wait)
+                return f"Sent: {sent}, rate limited"
+
+            error = Telegram.send(chat_id, text, app_url)
+            if error is None:
+                TelegramOutbox.objects.filter(id__in=outbox_ids).update(
+                    status="sent", sent_at=timezone.now(), attempts=F("attempts") + 1, last_error=None,
+                    updated_at=timezone.now(),
+                )
+                sent += len(outbox_ids)
+                continue
+
+            description, retry_after = error
+            TelegramOutbox.objects.filter(id__in=outbox_ids).update(
+                attempts=F("attempts") + 1, last_error=description, updated_at=timezone.now()
+            )
+            TelegramOutbox.objects.filter(id__in=outbox_ids, attempts__gte=TELEGRAM_MAX_ATTEMPTS).update(
+                status="failed"
+            )
+            attempts = max(TelegramOutbox.objects.filter(id__in=outbox_ids).values_list("attempts", flat=True))
+            Telegram.schedule_flush(chat_id, countdown=retry_after or 5 * 2 ** attempts)
+            return f"Sent: {sent}, failed: {description}"
+
+        if len(rows) == TELEGRAM_FLUSH_BATCH:
+            Telegram.schedule_flush(chat_id, countdown=0)
+        return f"Sent: {sent}"
+    finally:
+        cache.delete(lock_key)
+
+
+@shared_task
+def retry_telegram_outbox():
+    """
+    Broker ishlamagan yoki worker to'xtab qolgan paytda yuborilmay qolgan xabarlarni qayta navbatga qo'yadi.
+    """
+    stale = timezone.now() - timedelta(minutes=1)
+    chat_ids = list(TelegramOutbox.objects.filter(status="pending", created_at__lt=stale)
+                    .values_list("chat_id", flat=True).distinct())
+    for chat_id in chat_ids:
+        Telegram.schedule_flush(chat_id, countdown=0)
+    return f"Requeued chats: {len(chat_ids)}"
@@ -1,3 +1,275 @@
-from django.test import TestCase
+import json
+import os
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.common import tasks, utils
+from apps.common.models import CurrencyRate, TelegramOutbox
+from apps.common.services.logging import TelegramLogging
+from apps.logistic.models import CarExpense
+from apps.users.models import User
+
+
+@override_settings(CURRENCY_RATES_CHECK_INTERVAL=0)
+class RateSnapshotVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        utils._snapshot = None
+        utils._history = None
+
+    def create_rate(self, usd, rub):
+        with self.captureOnCommitCallbacks(execute=True):
+            return CurrencyRate.objects.create(usd=usd, rub=rub)
+
+    def test_version_comes_from_currency_rate(self):
+        rate = self.create_rate(12800, 140)
+        snapshot = utils.get_rate_snapshot()
+        self.assertEqual(snapshot.version, str(rate.pk))
+        self.assertEqual(snapshot.rates["UZS"], 12800)
+
+    def test_version_is_not_reused_after_cache_flush(self):
+        self.create_rate(12800, 140)
+        old = utils.get_rate_snapshot()
+
+        cache.clear()
+        rate = self.create_rate(13000, 150)
+        new = utils.get_rate_snapshot()
+        self.assertNotEqual(new.version, old.version)
+        self.assertEqual(new.version, str(rate.pk))
+        self.assertEqual(new.rates["UZS"], 13000)
+
+    def test_reload_after_flush_reads_latest_rate(self):
+        self.create_rate(12800, 140)
+        utils.get_rate_snapshot()
+        latest = CurrencyRate.objects.create(usd=13100, rub=150)
+
+        cache.clear()
+        snapshot = utils.get_rate_snapshot()
+        self.assertEqual(snapshot.version, str(latest.pk))
+        self.assertEqual(snapshot.rates["UZS"], 13100)
+
+    def test_editing_rate_publishes_new_version(self):
+        rate = self.create_rate(12800, 140)
+        before = utils.get_rate_snapshot()
+        rate.usd = 12900
+        with self.captureOnCommitCallbacks(execute=True):
+            rate.save()
+        after = utils.get_rate_snapshot()
+        self.assertNotEqual(after.version, before.version)
+        self.assertEqual(after.rates["UZS"], 12900)
+
+
+class FakeTelegramServer:
+    """
+    Telegram Bot API o'rniga lokal server: sendMessage so'rovlarini yozib oladi,
+    javoblar navbatdan olinadi (bo'sh bo'lsa {"ok": true}).
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.responses = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                query = parse_qs(urlsplit(self.path).query)
+                server.requests.append({"path": urlsplit(self.path).path, **{k: v[0] for k, v in query.items()}})
+                status, body = server.responses.pop(0) if server.responses else (200, {"ok": True})
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@override_settings(TELEGRAM_CHAT_RATE=100, TELEGRAM_CHAT_BURST=100)
+class TelegramOutboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.server = FakeTelegramServer().__enter__()
+        self.addCleanup(self.server.__exit__)
+        with mock.patch.dict(os.environ, {"TELEGRAM_API_URL": self.server.url, "TELEGRAM_GROUP_ID": "-100"}):
+            self.telegram = TelegramLogging()
+        self.chat_id = self.telegram.chat_id
+
+        patcher = mock.patch.object(tasks, "Telegram", self.telegram)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Broker o'rniga rejalashtirilgan flush lar yozib olinadi
+        apply_async = mock.patch.object(tasks.flush_telegram_outbox, "apply_async")
+        self.apply_async = apply_async.start()
+        self.addCleanup(apply_async.stop)
+
+    def pending(self):
+        return TelegramOutbox.objects.filter(chat_id=self.chat_id, status="pending")
+
+    def test_message_is_delivered_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.telegram.send_log("Yangi chiqim", app_button=True)
+            self.assertEqual(self.pending().count(), 1)
+            self.apply_async.assert_not_called()
+        for callback in callbacks:
+            callback()
+        self.apply_async.assert_called_once()
+        self.assertEqual(self.apply_async.call_args.args[0], (self.chat_id,))
+
+        tasks.flush_telegram_outbox(self.chat_id)
+        self.assertEqual(len(self.server.requests), 1)
+        request = self.server.requests[0]
+        self.assertEqual(request["path"], f"/bot{self.telegram.bot_token}/sendMessage")
+        self.assertEqual(request["chat_id"], self.chat_id)
+        self.assertEqual(request["text"], "Yangi chiqim")
+        self.assertIn("reply_markup", request)
+        outbox = TelegramOutbox.objects.get(chat_id=self.chat_id)
+        self.assertEqual((outbox.status, outbox.attempts), ("sent", 1))
+        self.assertIsNotNone(outbox.sent_at)
+
+    def test_rolled_back_message_is_not_queued(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    self.telegram.send_log("Bekor qilingan")
+                    raise RuntimeError
+        self.assertFalse(TelegramOutbox.objects.filter(chat_id=self.chat_id).exists())
+        self.apply_async.assert_not_called()
+        tasks.flush_telegram_outbox(self.chat_id)
+        self.assertEqual(self.server.requests, [])
+
+    def test_failed_delivery_is_retried_after_retry_after(self):
+        self.server.responses.append(
+            (429, {"ok": False, "description": "Too Many Requests", "parameters": {"retry_after": 7}})
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.telegram.send_log("Qayta yuboriladi")
+        self.apply_async.reset_mock()
+
+        tasks.flush_telegram_outbox(self.chat_id)
+        outbox = TelegramOutbox.objects.get(chat_id=self.chat_id)
+        self.assertEqual((outbox.status, outbox.attempts, outbox.last_error), ("pending", 1, "Too Many Requests"))
+        self.assertEqual(self.apply_async.call_args.kwargs["countdown"], 7)
+
+        tasks.flush_telegram_outbox(self.chat_id)
+        outbox.refresh_from_db()
+        self.assertEqual((outbox.status, outbox.attempts, outbox.last_error), ("sent", 2, None))
+        self.assertEqual([request["text"] for request in self.server.requests], ["Qayta yuboriladi"] * 2)
+
+    def test_message_fails_after_max_attempts(self):
+        error = (400, {"ok": False, "description": "Bad Request"})
+        self.server.responses.extend([error] * tasks.TELEGRAM_MAX_ATTEMPTS)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.telegram.send_log("Yetib bormaydi")
+        for _ in range(tasks.TELEGRAM_MAX_ATTEMPTS):
+            tasks.flush_telegram_outbox(self.chat_id)
+        outbox = TelegramOutbox.objects.get(chat_id=self.chat_id)
+        self.assertEqual((outbox.status, outbox.attempts), ("failed", tasks.TELEGRAM_MAX_ATTEMPTS))
+
+        tasks.flush_telegram_outbox(self.chat_id)
+        self.assertEqual(len(self.server.requests), tasks.TELEGRAM_MAX_ATTEMPTS)
+
+    def test_batch_is_sent_as_one_digest(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.telegram.batch():
+                self.telegram.send_log("Birinchi")
+                self.telegram.send_log("Ikkinchi")
+        tasks.flush_telegram_outbox(self.chat_id)
+        self.assertEqual([request["text"] for request in self.server.requests], ["Birinchi\n\nIkkinchi"])
+
+    def test_outbox_error_does_not_break_caller_transaction(self):
+        self.telegram.chat_id = None
+        with transaction.atomic():
+            with self.assertLogs("apps.common.services.logging", "ERROR"):
+                self.telegram.send_log("chat_id yo'q")
+            self.assertEqual(TelegramOutbox.objects.count(), 0)
+
+
+class KeysetPaginationTests(TestCase):
+    url = "/logistic/car-expenses/"
+    dates = [date(2026, 10, 1), date(2026, 10, 3), date(2026, 10, 3), None, date(2026, 10, 2), None, date(2026, 10, 3)]
+
+    @classmethod
+    def setUpTestData(cls):
+        CurrencyRate.objects.create(usd=12800, rub=140)
+        cls.ceo = User.objects.create(username="ceo", role="ceo", currency_type="UZS")
+        cls.expenses = [
+            CarExpense.objects.create(creator=cls.ceo, reason="Test", amount=10, currency_type="UZS", date=day)
+            for day in cls.dates
+        ]
+
+    def setUp(self):
+        cache.clear()
+        utils._snapshot = None
+        utils._history = None
+        self.client = APIClient()
+        self.client.force_authenticate(self.ceo)
+
+    def expected_order(self):
+        # (date DESC NULLS LAST, id DESC)
+        dated = sorted((e for e in self.expenses if e.date), key=lambda e: (e.date, e.pk), reverse=True)
+        undated = sorted((e for e in self.expenses if e.date is None), key=lambda e: e.pk, reverse=True)
+        return [e.pk for e in dated + undated]
+
+    def walk(self, **params):
+        ids = []
+        response = self.client.get(self.url, {"pagination": "cursor", "limit": 2, **params})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [row["id"] for row in response.data["results"]]
+            if response.data["next_cursor"] is None:
+                self.assertIsNone(response.data["next"])
+                return ids, response
+            response = self.client.get(self.url, {"cursor": response.data["next_cursor"], "limit": 2, **params})
+
+    def test_cursor_pages_cover_every_row_once_in_key_order(self):
+        ids, _ = self.walk()
+        self.assertEqual(ids, self.expected_order())
+
+    def test_cursor_and_offset_return_same_rows(self):
+        ids, _ = self.walk()
+        response = self.client.get(self.url, {"limit": 100})
+        self.assertEqual(response.data["count"], len(self.expenses))
+        self.assertCountEqual([row["id"] for row in response.data["results"]], ids)
+
+    def test_next_link_carries_cursor(self):
+        response = self.client.get(self.url, {"pagination": "cursor", "limit": 2, "offset": 4})
+        self.assertIn(f"cursor={response.data['next_cursor']}", response.data["next"])
+        self.assertNotIn("offset=", response.data["next"])
+
+    def test_invalid_cursor_is_rejected(self):
+        for cursor in ("garbage", utils.encode_cursor("not-a-date", 1), utils.encode_cursor("2026-10-01", "x")):
+            response = self.client.get(self.url, {"cursor": cursor})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data, {"cursor": "Invalid cursor."})
+
+    def test_count_modes(self):
+        response = self.client.get(self.url, {"pagination": "cursor", "limit": 2})
+        self.assertIsNone(response.data["count"])
+        for mode in ("exact", "approx"):
+            response = self.client.get(self.url, {"pagination": "cursor", "limit": 2, "count": mode})
+            self.assertEqual(response.data["count"], len(self.expenses))
+        # Offset rejimida none yo'q, son baribir hisoblanadi
+        response = self.client.get(self.url, {"limit": 2, "count": "none"})
+        self.assertEqual(response.data["count"], len(self.expenses))
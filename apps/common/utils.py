@@ -1,58 +1,243 @@
-import requests
+import base64
+import json
+import logging
+import time
+from bisect import bisect_right
+from datetime import datetime
+from types import MappingProxyType
+
+from django.conf import settings
 from django.core.cache import cache
-from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
+from apps.common.services.http import http_client
 from apps.common.services.logging import Telegram
 from apps.common.models import CurrencyRate
 
-exchange_rates = {
-    'USD': 1.0,
-    'UZS': cache.get("UZS_rate"),
-    'RUB': cache.get("RUB_rate")
-}
+RATES_CACHE_KEY = "currency_rates"
+RATES_VERSION_KEY = "currency_rates_version"
+
+logger = logging.getLogger(__name__)
+
+
+class RateSnapshot:
+    """
+    Valyuta kurslarining o'zgarmas nusxasi: 1 USD ga nisbatan qiymatlar.
+    Har bir jarayon o'z nusxasini saqlaydi va faqat versiya o'zgarganda yangilaydi.
+    """
+    __slots__ = ("version", "rates")
+
+    def __init__(self, version, rates):
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "rates", MappingProxyType(dict(rates)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RateSnapshot is immutable")
+
+    def rate(self, base, target):
+        if base not in self.rates or target not in self.rates:
+            raise ValueError(f"Invalid currency type. Supported currencies are {tuple(self.rates)}")
+        return self.rates[target] / self.rates[base]
+
+    def convert(self, base, target, amount):
+        return round(amount * self.rate(base, target), 2)
+
+
+_snapshot = None
+_checked_at = 0.0
+
+
+def rates_version(currency_rate, edited=False):
+    """
+    Kurslar versiyasi CurrencyRate qatoridan olinadi, kesh tozalansa ham eski versiya qayta chiqmaydi.
+    Mavjud qator tahrirlanganda pk o'zgarmagani uchun saqlash vaqti qo'shiladi.
+    """
+    if edited:
+        return f"{currency_rate.pk}:{time.time_ns()}"
+    return str(currency_rate.pk)
+
+
+def publish_rates(version, uzs_rate, rub_rate):
+    """
+    Kurslarni (1 USD ga nisbatan) va versiyani keshga yozadi,
+    shunda barcha jarayonlar keyingi tekshiruvda yangi nusxani oladi.
+    """
+    cache.set(RATES_CACHE_KEY, {"version": version, "UZS": uzs_rate, "RUB": rub_rate}, timeout=None)
+    cache.set(RATES_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def _load_snapshot(version):
+    data = cache.get(RATES_CACHE_KEY)
+    if data and data.get("version") == version:
+        return RateSnapshot(version, {"USD": 1.0, "UZS": data["UZS"], "RUB": data["RUB"]})
+
+    currency_rate = CurrencyRate.objects.order_by('-created_at').first()
+    if currency_rate is None:
+        fetch_currency_rate()
+        currency_rate = CurrencyRate.objects.order_by('-created_at').first()
+        if currency_rate is None:
+            raise ValueError("Currency rates not found in the database. Please ensure CurrencyRate data exists.")
+
+    # CurrencyRate da usd va rub so'mdagi narx, RUB ning USD ga nisbati usd / rub
+    uzs_rate, rub_rate = currency_rate.usd, currency_rate.usd / currency_rate.rub
+    version = publish_rates(rates_version(currency_rate), uzs_rate, rub_rate)
+    return RateSnapshot(version, {"USD": 1.0, "UZS": uzs_rate, "RUB": rub_rate})
+
+
+def get_rate_snapshot():
+    global _snapshot, _checked_at
+    now = time.monotonic()
+    if _snapshot is not None and now - _checked_at < settings.CURRENCY_RATES_CHECK_INTERVAL:
+        return _snapshot
+
+    version = cache.get(RATES_VERSION_KEY)
+    if _snapshot is None or version is None or version != _snapshot.version:
+        _snapshot = _load_snapshot(version)
+    _checked_at = now
+    return _snapshot
+
+
+class RateHistory:
+    """
+    CurrencyRate tarixi: kunlar bo'yicha saralangan massiv.
+    Berilgan sanada amalda bo'lgan kurs binary search bilan topiladi.
+    """
+    __slots__ = ("version", "days", "snapshots")
+
+    def __init__(self, version, rows):
+        days, snapshots = [], []
+        for day, usd, rub in rows:
+            snapshot = RateSnapshot(version, {"USD": 1.0, "UZS": usd, "RUB": usd / rub})
+            if days and days[-1] == day:
+                snapshots[-1] = snapshot
+            else:
+                days.append(day)
+                snapshots.append(snapshot)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "days", tuple(days))
+        object.__setattr__(self, "snapshots", tuple(snapshots))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RateHistory is immutable")
+
+    @classmethod
+    def load(cls, version):
+        rows = CurrencyRate.objects.order_by('created_at').values_list('created_at', 'usd', 'rub')
+        return cls(version, ((timezone.localdate(created_at), usd, rub) for created_at, usd, rub in rows))
+
+    def snapshot_on(self, day):
+        # Birinchi kursdan oldingi sanalar uchun eng eski kurs ishlatiladi
+        index = max(bisect_right(self.days, day) - 1, 0)
+        return self.snapshots[index]
+
+
+_history = None
+
+
+def get_rate_history():
+    global _history
+    snapshot = get_rate_snapshot()
+    if _history is None or _history.version != snapshot.version:
+        _history = RateHistory.load(snapshot.version)
+    return _history
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    if isinstance(value, str):
+        return parse_date(value[:10])
+    return value
+
+
+def encode_cursor(*values):
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Noto'g'ri cursor")
+
+
+def get_rate_snapshot_on(day):
+    """
+    Berilgan sanada amalda bo'lgan kurslar. Sana yo'q bo'lsa joriy kurslar.
+    """
+    day = _as_date(day)
+    if day is None:
+        return get_rate_snapshot()
+    history = get_rate_history()
+    if not history.days:
+        return get_rate_snapshot()
+    return history.snapshot_on(day)
+
 
 def fetch_currency_rate():
-    response = requests.get("https://api.exchangerate-api.com/v4/latest/USD")
+    try:
+        response = http_client.get("https://api.exchangerate-api.com/v4/latest/USD")
+    except Exception:
+        logger.exception("Valyuta kurslarini olib bo'lmadi")
+        return Telegram.send_log("Валюталар курсини олишда муаммо.")
 
     if response.status_code == 200:
         data = response.json()
         UZS_rate = data.get("rates", {}).get("UZS")
         RUB_rate = data.get("rates", {}).get("RUB")
         if UZS_rate and RUB_rate:
-            cache.set("UZS_rate", UZS_rate)
-            cache.set("RUB_rate", RUB_rate)
-            Telegram.send_log(f"💸 Янги валюта курслари: \n🇺🇸🔄🇺🇿 USD-UZS: {UZS_rate}, \n🇷🇺🔄🇺🇿 RUB-UZS: {convert_currency('RUB', 'UZS', 1)}")
+            # Kurs tarixda qolishi uchun bazaga yoziladi, save() keshni yangilaydi
+            CurrencyRate.objects.create(usd=UZS_rate, rub=UZS_rate / RUB_rate)
+            Telegram.send_log(f"💸 Янги валюта курслари: \n🇺🇸🔄🇺🇿 USD-UZS: {UZS_rate}, \n🇷🇺🔄🇺🇿 RUB-UZS: {round(UZS_rate / RUB_rate, 2)}")
             return f"Rate cached: UZS: {UZS_rate}, RUB: {RUB_rate}"
     return Telegram.send_log("Валюталар курсини олишда муаммо.")
 
-def validate_currency():
-    if exchange_rates['UZS'] is None or exchange_rates['RUB'] is None:
-        try:
-            currency_rates = CurrencyRate.objects.order_by('created_at')
-            if currency_rates.exists():
-                currency_rate = currency_rates.last()
-                cache.set("UZS_rate", currency_rate.usd)
-                cache.set("RUB_rate", currency_rate.rub)
-                exchange_rates['UZS'] = currency_rate.usd
-                exchange_rates['RUB'] = currency_rate.rub
-            else:
-                fetch_currency_rate()
-
-        except ObjectDoesNotExist:
-            raise ValueError("Currency rates not found in the database. Please ensure CurrencyRate data exists.")
-
 
 def convert_currency(base, target, amount):
-    validate_currency()
-    valid_currencies = exchange_rates.keys()
-    if base not in valid_currencies or target not in valid_currencies:
-        raise ValueError(f"Invalid currency type. Supported currencies are {valid_currencies}")
-    base_to_target_rate = exchange_rates[target] / exchange_rates[base]
-    converted_amount = amount * base_to_target_rate
-    return round(converted_amount, 2)
+    return get_rate_snapshot().convert(base, target, amount)
 
 
+def convert_currency_on(base, target, amount, day):
+    """
+    Tranzaksiya sanasidagi kurs bo'yicha o'tkazish, natija kurs o'zgarsa ham o'zgarmaydi.
+    """
+    return get_rate_snapshot_on(day).convert(base, target, amount)
 
 
+def convert_bulk(currencies, amounts, target="UZS", dates=None):
+    """
+    Parallel (valyuta, summa) ketma-ketliklarini bir o'tishda target valyutaga o'tkazadi.
+    Summalar valyuta (va dates berilsa sana) bo'yicha guruhlanadi, har bir guruh uchun kurs bir marta olinadi.
+    Qaytaradi: (o'tkazilgan summalar ro'yxati, umumiy summa)
+    """
+    if dates is None:
+        snapshot = get_rate_snapshot()
+        keys = ((currency, snapshot) for currency in currencies)
+    else:
+        keys = ((currency, get_rate_snapshot_on(day)) for currency, day in zip(currencies, dates))
+    factors = {}
+    sums = {}
+    converted = []
+    for key, amount in zip(keys, amounts):
+        factor = factors.get(key)
+        if factor is None:
+            currency, snapshot = key
+            factor = factors[key] = snapshot.rate(currency, target)
+        amount = amount or 0
+        sums[key] = sums.get(key, 0) + amount
+        converted.append(round(amount * factor, 2))
+    total = sum(amount * factors[key] for key, amount in sums.items())
+    return converted, round(total, 2)
 
 
+def convert_values(rows, target="UZS"):
+    """
+    convert_bulk ning (valyuta, summa) yoki (valyuta, summa, sana) qatorlari uchun varianti,
+    masalan queryset.values_list("currency_type", "amount", "date").
+    """
+    rows = list(rows)
+    dates = [row[2] for row in rows] if rows and len(rows[0]) > 2 else None
+    return convert_bulk([row[0] for row in rows], [row[1] for row in rows], target, dates)
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.5 on 2026-10-18 12:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('factory', '0030_remove_client_balance_remove_client_landing'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rawmaterialhistory',
+            index=models.Index(fields=['date'], name='factory_raw_date_bb6d09_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rawmaterialhistory',
+            index=models.Index(fields=['creator', 'date'], name='factory_raw_creator_9f51a7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salarypayment',
+            index=models.Index(fields=['date'], name='factory_sal_date_ebc4ec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salarypayment',
+            index=models.Index(fields=['creator', 'date'], name='factory_sal_creator_0b6cbc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['date'], name='factory_sal_date_db6927_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['creator', 'date'], name='factory_sal_creator_b1ef3d_idx'),
+        ),
+    ]
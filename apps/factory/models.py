@@ -1,13 +1,16 @@
 from datetime import timezone, datetime
 
 from django.db import models, transaction
-from django.db.models import F
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce
 from rest_framework.exceptions import ValidationError
 
 from apps.common.models import BaseModel, BasePerson, CURRENCY_TYPE
 from apps.common.services.logging import Telegram
 
-from apps.common.utils import convert_currency
+from apps.common.services import summary_cache, transaction_index
+from apps.ledger import services as ledger
+from apps.ledger.services import Leg
 from apps.main.models import Expense
 from apps.users.models import User
 
@@ -115,6 +118,14 @@ class UserBasketCount(models.Model):
     def __str__(self):
         return self.user_daily_work.worker.full_name
 
+    @property
+    def date(self):
+        return self.user_daily_work.date or self.user_daily_work.created_at
+
+    def ledger_legs(self):
+        fee = float(self.quantity * self.basket.per_worker_fee) if self.basket else 0
+        return [Leg(self.user_daily_work.worker, "balance", fee, "UZS")]
+
     def save(self, *args, **kwargs):
         with transaction.atomic():
             if self.pk:
@@ -125,9 +136,6 @@ class UserBasketCount(models.Model):
                 UserDailyWork.objects.filter(id=prev.user_daily_work.id).update(
                     amount=F('amount') - float(prev.quantity * prev.basket.per_worker_fee))
 
-                Worker.objects.filter(id=prev.user_daily_work.worker.id).update(
-                    balance=F('balance') - convert_currency("UZS", prev.user_daily_work.worker.currency_type,
-                                                            float(prev.quantity * prev.basket.per_worker_fee)))
                 if prev.basket.raw_material:
                     RawMaterial.objects.filter(id=prev.basket.raw_material.id).update(
                         weight=F('weight') + (prev.basket.weight / 1000) * prev.quantity)
@@ -140,9 +148,7 @@ class UserBasketCount(models.Model):
 
             Basket.objects.filter(id=self.basket.id).update(quantity=F('quantity') + self.quantity)
 
-            Worker.objects.filter(id=self.user_daily_work.worker.id).update(
-                balance=F('balance') + convert_currency("UZS", self.user_daily_work.worker.currency_type,
-                                                        float(self.quantity * self.basket.per_worker_fee)))
+            ledger.repost(self, self.ledger_legs())
 
             UserDailyWork.objects.filter(id=self.user_daily_work.id).update(
                 amount=F('amount') + float(self.quantity * self.basket.per_worker_fee))
@@ -159,9 +165,7 @@ class UserBasketCount(models.Model):
         with transaction.atomic():
             Basket.objects.filter(id=self.basket.id).update(quantity=F('quantity') - self.quantity)
 
-            Worker.objects.filter(id=self.user_daily_work.worker.id).update(
-                balance=F('balance') - convert_currency("UZS", self.user_daily_work.worker.currency_type,
-                                                        float(self.quantity * self.basket.per_worker_fee)))
+            ledger.reverse(self)
 
             UserDailyWork.objects.filter(id=self.user_daily_work.id).update(
                 amount=F('amount') - float(self.quantity * self.basket.per_worker_fee))
@@ -214,9 +218,26 @@ class RawMaterialHistory(BaseModel):
         verbose_name = "Xomashyo tarixi "
         verbose_name_plural = "Xomashyo tarixi "
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['date']),
+            models.Index(fields=['creator', 'date']),
+        ]
+
+    def summary_buckets(self):
+        return [
+            ("factory", summary_cache.ALL, self.date),
+            ("mixed", self.creator_id, self.date),
+        ]
+
+    def index_row(self):
+        return transaction_index.row(self, "FA-RM", "factory", "raw_material", "outcome")
+
+    def ledger_legs(self):
+        return [Leg(self.creator, "balance", -self.amount, self.currency_type)]
 
     def save(self, *args, **kwargs):
         with transaction.atomic():
+            stale = summary_cache.stored_buckets(self)
             if self.pk:
                 prev = RawMaterialHistory.objects.get(pk=self.pk)
 
@@ -224,18 +245,15 @@ class RawMaterialHistory(BaseModel):
                 # prev.raw_material.weight = F('weight') - prev.weight
                 # prev.raw_material.save(update_fields=['weight'])
                 # prev.raw_material.refresh_from_db()
-
-                User.objects.filter(id=prev.creator.id).update(
-                    balance=F('balance') + convert_currency(prev.currency_type, prev.creator.currency_type,
-                                                            prev.amount))
             else:
                 message = f"🏭 Янги хомашё таъминоти қўшилди 🆕\n🏷️ {self.raw_material.name} \n⚖️ {self.weight} \n💰 {self.amount} \n📞 {self.description}"
                 Telegram.send_log(message, app_button=True)
 
             super().save(*args, **kwargs)
 
-            User.objects.filter(id=self.creator.id).update(
-                balance=F('balance') - convert_currency(self.currency_type, self.creator.currency_type, self.amount))
+            ledger.repost(self, self.ledger_legs())
+            transaction_index.index(self)
+            summary_cache.touch(self, stale)
             # if self.raw_material.currency_type != self.currency_type:
             #     self.amount = convert_currency(self.raw_material.currency_type, self.currency_type, self.amount)
 
@@ -248,8 +266,9 @@ class RawMaterialHistory(BaseModel):
         with transaction.atomic():
             RawMaterial.objects.filter(id=self.raw_material.id).update(weight=F('weight') - self.weight)
 
-            User.objects.filter(id=self.creator.id).update(
-                balance=F('balance') + convert_currency(self.currency_type, self.creator.currency_type, self.amount))
+            ledger.reverse(self)
+            transaction_index.remove(self)
+            summary_cache.touch(self)
 
             super().delete(*args, **kwargs)
 
@@ -289,38 +308,54 @@ class PayDebt(BaseModel):
         verbose_name_plural = "Qarzlar to'lash "
         ordering = ['-date']
 
-    def save(self, *args, **kwargs):
-        with transaction.atomic():
-            if self.pk:
-                prev = PayDebt.objects.get(pk=self.pk)
+    def summary_buckets(self):
+        return [
+            ("factory", summary_cache.ALL, summary_cache.created_day(self)),
+        ]
 
-                Client.objects.filter(id=prev.client.id).update(
-                    debt=F("debt") + convert_currency(prev.currency_type, prev.client.currency_type, prev.amount))
+    def index_row(self):
+        return transaction_index.row(self, "FA-PD", "factory", "pay_debt", "income")
 
-                User.objects.filter(id=prev.creator.id).update(
-                    balance=F('balance') - convert_currency(prev.currency_type, prev.creator.currency_type, prev.amount))
-            else:
+    def ledger_legs(self):
+        return [
+            Leg(self.client, "debt", -self.amount, self.currency_type),
+            Leg(self.creator, "balance", self.amount, self.currency_type),
+        ]
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            stale = summary_cache.stored_buckets(self)
+            if not self.pk:
                 message = f"🏭 Мижоз қарзини тўлади 🆕\n🏷️ {self.client.full_name} \n💰 {self.amount} {self.currency_type}"
                 Telegram.send_log(message, app_button=True)
 
             super().save(*args, **kwargs)
 
-            Client.objects.filter(id=self.client.id).update(
-                debt=F("debt") - convert_currency(self.currency_type, self.client.currency_type, self.amount)
-            )
-
-            User.objects.filter(id=self.creator.id).update(
-                balance=F('balance') + convert_currency(self.currency_type, self.creator.currency_type, self.amount))
+            ledger.repost(self, self.ledger_legs())
+            transaction_index.index(self)
+            summary_cache.touch(self, stale)
 
     def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            ledger.reverse(self)
+            transaction_index.remove(self)
+            summary_cache.touch(self)
+            super().delete(*args, **kwargs)
 
-        Client.objects.filter(id=self.client.id).update(
-            debt=F("debt") + convert_currency(self.currency_type, self.client.currency_type, self.amount))
 
-        User.objects.filter(id=self.creator.id).update(
-            balance=F('balance') - convert_currency(self.currency_type, self.creator.currency_type, self.amount))
+class SaleQuerySet(models.QuerySet):
+    def with_totals(self):
+        """
+        Sotuv summasi va savatlar soni SQL da hisoblanadi, total_amount/total_quantity/debt_amount
+        shu qiymatlarni ishlatadi. Faqat o'qish uchun: sale_items o'zgarsa annotatsiya eskiradi.
+        """
+        return self.annotate(
+            items_amount=Coalesce(Sum("sale_items__amount"), Value(0.0), output_field=models.FloatField()),
+            items_quantity=Coalesce(Sum("sale_items__quantity"), Value(0)),
+        )
 
-        super().delete(*args, **kwargs)
+    def with_items(self):
+        return self.select_related("client").prefetch_related("sale_items")
 
 
 class Sale(BaseModel):
@@ -329,17 +364,28 @@ class Sale(BaseModel):
     payed_amount= models.FloatField(default=0)
     date = models.DateField()
 
+    objects = SaleQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Sotuv"
         verbose_name_plural = "Sotuvlar"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['date']),
+            models.Index(fields=['creator', 'date']),
+        ]
 
     def __str__(self):
         return f"Sotuv #{self.pk} | {self.client.full_name if self.client is not None else 'Noma’lum'}"
 
+    def items_sum(self, field):
+        return sum(getattr(item, field) for item in self.sale_items.all())
+
     @property
     def total_amount(self):
-        return sum(item.amount for item in self.sale_items.all())
+        if hasattr(self, "items_amount"):
+            return self.items_amount
+        return self.items_sum("amount")
 
     @property
     def debt_amount(self):
@@ -347,66 +393,48 @@ class Sale(BaseModel):
 
     @property
     def total_quantity(self):
-        return sum(item.quantity for item in self.sale_items.all())
+        if hasattr(self, "items_quantity"):
+            return self.items_quantity
+        return self.items_sum("quantity")
+
+    def summary_buckets(self):
+        return [
+            ("factory", summary_cache.ALL, self.date),
+            ("mixed", self.creator_id, self.date),
+        ]
+
+    def index_row(self):
+        return transaction_index.row(self, "FA-SL", "factory", "sale", "income", amount=self.items_sum("amount"),
+                                     currency_type="UZS")
+
+    def ledger_legs(self):
+        # To'langan qismi sotuvchi balansiga, qolgani mijoz qarziga (so'mda).
+        # with_totals() annotatsiyasi eskirgan bo'lishi mumkin, shuning uchun summa qayta hisoblanadi
+        legs = [Leg(self.creator, "balance", self.payed_amount, "UZS")]
+        if self.client:
+            legs.append(Leg(self.client, "debt", self.items_sum("amount") - self.payed_amount, "UZS"))
+        return legs
 
     def save(self, *args, **kwargs):
         with transaction.atomic():
-            if self.pk:
-                prev = Sale.objects.get(pk=self.pk)
-
-                User.objects.filter(id=prev.creator.id).update(
-                    balance=F('balance') - convert_currency("UZS", prev.creator.currency_type, prev.payed_amount)
-                )
-
-                if prev.client:
-                    Client.objects.filter(id=self.client.id).update(
-                        debt=F('debt') - convert_currency("UZS", prev.client.currency_type, prev.debt_amount)
-                    )
-
+            stale = summary_cache.stored_buckets(self)
             super().save(*args, **kwargs)
 
-            User.objects.filter(id=self.creator.id).update(
-                balance=F('balance') + convert_currency("UZS", self.creator.currency_type, self.payed_amount)
-            )
+            ledger.repost(self, self.ledger_legs())
+            transaction_index.index(self)
+            summary_cache.touch(self, stale)
 
     def desave(self, pre=False):
-        with transaction.atomic():
-            if self.debt_amount > 0:
-                if self.client:
-                    if pre:
-                        print(self.payed_amount)
-                        Client.objects.filter(id=self.client.id).update(
-                            debt=F('debt') + convert_currency("UZS", self.client.currency_type, self.payed_amount)
-                        )
-                    else:
-                        print(self.payed_amount)
-                        Client.objects.filter(id=self.client.id).update(
-                            debt=F('debt') - convert_currency("UZS", self.client.currency_type, self.payed_amount)
-                        )
-                else:
-                    raise ValidationError({"error": "Agar qarz miqdori bo'lsa, Client majburiy!"})
-
-    # def deupdate(self, pre=False):
-    #     if pre:
-    #         Client.objects.filter(id=self.client.id).update(
-    #             debt=F('debt') - convert_currency("UZS", self.client.currency_type, self.total_amount)
-    #         )
-    #     else:
-    #         Client.objects.filter(id=self.client.id).update(
-    #             debt=F('debt') + convert_currency("UZS", self.client.currency_type, self.total_amount)
-    #         )
-
+        if self.debt_amount > 0 and not self.client:
+            raise ValidationError({"error": "Agar qarz miqdori bo'lsa, Client majburiy!"})
 
     def delete(self, *args, **kwargs):
         with transaction.atomic():
-            Client.objects.filter(id=self.client.id).update(
-                debt=F('debt') - convert_currency("UZS", self.client.currency_type, self.debt_amount)
-            )
-            User.objects.filter(id=self.creator.id).update(
-                balance=F('balance') - convert_currency("UZS", self.creator.currency_type, self.payed_amount)
-            )
             for item in self.sale_items.all():
                 item.delete()
+            ledger.reverse(self)
+            transaction_index.remove(self)
+            summary_cache.touch(self)
             super().delete(*args, **kwargs)
 
 
@@ -436,10 +464,9 @@ class SaleItem(models.Model):
 
             Basket.objects.filter(id=self.basket.id).update(quantity=F('quantity') - self.quantity)
 
-            if self.sale.client:
-                Client.objects.filter(id=self.sale.client.id).update(
-                    debt=F('debt') + convert_currency("UZS", self.sale.client.currency_type, self.amount)
-                )
+            ledger.repost(self.sale, self.sale.ledger_legs())
+            transaction_index.index(self.sale)
+            summary_cache.touch(self.sale)
 
     def delete(self, *args, **kwargs):
         with transaction.atomic():
@@ -447,14 +474,9 @@ class SaleItem(models.Model):
 
             Basket.objects.filter(id=self.basket.id).update(quantity=F('quantity') + self.quantity)
 
-            if self.sale.client:
-                Client.objects.filter(id=self.sale.client.id).update(
-                    debt=F('debt') - convert_currency("UZS", self.sale.client.currency_type, self.amount)
-                )
-            else:
-                User.objects.filter(id=self.sale.creator.id).update(
-                    balance=F('balance') - convert_currency("UZS", self.sale.creator.currency_type, self.amount)
-                )
+            ledger.repost(self.sale, self.sale.ledger_legs())
+            transaction_index.index(self.sale)
+            summary_cache.touch(self.sale)
 
     def __str__(self):
         return f"{self.sale.client.full_name if self.sale.client is not None else 'Noma’lum'} - {self.basket.name}"
@@ -473,38 +495,45 @@ class SalaryPayment(BaseModel):
         verbose_name = "Oylik maosh "
         verbose_name_plural = "Oylik maosh "
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['date']),
+            models.Index(fields=['creator', 'date']),
+        ]
 
     def __str__(self):
         return self.worker.first_name
 
-    def save(self, *args, **kwargs):
-
-        if self.pk:
-            prev = SalaryPayment.objects.get(pk=self.pk)
+    def summary_buckets(self):
+        return [
+            ("factory", summary_cache.ALL, summary_cache.created_day(self)),
+            ("mixed", self.creator_id, self.date),
+        ]
 
-            Worker.objects.filter(id=prev.worker.id).update(
-                balance=F('balance') + convert_currency(prev.currency_type, prev.worker.currency_type, prev.amount))
+    def index_row(self):
+        return transaction_index.row(self, "FA-SP", "factory", "worker_salary", "outcome")
 
-            User.objects.filter(id=prev.creator.id).update(
-                balance=F('balance') + convert_currency(prev.currency_type, prev.creator.currency_type, prev.amount))
+    def ledger_legs(self):
+        return [
+            Leg(self.worker, "balance", -self.amount, self.currency_type),
+            Leg(self.creator, "balance", -self.amount, self.currency_type),
+        ]
 
-        else:
-            message = f"🏭 Янги ишчи маоши қўшилди 🆕\n👨🏼‍🏭 {self.worker.full_name} \n💰 {self.amount} {self.currency_type}\n👤 {self.creator.get_full_name()}"
-            Telegram.send_log(message, app_button=True)
-
-        super().save(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            stale = summary_cache.stored_buckets(self)
+            if not self.pk:
+                message = f"🏭 Янги ишчи маоши қўшилди 🆕\n👨🏼‍🏭 {self.worker.full_name} \n💰 {self.amount} {self.currency_type}\n👤 {self.creator.get_full_name()}"
+                Telegram.send_log(message, app_button=True)
 
-        Worker.objects.filter(id=self.worker.id).update(
-            balance=F('balance') - convert_currency(self.currency_type, self.worker.currency_type, self.amount))
+            super().save(*args, **kwargs)
 
-        User.objects.filter(id=self.creator.id).update(
-            balance=F('balance') - convert_currency(self.currency_type, self.creator.currency_type, self.amount))
+            ledger.repost(self, self.ledger_legs())
+            transaction_index.index(self)
+            summary_cache.touch(self, stale)
 
     def delete(self, *args, **kwargs):
-        Worker.objects.filter(id=self.worker.id).update(
-            balance=F('balance') + convert_currency(self.currency_type, self.worker.currency_type, self.amount))
-
-        User.objects.filter(id=self.creator.id).update(
-            balance=F('balance') + convert_currency(self.currency_type, self.creator.currency_type, self.amount))
-
-        super().delete(*args, **kwargs)
+        with transaction.atomic():
+            ledger.reverse(self)
+            transaction_index.remove(self)
+            summary_cache.touch(self)
+            super().delete(*args, **kwargs)
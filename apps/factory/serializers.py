@@ -4,6 +4,7 @@ from rest_framework.serializers import ModelSerializer, ValidationError, CharFie
     PrimaryKeyRelatedField, SerializerMethodField
 from .models import *
 from apps.main.models import Expense, Income
+from apps.common.services.logging import Telegram
 
 
 # Worker Serializers
@@ -203,7 +204,7 @@ class SaleSerializer(ModelSerializer):
         fields = ['id', 'client', 'description', 'total_amount', 'date' ,'sale_items','payed_amount']
 
     def create(self, validated_data):
-        with transaction.atomic():
+        with transaction.atomic(), Telegram.batch():
             sale_items_data = validated_data.pop('sale_items')
             sale = Sale.objects.create(**validated_data)
 
@@ -216,7 +217,7 @@ class SaleSerializer(ModelSerializer):
 
 
     def update(self, instance, validated_data):
-        with transaction.atomic():
+        with transaction.atomic(), Telegram.batch():
             sale_items_data = validated_data.pop('sale_items', [])
 
             if validated_data.get('client') and validated_data.get('client') != instance.client:
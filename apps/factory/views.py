@@ -11,11 +11,13 @@ from datetime import datetime
 
 from .serializers import *
 from apps.users.permissions import IsFactoryAdmin, IsCEO
+from apps.common.filters import DateRangeFilterBackend
+from apps.common.services import summary_cache
+from apps.common.utils import convert_currency, convert_currency_on, convert_values
 from apps.main.models import Expense, Income
 from rest_framework.filters import *
 from django_filters.rest_framework import DjangoFilterBackend
 from apps.main.serializers import ExpenseSerializer, IncomeSerializer, TransactionHistorySerializer
-from django.utils.dateparse import parse_date
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -59,45 +61,24 @@ class BasketRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 # Daily Work Views
 class DailyWorkListCreateView(ListCreateAPIView):
     queryset = UserDailyWork.objects.all()
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filter_backends = [DateRangeFilterBackend, DjangoFilterBackend, OrderingFilter, SearchFilter]
     ordering_fields = ['created_at', 'worker']
     search_fields = ['worker__first_name', 'worker__last_name', 'worker__phone_number']
     permission_classes = [IsFactoryAdmin | IsCEO]
+    keyset_field = "-created_at"
 
     def get_queryset(self):
         queryset = UserDailyWork.objects.all()
         
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
         worker_id = self.request.query_params.get('worker')
 
         if worker_id:
             queryset = queryset.filter(worker__id=worker_id)
 
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__lte=end_date)
-
         return queryset
 
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'worker', openapi.IN_QUERY,
                 description="Filter by Worker ID",
@@ -197,8 +178,9 @@ class FactoryExpenseListCreateView(ListCreateAPIView):
     serializer_class = ExpenseSerializer
     queryset = Expense.objects.all()
     permission_classes = [IsFactoryAdmin | IsCEO]
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filter_backends = [DateRangeFilterBackend, DjangoFilterBackend, OrderingFilter, SearchFilter]
     ordering_fields = ['created_at', 'amount']
+    keyset_field = "-created_at"
     search_fields=['description','reason']
 
 
@@ -209,33 +191,10 @@ class FactoryExpenseListCreateView(ListCreateAPIView):
 
     def get_queryset(self):
         queryset = Expense.objects.filter(section="factory")
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__lte=end_date)
-
         return queryset
 
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'search',
                 openapi.IN_QUERY,
@@ -259,39 +218,17 @@ class FactoryIncomeListCreateView(ListCreateAPIView):
     serializer_class = IncomeSerializer
     queryset = Income.objects.all()
     permission_classes = [IsFactoryAdmin | IsCEO]
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filter_backends = [DateRangeFilterBackend, DjangoFilterBackend, OrderingFilter, SearchFilter]
     ordering_fields = ['created_at', 'amount']
     search_fields = ['description','reason']
+    keyset_field = "-created_at"
 
     def get_queryset(self):
         queryset = Income.objects.filter(section="factory")
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__lte=end_date)
-
         return queryset
 
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'search',
                 openapi.IN_QUERY,
@@ -319,12 +256,10 @@ class ClientListCreateView(ListCreateAPIView):
     serializer_class = ClientSerializer
     queryset = Client.objects.all()
     permission_classes = [IsFactoryAdmin | IsCEO]
-    filter_backends = [DjangoFilterBackend,  SearchFilter]
+    filter_backends = [DateRangeFilterBackend, DjangoFilterBackend,  SearchFilter]
     search_fields = ['first_name', 'last_name', 'phone_number']
 
     def get_queryset(self):
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
         has_debt = self.request.query_params.get('has_debt')
 
         if has_debt:
@@ -333,32 +268,10 @@ class ClientListCreateView(ListCreateAPIView):
             elif has_debt.lower() == 'false':
                 self.queryset = self.queryset.filter(debt__lte=0)
 
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__lte=end_date)
-
         return self.queryset
 
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date',
-                openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date',
-                openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'has_debt',
                 openapi.IN_QUERY,
@@ -381,7 +294,7 @@ class ClientRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 # Pay Debt Views
 class PayDebtListCreateView(ListCreateAPIView):
     permission_classes = [IsFactoryAdmin | IsCEO]
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [DateRangeFilterBackend, DjangoFilterBackend, SearchFilter]
     search_fields = ['client__first_name', 'client__last_name', 'client__phone_number']
 
     def get_serializer_class(self):
@@ -394,33 +307,10 @@ class PayDebtListCreateView(ListCreateAPIView):
 
     def get_queryset(self):
         queryset = PayDebt.objects.all()
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__lte=end_date)
-
         return queryset
 
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'search',
                 openapi.IN_QUERY,
@@ -508,7 +398,7 @@ class PayedDebtRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 class SalaryPaymentListCreateView(ListCreateAPIView):
     queryset = SalaryPayment.objects.all()
     permission_classes = [IsFactoryAdmin | IsCEO]
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filter_backends = [DateRangeFilterBackend, DjangoFilterBackend, OrderingFilter, SearchFilter]
     ordering_fields = ['worker', 'worker__balance','amount']
     searching_fields=['worker__first_name','worker__last_name','worker__phone_number']
 
@@ -520,34 +410,8 @@ class SalaryPaymentListCreateView(ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(creator=self.request.user)
 
-    def get_queryset(self):
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__lte=end_date)
-
-        return self.queryset
-
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'search',
                 openapi.IN_QUERY,
@@ -574,7 +438,7 @@ class SalaryPaymentRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 
 # Sale Views
 class SaleListCreateView(ListCreateAPIView):
-    queryset = Sale.objects.all()
+    queryset = Sale.objects.with_totals().with_items()
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -595,6 +459,12 @@ class SaleRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
     queryset = Sale.objects.all()
     serializer_class = SaleSerializer
 
+    def get_queryset(self):
+        # Annotatsiya faqat o'qishda: yangilashda sale_items o'zgaradi va summa qayta hisoblanadi
+        if self.request.method == 'GET':
+            return Sale.objects.with_totals().with_items()
+        return super().get_queryset()
+
 # SaleItem uchun CRUD
 class SaleItemListCreateView(ListCreateAPIView):
     queryset = SaleItem.objects.all()
@@ -606,6 +476,77 @@ class SaleItemRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 
 
 
+def factory_summary_rows(start_date, end_date):
+    """
+    FactorySummaryAPIView qatorlari: (kun, "incomes"|"outcomes", qator), summary_cache.collect uchun.
+    """
+    # outcome: Expense
+
+    expenses = Expense.objects.filter(section='factory', created_at__range=[start_date, end_date])
+    salaries = SalaryPayment.objects.filter(created_at__range=[start_date, end_date]).select_related('worker')
+    raw_material = RawMaterialHistory.objects.filter(date__range=[start_date, end_date]).select_related('raw_material')
+
+    for expense in expenses:
+        yield summary_cache.created_day(expense), "outcomes", {
+            'id': f"EX-{expense.id}",
+            'reason': f"{expense.reason} | {expense.description}",
+            'amount': expense.amount,
+            'currency_type': expense.currency_type,
+            'date': expense.created_at.strftime('%Y-%m-%d')
+        }
+
+    for salary in salaries:
+        yield summary_cache.created_day(salary), "outcomes", {
+            'id': f"SP-{salary.id}",
+            'reason': f"{salary.worker.full_name} га маош учун | {salary.description}",
+            'amount': salary.amount,
+            'currency_type': salary.currency_type,
+            'date': salary.created_at.strftime('%Y-%m-%d')
+        }
+
+    for raw in raw_material:
+        yield raw.date, "outcomes", {
+            'id': f"RM-{raw.id}",
+            'reason': f"{raw.weight} кг {raw.raw_material.name} учун | {raw.description}",
+            'amount': raw.amount,
+            'currency_type': raw.currency_type,
+            'date': raw.created_at.strftime('%Y-%m-%d')
+        }
+
+    # income: Income
+
+    incomes = Income.objects.filter(section='factory', created_at__range=[start_date, end_date])
+    sales = Sale.objects.with_totals().filter(date__range=[start_date, end_date]).select_related('client')
+    pay_debts = PayDebt.objects.filter(created_at__range=[start_date, end_date]).select_related('client')
+
+    for income in incomes:
+        yield summary_cache.created_day(income), "incomes", {
+            'id': f"IN-{income.id}",
+            'reason': income.reason,
+            'amount': income.amount,
+            'currency_type': income.currency_type,
+            'date': income.created_at.strftime('%Y-%m-%d')
+        }
+
+    for sale in sales:
+        yield sale.date, "incomes", {
+            'id': f"SA-{sale.id}",
+            'reason': f"{sale.client.full_name if sale.client else 'Номаълум мижоз'} га сотув учун",
+            'amount': sale.total_amount,
+            'currency_type': "UZS",
+            'date': sale.date.strftime('%Y-%m-%d')
+        }
+
+    for pay_debt in pay_debts:
+        yield summary_cache.created_day(pay_debt), "incomes", {
+            'id': f"PD-{pay_debt.id}",
+            'reason': f"{pay_debt.client.full_name} {pay_debt.amount} {'сўм' if pay_debt.currency_type == 'UZS' else 'рубль' if pay_debt.currency_type == 'RUB' else 'АҚШ доллари'} қарзини тўлади",
+            'amount': pay_debt.amount,
+            'currency_type': pay_debt.currency_type,
+            'date': pay_debt.created_at.strftime('%Y-%m-%d')
+        }
+
+
 class FactorySummaryAPIView(APIView):
     permission_classes = [IsFactoryAdmin | IsCEO]
 
@@ -707,103 +648,32 @@ class FactorySummaryAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        total_income = 0.00
-        total_outcome = 0.00
-
-        # outcome: Expense
-
-        outcomes_list = []
-
-        expenses = Expense.objects.filter(section='factory', created_at__range=[start_date, end_date])
-        salaries = SalaryPayment.objects.filter(created_at__range=[start_date, end_date])
-        raw_material = RawMaterialHistory.objects.filter(date__range=[start_date, end_date])
-
-
-        for expense in expenses:
-            total_outcome += convert_currency(expense.currency_type, 'UZS', expense.amount)
-            outcomes_list.append({
-                'id': f"EX-{expense.id}",
-                'reason': f"{expense.reason} | {expense.description}",
-                'amount': expense.amount,
-                'currency_type': expense.currency_type,
-                'date': expense.created_at.strftime('%Y-%m-%d')
-            })
-
-        for salary in salaries:
-            total_outcome += convert_currency(salary.currency_type, 'UZS', salary.amount)
-            outcomes_list.append({
-                'id': f"SP-{salary.id}",
-                'reason': f"{salary.worker.full_name} га маош учун | {salary.description}",
-                'amount': salary.amount,
-                'currency_type': salary.currency_type,
-                'date': salary.created_at.strftime('%Y-%m-%d')
-            })
-
-        for raw in raw_material:
-            total_outcome += convert_currency(raw.currency_type, 'UZS', raw.amount)
-            outcomes_list.append({
-                'id': f"RM-{raw.id}",
-                'reason': f"{raw.weight} кг {raw.raw_material.name} учун | {raw.description}",
-                'amount': raw.amount,
-                'currency_type': raw.currency_type,
-                'date': raw.created_at.strftime('%Y-%m-%d')
-            })
-
-        # income: Income
-
-        incomes_list = []
-
-        incomes = Income.objects.filter(section='factory', created_at__range=[start_date, end_date])
-        sales = Sale.objects.filter(date__range=[start_date, end_date])
-        pay_debts = PayDebt.objects.filter(created_at__range=[start_date, end_date])
-
-        for income in incomes:
-            total_income += convert_currency(income.currency_type, 'UZS', income.amount)
-            incomes_list.append({
-                'id': f"IN-{income.id}",
-                'reason': income.reason,
-                'amount': income.amount,
-                'currency_type': income.currency_type,
-                'date': income.created_at.strftime('%Y-%m-%d')
-            })
-
-        for sale in sales:
-            total_income += sale.total_amount
-            incomes_list.append({
-                'id': f"SA-{sale.id}",
-                'reason': f"{sale.client.full_name if sale.client else 'Номаълум мижоз'} га сотув учун",
-                'amount': sale.total_amount,
-                'currency_type': "UZS",
-                'date': sale.date.strftime('%Y-%m-%d')
-            })
-
-        for pay_debt in pay_debts:
-            total_income += pay_debt.amount
-            incomes_list.append({
-                'id': f"PD-{pay_debt.id}",
-                'reason': f"{pay_debt.client.full_name} {pay_debt.amount} {'сўм' if pay_debt.currency_type == 'UZS' else 'рубль' if pay_debt.currency_type == 'RUB' else 'АҚШ доллари'} қарзини тўлади",
-                'amount': pay_debt.amount,
-                'currency_type': "UZS",
-                'date': pay_debt.created_at.strftime('%Y-%m-%d')
-            })
+        rows = summary_cache.collect("factory", summary_cache.ALL, start_date.date(), end_date.date(),
+                                     factory_summary_rows)
+        incomes_list, outcomes_list = rows["incomes"], rows["outcomes"]
+
+        _, total_income = convert_values(
+            (item['currency_type'], item['amount'], item['date']) for item in incomes_list)
+        _, total_outcome = convert_values(
+            (item['currency_type'], item['amount'], item['date']) for item in outcomes_list)
 
         return Response({
             'start_date': start_date_str,
             'end_date': end_date_str,
             'balance': {
-                'uzs': convert_currency(request.user.currency_type, "UZS", request.user.balance),
-                'usd': convert_currency(request.user.currency_type, "USD", request.user.balance),
-                'rub': convert_currency(request.user.currency_type, "RUB", request.user.balance)
+                'uzs': convert_currency(request.user.currency_type, "UZS", request.user.current_balance),
+                'usd': convert_currency(request.user.currency_type, "USD", request.user.current_balance),
+                'rub': convert_currency(request.user.currency_type, "RUB", request.user.current_balance)
             },
             'total_income': {
                 'uzs': total_income,
-                'usd': convert_currency("UZS", "USD", total_income),
-                'rub': convert_currency("UZS", "RUB", total_income)
+                'usd': convert_currency_on("UZS", "USD", total_income, end_date),
+                'rub': convert_currency_on("UZS", "RUB", total_income, end_date)
             },
             'total_outcome': {
                 'uzs': total_outcome,
-                'usd': convert_currency("UZS", "USD", total_outcome),
-                'rub': convert_currency("UZS", "RUB", total_outcome)
+                'usd': convert_currency_on("UZS", "USD", total_outcome, end_date),
+                'rub': convert_currency_on("UZS", "RUB", total_outcome, end_date)
             },
             'incomes': TransactionHistorySerializer(incomes_list, many=True).data,
             'outcomes': TransactionHistorySerializer(outcomes_list, many=True).data,
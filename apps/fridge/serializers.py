@@ -25,11 +25,11 @@ class RefrigeratorDetailSerializer(ModelSerializer):
         fields = ['id', 'name', 'description', 'year', 'created_at', 'updated_at', 'expenses', 'electricity_bills']
 
     def get_expenses(self, obj):
-        expenses = Expense.objects.filter(section='fridge', reason=f"expense|{obj.id}")
+        expenses = Expense.objects.filter(section='fridge', refrigerator=obj, reason__startswith="expense|")
         return ExpenseSerializer(expenses, many=True).data
 
     def get_electricity_bills(self, obj):
-        bills = Expense.objects.filter(section='fridge', reason=f'electricity|{obj.id}')
+        bills = Expense.objects.filter(section='fridge', refrigerator=obj, reason__startswith="electricity|")
         serializer = ExpenseSerializer(bills, many=True)
 
         serialized_data = serializer.data
@@ -49,12 +49,12 @@ class ElectricityBillPostSerializer(ModelSerializer):
         read_only_fields = ['reason']
 
     def create(self, validated_data):
-        refrigerator = validated_data.pop('refrigerator')
+        refrigerator = validated_data['refrigerator']
         validated_data['reason'] = f"electricity|{refrigerator.id}"
         return super().create(validated_data)
 
     def update(self, instance, validated_data):
-        refrigerator = validated_data.pop('refrigerator', None)
+        refrigerator = validated_data.get('refrigerator')
 
         if refrigerator is not None:
             validated_data['reason'] = f"electricity|{refrigerator.id}"
@@ -76,12 +76,9 @@ class ElectricityBillSerializer(ModelSerializer):
         read_only_fields = ['status']
 
     def get_refrigerator(self, obj):
-        try:
-            reason, refrigerator_id = map(str, obj.reason.split("|"))
-            refrigerator = Refrigerator.objects.get(id=refrigerator_id)
-            return RefrigeratorSerializer(refrigerator).data
-        except Refrigerator.DoesNotExist:
+        if obj.refrigerator is None:
             return None
+        return RefrigeratorSerializer(obj.refrigerator).data
 
 
 # Expense Serializers
@@ -98,7 +95,7 @@ class FridgeExpensePostSerializer(ModelSerializer):
         read_only_fields = ['updated_at', 'created_at', 'status', 'section']
 
     def create(self, validated_data):
-        refrigerator = validated_data.pop('refrigerator', None)
+        refrigerator = validated_data.get('refrigerator')
         if refrigerator:
             validated_data['reason'] = f"expense|{refrigerator.id}"
         else:
@@ -117,15 +114,9 @@ class FridgeExpenseSerializer(ModelSerializer):
         read_only_fields = ['status', 'section']
 
     def get_refrigerator(self, obj):
-        try:
-            if obj.reason == "Muzlatkich uchun xarajat" or obj.reason == "expense|unknown":
-                return None
-            else:
-                reason, refrigerator_id = map(str, obj.reason.split("|"))
-                refrigerator = Refrigerator.objects.get(id=refrigerator_id)
-                return RefrigeratorSerializer(refrigerator).data
-        except Refrigerator.DoesNotExist:
+        if obj.refrigerator is None:
             return None
+        return RefrigeratorSerializer(obj.refrigerator).data
 
 
 # Income Serializer
@@ -139,12 +130,9 @@ class FridgeIncomeSerializer(ModelSerializer):
         read_only_fields = ['status', 'section']
 
     def get_refrigerator(self, obj):
-        try:
-            reason, refrigerator_id = map(str, obj.reason.split("|"))
-            refrigerator = Refrigerator.objects.get(id=refrigerator_id)
-            return RefrigeratorSerializer(refrigerator).data
-        except Refrigerator.DoesNotExist:
+        if obj.refrigerator is None:
             return None
+        return RefrigeratorSerializer(obj.refrigerator).data
 
 class FridgeIncomePostSerializer(ModelSerializer):
     refrigerator = PrimaryKeyRelatedField(
@@ -158,7 +146,7 @@ class FridgeIncomePostSerializer(ModelSerializer):
         read_only_fields = ['updated_at', 'created_at', 'status', 'section']
 
     def create(self, validated_data):
-        refrigerator = validated_data.pop('refrigerator')
+        refrigerator = validated_data.get('refrigerator')
         if not refrigerator:
             validated_data['reason'] = f"Музлаткич учун кирим"
         else:
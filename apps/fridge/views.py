@@ -7,7 +7,9 @@ from rest_framework.views import APIView
 
 from .serializers import *
 from apps.users.permissions import IsFridgeAdmin, IsCEO
-from django.utils.dateparse import parse_date
+from apps.common.filters import DateRangeFilterBackend
+from apps.common.services import summary_cache
+from apps.common.utils import convert_currency, convert_currency_on, convert_values
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from datetime import timedelta
@@ -51,8 +53,9 @@ class RefrigatorRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 # Expense Views
 class FridgeExpenseListCreateView(ListCreateAPIView):
     permission_classes = [IsFridgeAdmin | IsCEO]
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filter_backends = [DateRangeFilterBackend, DjangoFilterBackend, OrderingFilter]
     ordering_fields = ['created_at', 'price']
+    keyset_field = "-created_at"
 
     def get_serializer_class(self):
         if self.request.method == "GET":
@@ -60,39 +63,17 @@ class FridgeExpenseListCreateView(ListCreateAPIView):
         return FridgeExpensePostSerializer
 
     def get_queryset(self):
-        queryset = Expense.objects.filter(section='fridge', reason__startswith='expense|')
+        queryset = Expense.objects.filter(section='fridge', reason__startswith='expense|').select_related('refrigerator')
 
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
         refrigerator_id = self.request.query_params.get('refrigerator')
 
         if refrigerator_id:
-            queryset = queryset.filter(reason__icontains=f"expense|{refrigerator_id}")
-
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__lte=end_date)
+            queryset = queryset.filter(refrigerator_id=refrigerator_id)
 
         return queryset
 
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'refrigerator', openapi.IN_QUERY,
                 description="Filter by refrigerator ID",
@@ -117,42 +98,20 @@ class FridgeExpenseRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 # Income Views
 class FridgeIncomeListCreateView(ListCreateAPIView):
     permission_classes = [IsFridgeAdmin | IsCEO]
+    filter_backends = [DateRangeFilterBackend]
+    keyset_field = "-created_at"
 
     def get_queryset(self):
-        queryset = Income.objects.filter(section='fridge')
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
+        queryset = Income.objects.filter(section='fridge').select_related('refrigerator')
         refrigerator_id = self.request.query_params.get('refrigerator')
 
         if refrigerator_id:
-            queryset = queryset.filter(reason__icontains=f"income|{refrigerator_id}")
-
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__lte=end_date)
+            queryset = queryset.filter(refrigerator_id=refrigerator_id)
 
         return queryset
 
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING,
-                format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING,
-                format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'refrigerator', openapi.IN_QUERY,
                 description="Filter by refrigerator ID",
@@ -182,41 +141,21 @@ class FridgeIncomeRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 # Electricity bill views
 class ElectricityBillListCreateView(ListCreateAPIView):
     permission_classes = [IsFridgeAdmin | IsCEO]
+    filter_backends = [DateRangeFilterBackend]
+    keyset_field = "-created_at"
 
     def get_queryset(self):
-        queryset = Expense.objects.filter(section='fridge', reason__startswith="electricity|")
+        queryset = Expense.objects.filter(section='fridge', reason__startswith="electricity|").select_related('refrigerator')
 
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
         refrigerator_id = self.request.query_params.get('refrigerator')
 
         if refrigerator_id:
-            queryset = queryset.filter(reason__icontains=f"electricity|{refrigerator_id}")
-
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__lte=end_date)
+            queryset = queryset.filter(refrigerator_id=refrigerator_id)
 
         return queryset
 
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'refrigerator', openapi.IN_QUERY,
                 description="Filter by refrigerator ID",
@@ -252,6 +191,57 @@ class ElectricityBillRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 
 
 # Fridge Summary View
+def fridge_summary_rows(start_date, end_date):
+    """
+    FridgeSummaryAPIView qatorlari: (kun, "incomes"|"outcomes", qator), summary_cache.collect uchun.
+    """
+    # outcome: Expense
+
+    expenses = Expense.objects.filter(section='fridge', reason__startswith="expense|",
+                                     created_at__range=[start_date, end_date])
+    electricity_bills = Expense.objects.filter(section='fridge', reason__startswith="electricity|",
+                                               created_at__range=[start_date, end_date]).select_related('refrigerator')
+
+    for expense in expenses:
+        yield summary_cache.created_day(expense), "outcomes", {
+            'id': f"EX-{expense.id}",
+            'reason': expense.description,
+            'amount': expense.amount,
+            'currency_type': expense.currency_type,
+            'date': expense.created_at.strftime('%Y-%m-%d')
+        }
+
+    for bill in electricity_bills:
+        if bill.refrigerator:
+            reason = f"{bill.refrigerator.name} га электр учун тўлов | {bill.description}"
+        else:
+            reason = f"Электр учун тўлов | {bill.description}"
+        yield summary_cache.created_day(bill), "outcomes", {
+            'id': f"EB-{bill.id}",
+            'reason': reason,
+            'amount': bill.amount,
+            'currency_type': bill.currency_type,
+            'date': bill.created_at.strftime('%Y-%m-%d')
+        }
+
+    # income: Income
+
+    incomes = Income.objects.filter(section='fridge', created_at__range=[start_date, end_date]).select_related('refrigerator')
+
+    for income in incomes:
+        if income.refrigerator:
+            reason = f"{income.refrigerator.name} дан кирим | {income.description}"
+        else:
+            reason = f"Кирим | {income.description}"
+        yield summary_cache.created_day(income), "incomes", {
+            'id': f"IN-{income.id}",
+            'reason': reason,
+            'amount': income.amount,
+            'currency_type': income.currency_type,
+            'date': income.created_at.strftime('%Y-%m-%d')
+        }
+
+
 class FridgeSummaryAPIView(APIView):
     permission_classes = [IsFridgeAdmin | IsCEO]
 
@@ -350,80 +340,32 @@ class FridgeSummaryAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        total_income = 0.00
-        total_outcome = 0.00
-
-        # outcome: Expense
-
-        outcomes_list = []
-
-        expenses = Expense.objects.filter(section='fridge', reason__startswith="expense|",
-                                         created_at__range=[start_date, end_date])
-        electricity_bills = Expense.objects.filter(section='fridge', reason__startswith="electricity|",
-                                                   created_at__range=[start_date, end_date])
-
-        for expense in expenses:
-            total_outcome += convert_currency(expense.currency_type, 'UZS', expense.amount)
-            outcomes_list.append({
-                'id': f"EX-{expense.id}",
-                'reason': expense.description,
-                'amount': expense.amount,
-                'currency_type': expense.currency_type,
-                'date': expense.created_at.strftime('%Y-%m-%d')
-            })
-
-        for bill in electricity_bills:
-            total_outcome += convert_currency(bill.currency_type, "UZS", bill.amount)
-            try:
-                reason = f"{Refrigerator.objects.get(id=int(bill.reason.split('|')[1])).name} га электр учун тўлов | {bill.description}"
-            except Refrigerator.DoesNotExist:
-                reason = f"Электр учун тўлов | {bill.description}"
-            outcomes_list.append({
-                'id': f"EB-{bill.id}",
-                'reason': reason,
-                'amount': bill.amount,
-                'currency_type': bill.currency_type,
-                'date': bill.created_at.strftime('%Y-%m-%d')
-            })
-
-        # income: Income
-
-        incomes_list = []
-
-        incomes = Income.objects.filter(section='fridge', created_at__range=[start_date, end_date])
-
-        for income in incomes:
-            total_income += convert_currency(income.currency_type, "UZS", income.amount)
-            try:
-                refri_id = income.reason.split('|')
-                reason = f"{Refrigerator.objects.get(id=int(income.reason.split('|')[1])).name} дан кирим | {income.description}"
-            except Refrigerator.DoesNotExist:
-                reason = f"Кирим | {income.description}"
-            incomes_list.append({
-                'id': f"IN-{income.id}",
-                'reason': reason,
-                'amount': income.amount,
-                'currency_type': income.currency_type,
-                'date': income.created_at.strftime('%Y-%m-%d')
-            })
+        rows = summary_cache.collect("fridge", summary_cache.ALL, start_date.date(), end_date.date(),
+                                     fridge_summary_rows)
+        incomes_list, outcomes_list = rows["incomes"], rows["outcomes"]
+
+        _, total_income = convert_values(
+            (item['currency_type'], item['amount'], item['date']) for item in incomes_list)
+        _, total_outcome = convert_values(
+            (item['currency_type'], item['amount'], item['date']) for item in outcomes_list)
 
         return Response({
             'start_date': start_date_str,
             'end_date': end_date_str,
             'balance': {
-                'uzs': convert_currency(request.user.currency_type, "UZS", request.user.balance),
-                'usd': convert_currency(request.user.currency_type, "USD", request.user.balance),
-                'rub': convert_currency(request.user.currency_type, "RUB", request.user.balance)
+                'uzs': convert_currency(request.user.currency_type, "UZS", request.user.current_balance),
+                'usd': convert_currency(request.user.currency_type, "USD", request.user.current_balance),
+                'rub': convert_currency(request.user.currency_type, "RUB", request.user.current_balance)
             },
             'total_income': {
                 'uzs': total_income,
-                'usd': convert_currency("UZS", "USD", total_income),
-                'rub': convert_currency("UZS", "RUB", total_income)
+                'usd': convert_currency_on("UZS", "USD", total_income, end_date),
+                'rub': convert_currency_on("UZS", "RUB", total_income, end_date)
             },
             'total_outcome': {
                 'uzs': total_outcome,
-                'usd': convert_currency("UZS", "USD", total_outcome),
-                'rub': convert_currency("UZS", "RUB", total_outcome)
+                'usd': convert_currency_on("UZS", "USD", total_outcome, end_date),
+                'rub': convert_currency_on("UZS", "RUB", total_outcome, end_date)
             },
             'incomes': TransactionHistorySerializer(incomes_list, many=True).data,
             'outcomes': TransactionHistorySerializer(outcomes_list, many=True).data,
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.5 on 2026-10-18 12:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garden', '0007_remove_gardener_debt_remove_gardener_landing_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gardensalarypayment',
+            index=models.Index(fields=['creator', 'created_at'], name='garden_gard_creator_2b4189_idx'),
+        ),
+    ]
@@ -1,10 +1,11 @@
 from django.db import models, transaction
-from django.db.models import F
 from rest_framework.exceptions import ValidationError
 
 from apps.common.models import BaseModel, BasePerson, CURRENCY_TYPE
 from apps.common.services.logging import Telegram
-from apps.common.utils import convert_currency
+from apps.common.services import summary_cache, transaction_index
+from apps.ledger import services as ledger
+from apps.ledger.services import Leg
 from apps.users.models import User
 
 
@@ -71,59 +72,50 @@ class GardenSalaryPayment(BaseModel):
         verbose_name = "Oylik maosh"
         verbose_name_plural = "Oylik maoshlar "
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['creator', 'created_at']),
+        ]
+
+    def summary_buckets(self):
+        return [
+            ("garden", summary_cache.ALL, summary_cache.created_day(self)),
+            ("mixed", self.creator_id, summary_cache.created_day(self)),
+        ]
+
+    def index_row(self):
+        return transaction_index.row(self, "GA-SP", "garden", "gardener_salary", "outcome")
+
+    def ledger_legs(self):
+        return [
+            Leg(self.gardener, "balance", self.amount, self.currency_type),
+            Leg(self.creator, "balance", -self.amount, self.currency_type),
+        ]
 
     def save(self, *args, **kwargs):
         with transaction.atomic():
+            stale = summary_cache.stored_buckets(self)
             if self.pk:
                 old_payment = GardenSalaryPayment.objects.get(id=self.pk)
-
-                Gardener.objects.filter(id=old_payment.gardener.id).update(
-                    balance=F("balance") - convert_currency(
-                        old_payment.currency_type, old_payment.gardener.currency_type, old_payment.amount
-                    )
-                )
                 if self.gardener != old_payment.gardener:
                     raise ValidationError("It is not allowed to change gardener")
-
-                User.objects.filter(id=old_payment.creator.id).update(
-                    balance=F('balance') + convert_currency(
-                        old_payment.currency_type, old_payment.creator.currency_type, old_payment.amount
-                    )
-                )
             else:
                 message = f"💸 Ойлик маош\n🔣 Боғ\n📝 {self.gardener.full_name} га {self.amount} {self.currency_type} берилди\n👤 {self.creator.get_full_name()}\n➖ {self.amount} {self.currency_type}"
                 Telegram.send_log(message, app_button=True)
 
-            super().save(*args, **kwargs)
-
-            Gardener.objects.filter(id=self.gardener.id).update(
-                balance=F("balance") + convert_currency(
-                    self.currency_type, self.gardener.currency_type, self.amount
-                )
-            )
+            if self.creator.role == "ceo":
+                self.status = 'verified'
 
-            User.objects.filter(id=self.creator.id).update(
-                balance=F('balance') - convert_currency(
-                    self.currency_type, self.creator.currency_type, self.amount
-                )
-            )
+            super().save(*args, **kwargs)
 
-            if self.creator.role == "CEO":
-                self.status = 'verified'
+            ledger.repost(self, self.ledger_legs())
+            transaction_index.index(self)
+            summary_cache.touch(self, stale)
 
     def delete(self, *args, **kwargs):
         with transaction.atomic():
-            Gardener.objects.filter(id=self.gardener.id).update(
-                balance=F("balance") - convert_currency(
-                    self.currency_type, self.gardener.currency_type, self.amount
-                )
-            )
-
-            User.objects.filter(id=self.creator.id).update(
-                balance=F('balance') + convert_currency(
-                    self.currency_type, self.creator.currency_type, self.amount
-                )
-            )
+            ledger.reverse(self)
+            transaction_index.remove(self)
+            summary_cache.touch(self)
             super().delete(*args, **kwargs)
 
     def __str__(self):
@@ -72,11 +72,13 @@ class GardenExpensePostSerializer(ModelSerializer):
         read_only_fields = ['status', 'updated_at', 'created_at']
 
     def create(self, validated_data):
-        garden = validated_data.pop('garden', None)
+        garden = validated_data.get('garden')
+        reason = validated_data.get('reason')
+        prefix = f"{reason} | " if reason else ""
         if garden:
-            validated_data['reason'] = f"{validated_data.reason, ' | ' if validated_data.reason else ''}{garden.name} учун харажат | {garden.id}"
+            validated_data['reason'] = f"{prefix}{garden.name} учун харажат | {garden.id}"
         else:
-            validated_data['reason'] = f"{validated_data.reason, ' | ' if validated_data.reason else ''}Умумий харажат"
+            validated_data['reason'] = f"{prefix}Умумий харажат"
 
         return super().create(validated_data)
 
@@ -91,19 +93,9 @@ class GardenExpenseSerializer(ModelSerializer):
         read_only_fields = ['status', 'updated_at', 'created_at']
 
     def get_garden(self, obj):
-        try:
-            parts = obj.reason.split(' | ')
-            if len(parts) < 3 or 'учун харажат' not in parts[-2]:
-                return None
-
-            garden_id = parts[-1].strip()
-            if not garden_id.isdigit():
-                return None
-
-            garden = Garden.objects.get(id=int(garden_id))
-            return GardenSerializer(garden).data
-        except (Garden.DoesNotExist, ValueError, IndexError):
+        if obj.garden is None:
             return None
+        return GardenSerializer(obj.garden).data
 
 
 # Garden Income Serializers
@@ -120,11 +112,13 @@ class GardenIncomePostSerializer(ModelSerializer):
         read_only_fields = ['status', 'updated_at', 'created_at']
 
     def create(self, validated_data):
-        garden = validated_data.pop('garden', None)
+        garden = validated_data.get('garden')
+        reason = validated_data.get('reason')
+        prefix = f"{reason} | " if reason else ""
         if garden:
-            validated_data['reason'] = f"{validated_data.reason, ' | ' if validated_data.reason else ''}{garden.name} учун кирим | {garden.id}"
+            validated_data['reason'] = f"{prefix}{garden.name} учун кирим | {garden.id}"
         else:
-            validated_data['reason'] = f"{validated_data.reason, ' | ' if validated_data.reason else ''}Умумий кирим"
+            validated_data['reason'] = f"{prefix}Умумий кирим"
 
         return super().create(validated_data)
 
@@ -139,19 +133,9 @@ class GardenIncomeSerializer(ModelSerializer):
         read_only_fields = ['status', 'updated_at', 'created_at']
 
     def get_garden(self, obj):
-        try:
-            parts = obj.reason.split(' | ')
-            if len(parts) < 3 or 'учун кирим' not in parts[-2]:
-                return None
-
-            garden_id = parts[-1].strip()
-            if not garden_id.isdigit():
-                return None
-
-            garden = Garden.objects.get(id=int(garden_id))
-            return GardenSerializer(garden).data
-        except (Garden.DoesNotExist, ValueError, IndexError):
+        if obj.garden is None:
             return None
+        return GardenSerializer(obj.garden).data
 
 
 
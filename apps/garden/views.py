@@ -7,10 +7,12 @@ from rest_framework.generics import *
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from apps.users.permissions import IsGardenAdmin, IsCEO
+from apps.common.filters import DateRangeFilterBackend
+from apps.common.services import summary_cache
+from apps.common.utils import convert_currency, convert_currency_on, convert_values
 from apps.main.serializers import ExpenseSerializer, IncomeSerializer, TransactionHistorySerializer
 from apps.main.models import Income, Expense
 from .serializers import *
-from django.utils.dateparse import parse_date
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -52,7 +54,7 @@ class GardenerRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 class SalaryPaymentListCreateView(ListCreateAPIView):
     queryset = GardenSalaryPayment.objects.all()
     permission_classes = [IsGardenAdmin | IsCEO]
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filter_backends = [DateRangeFilterBackend, DjangoFilterBackend, OrderingFilter, SearchFilter]
     ordering_fields = ['created_at', 'gardener__balance']
     search_fields = ['gardener__first_name', 'gardener__last_name', 'gardener__phone_number']
 
@@ -62,38 +64,15 @@ class SalaryPaymentListCreateView(ListCreateAPIView):
         return GardenerSalaryPaymentSerializer
 
     def get_queryset(self):
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
         gardener_id = self.request.query_params.get('gardener')
 
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__lte=end_date)
-
         if gardener_id:
             self.queryset = self.queryset.filter(gardener_id=gardener_id)
 
-
         return self.queryset
 
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'search',
                 openapi.IN_QUERY,
@@ -124,46 +103,23 @@ class SalaryPaymentRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 # Garden Expense Views
 class GardenExpenseListCreateView(ListCreateAPIView):
     permission_classes = [IsGardenAdmin | IsCEO]
+    filter_backends = [DateRangeFilterBackend]
+    keyset_field = "-created_at"
 
     def get_queryset(self):
-        queryset = Expense.objects.filter(section="garden")
+        queryset = Expense.objects.filter(section="garden").select_related('garden')
 
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
         garden_id = self.request.query_params.get('garden')
 
         if garden_id:
-            try:
-                garden = Garden.objects.get(id=garden_id)
-                if garden:
-                    queryset = queryset.filter(reason__endswith=f"| {garden.id}")
-            except ValueError:
+            if not garden_id.isdigit():
                 raise ValidationError({"garden": "Invalid garden ID."})
-
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__lte=end_date)
+            queryset = queryset.filter(garden_id=garden_id)
 
         return queryset
 
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'garden', openapi.IN_QUERY,
                 description="Garden ID to filter expenses",
@@ -199,46 +155,23 @@ class GardenExpenseRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 # Garden Income Views
 class GardenIncomeListCreateView(ListCreateAPIView):
     permission_classes = [IsGardenAdmin | IsCEO]
+    filter_backends = [DateRangeFilterBackend]
+    keyset_field = "-created_at"
 
     def get_queryset(self):
-        queryset = Income.objects.filter(section="garden")
+        queryset = Income.objects.filter(section="garden").select_related('garden')
 
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
         garden_id = self.request.query_params.get('garden')
 
         if garden_id:
-            try:
-                garden = Garden.objects.get(id=garden_id)
-                if garden:
-                    queryset = queryset.filter(reason__endswith=f"| {garden.id}")
-            except ValueError:
+            if not garden_id.isdigit():
                 raise ValidationError({"garden": "Invalid garden ID."})
-
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__lte=end_date)
+            queryset = queryset.filter(garden_id=garden_id)
 
         return queryset
 
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'garden', openapi.IN_QUERY,
                 description="Garden ID to filter incomes",
@@ -273,6 +206,47 @@ class GardenIncomeRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 
 
 # Garden Summary
+def garden_summary_rows(start_date, end_date):
+    """
+    GardenSummaryAPIView qatorlari: (kun, "incomes"|"outcomes", qator), summary_cache.collect uchun.
+    """
+    # outcome: SalaryPayment, Expense
+
+    salary_payments = GardenSalaryPayment.objects.filter(created_at__range=[start_date, end_date]).select_related('gardener')
+    expenses = Expense.objects.filter(section='garden', created_at__range=[start_date, end_date])
+
+    for salary_payment in salary_payments:
+        yield summary_cache.created_day(salary_payment), "outcomes", {
+            'id': f"SP-{salary_payment.id}",
+            'reason': f"{salary_payment.gardener.full_name}га маош учун.",
+            'amount': salary_payment.amount,
+            'currency_type': salary_payment.currency_type,
+            'date': salary_payment.created_at.strftime('%Y-%m-%d')
+        }
+
+    for expense in expenses:
+        yield summary_cache.created_day(expense), "outcomes", {
+            'id': f"EX-{expense.id}",
+            'reason': expense.reason,
+            'amount': expense.amount,
+            'currency_type': expense.currency_type,
+            'date': expense.created_at.strftime('%Y-%m-%d')
+        }
+
+    # income: Income
+
+    incomes = Income.objects.filter(section='garden', created_at__range=[start_date, end_date])
+
+    for income in incomes:
+        yield summary_cache.created_day(income), "incomes", {
+            'id': f"IN-{income.id}",
+            'reason': income.reason,
+            'amount': income.amount,
+            'currency_type': income.currency_type,
+            'date': income.created_at.strftime('%Y-%m-%d')
+        }
+
+
 class GardenSummaryAPIView(APIView):
     permission_classes = [IsGardenAdmin | IsCEO]
 
@@ -370,69 +344,32 @@ class GardenSummaryAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        total_income = 0.00
-        total_outcome = 0.00
-
-        # outcome: SalaryPayment, Expense
-
-        outcomes_list = []
-
-        salary_payments = GardenSalaryPayment.objects.filter(created_at__range=[start_date, end_date])
-        expenses = Expense.objects.filter(section='garden', created_at__range=[start_date, end_date])
-
-        for salary_payment in salary_payments:
-            total_outcome += convert_currency(salary_payment.currency_type, "UZS", salary_payment.amount)
-            outcomes_list.append({
-                'id': f"SP-{salary_payment.id}",
-                'reason': f"{salary_payment.gardener.full_name}га маош учун.",
-                'amount': salary_payment.amount,
-                'currency_type': salary_payment.currency_type,
-                'date': salary_payment.created_at.strftime('%Y-%m-%d')
-            })
-
-        for expense in expenses:
-            total_outcome += convert_currency(expense.currency_type, "UZS", expense.amount)
-            outcomes_list.append({
-                'id': f"EX-{expense.id}",
-                'reason': expense.reason,
-                'amount': expense.amount,
-                'currency_type': expense.currency_type,
-                'date': expense.created_at.strftime('%Y-%m-%d')
-            })
-
-        # income: Income
-
-        incomes_list = []
-
-        incomes = Income.objects.filter(section='garden', created_at__range=[start_date, end_date])
+        rows = summary_cache.collect("garden", summary_cache.ALL, start_date.date(), end_date.date(),
+                                     garden_summary_rows)
+        incomes_list, outcomes_list = rows["incomes"], rows["outcomes"]
 
-        for income in incomes:
-            total_income += convert_currency(income.currency_type, 'UZS', income.amount)
-            incomes_list.append({
-                'id': f"IN-{income.id}",
-                'reason': income.reason,
-                'amount': income.amount,
-                'currency_type': income.currency_type,
-                'date': income.created_at.strftime('%Y-%m-%d')
-            })
+        _, total_income = convert_values(
+            (item['currency_type'], item['amount'], item['date']) for item in incomes_list)
+        _, total_outcome = convert_values(
+            (item['currency_type'], item['amount'], item['date']) for item in outcomes_list)
 
         return Response({
             'start_date': start_date_str,
             'end_date': end_date_str,
             'balance': {
-                'uzs': convert_currency(request.user.currency_type, "UZS", request.user.balance),
-                'usd': convert_currency(request.user.currency_type, "USD", request.user.balance),
-                'rub': convert_currency(request.user.currency_type, "RUB", request.user.balance)
+                'uzs': convert_currency(request.user.currency_type, "UZS", request.user.current_balance),
+                'usd': convert_currency(request.user.currency_type, "USD", request.user.current_balance),
+                'rub': convert_currency(request.user.currency_type, "RUB", request.user.current_balance)
             },
             'total_income': {
                 'uzs': total_income,
-                'usd': convert_currency("UZS", "USD", total_income),
-                'rub': convert_currency("UZS", "RUB", total_income)
+                'usd': convert_currency_on("UZS", "USD", total_income, end_date),
+                'rub': convert_currency_on("UZS", "RUB", total_income, end_date)
             },
             'total_outcome': {
                 'uzs': total_outcome,
-                'usd': convert_currency("UZS", "USD", total_outcome),
-                'rub': convert_currency("UZS", "RUB", total_outcome)
+                'usd': convert_currency_on("UZS", "USD", total_outcome, end_date),
+                'rub': convert_currency_on("UZS", "RUB", total_outcome, end_date)
             },
             'incomes': TransactionHistorySerializer(incomes_list, many=True).data,
             'outcomes': TransactionHistorySerializer(outcomes_list, many=True).data,
@@ -0,0 +1,45 @@
+from django.contrib import admin
+
+from apps.ledger.models import LedgerAccount, JournalEntry, Posting
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(LedgerAccount)
+class LedgerAccountAdmin(ReadOnlyAdmin):
+    list_display = ("id", "content_type", "object_id", "field", "currency_type", "created_at")
+    list_filter = ("content_type", "field")
+
+
+class PostingInline(admin.TabularInline):
+    model = Posting
+    fields = ("account", "amount", "currency_type", "source_amount", "source_currency")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(JournalEntry)
+class JournalEntryAdmin(ReadOnlyAdmin):
+    list_display = ("id", "source_type", "source_id", "date", "description", "reverses", "created_at")
+    list_filter = ("source_type",)
+    date_hierarchy = "date"
+    inlines = [PostingInline]
+
+
+@admin.register(Posting)
+class PostingAdmin(ReadOnlyAdmin):
+    list_display = ("id", "entry", "account", "date", "amount", "currency_type")
+    list_filter = ("currency_type",)
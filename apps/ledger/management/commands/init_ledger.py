@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.ledger.services import open_balances
+
+
+class Command(BaseCommand):
+    help = "Mavjud balanslar uchun boshlang'ich ledger provodkalarini yozadi (qayta ishga tushirish xavfsiz)"
+
+    def handle(self, *args, **kwargs):
+        count = open_balances()
+        self.stdout.write(self.style.SUCCESS(f"Opening entries created: {count}"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.ledger.services import reconcile
+
+
+class Command(BaseCommand):
+    help = "Keshlangan balanslarni ledger yig'indisi bilan solishtiradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tolerance", type=float, default=0.01)
+
+    def handle(self, *args, **options):
+        mismatches = reconcile(options["tolerance"])
+        for label, pk, field, cached_value, ledger_value in mismatches:
+            self.stdout.write(f"{label}#{pk}.{field}: cached={cached_value} ledger={ledger_value}")
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f"Mismatches: {len(mismatches)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Ledger is balanced"))
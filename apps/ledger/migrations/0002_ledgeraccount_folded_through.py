@@ -0,0 +1,27 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:54
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def mark_applied_as_folded(apps, schema_editor):
+    # Shu paytgacha barcha yozuvlar keshlangan maydonlarga darhol qo'shilgan
+    LedgerAccount = apps.get_model('ledger', 'LedgerAccount')
+    for account in LedgerAccount.objects.annotate(last_posting=Max('postings__id')).filter(last_posting__isnull=False):
+        LedgerAccount.objects.filter(pk=account.pk).update(folded_through=account.last_posting)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ledgeraccount',
+            name='folded_through',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(mark_applied_as_folded, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('ledger', '0002_ledgeraccount_folded_through'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('field', models.CharField(max_length=30)),
+                ('date', models.DateField()),
+                ('amount', models.FloatField()),
+                ('currency_type', models.CharField(choices=[('USD', 'USD🇺🇸'), ('UZS', 'UZS🇺🇿'), ('RUB', 'RUB🇷🇺')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Kunlik qoldiq ',
+                'verbose_name_plural': 'Kunlik qoldiqlar ',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'object_id', 'field', 'date'), name='unique_balance_snapshot')],
+            },
+        ),
+    ]
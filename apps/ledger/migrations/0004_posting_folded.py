@@ -0,0 +1,43 @@
+# Generated by Django 5.1.5 on 2026-10-18 12:46
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_unfolded(apps, schema_editor):
+    # folded_through dan keyingi kechiktirilgan (users.User) yozuvlar hali keshga qo'shilmagan.
+    # Boshlang'ich qoldiq provodkalari (manbasi balans egasining o'zi) keshda allaqachon bor
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Posting = apps.get_model('ledger', 'Posting')
+    content_type = ContentType.objects.filter(app_label='users', model='user').first()
+    if content_type is None:
+        return
+    (Posting.objects
+     .filter(account__content_type=content_type, account__object_id__gt=0, id__gt=F('account__folded_through'))
+     .exclude(entry__source_type_id=F('account__content_type_id'))
+     .update(folded=False))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('ledger', '0003_balancesnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posting',
+            name='folded',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(mark_unfolded, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='ledgeraccount',
+            name='folded_through',
+        ),
+        migrations.AddIndex(
+            model_name='posting',
+            index=models.Index(condition=models.Q(('folded', False)), fields=['account'], name='ledger_posting_unfolded'),
+        ),
+    ]
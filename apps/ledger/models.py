@@ -0,0 +1,122 @@
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from rest_framework.exceptions import ValidationError
+
+from apps.common.models import CURRENCY_TYPE
+
+# Nominal (qarama-qarshi) hisoblar egasiz bo'ladi
+NOMINAL_OBJECT_ID = 0
+
+
+class LedgerAccount(models.Model):
+    """
+    Balans saqlovchi maydon (User.balance, Client.debt, ...) yoki manba modelining nominal hisobi.
+    Acquaintance uchun field="position": landing - debt.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.PROTECT)
+    object_id = models.PositiveBigIntegerField(default=NOMINAL_OBJECT_ID)
+    holder = GenericForeignKey('content_type', 'object_id')
+    field = models.CharField(max_length=30)
+    currency_type = models.CharField(max_length=20, choices=CURRENCY_TYPE)
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
+
+    class Meta:
+        verbose_name = "Hisob "
+        verbose_name_plural = "Hisoblar "
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id', 'field'], name='unique_ledger_account'),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model}:{self.object_id}:{self.field}"
+
+    @property
+    def is_nominal(self):
+        return self.object_id == NOMINAL_OBJECT_ID
+
+
+class AppendOnlyModel(models.Model):
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValidationError("Ledger yozuvlarini o'zgartirib bo'lmaydi, storno qiling.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValidationError("Ledger yozuvlarini o'chirib bo'lmaydi, storno qiling.")
+
+
+class JournalEntry(AppendOnlyModel):
+    source_type = models.ForeignKey(ContentType, on_delete=models.PROTECT, related_name='+')
+    source_id = models.PositiveBigIntegerField()
+    source = GenericForeignKey('source_type', 'source_id')
+    date = models.DateField()
+    description = models.CharField(max_length=255, blank=True, default="")
+    reverses = models.OneToOneField('self', on_delete=models.PROTECT, null=True, blank=True,
+                                    related_name='reversed_by')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
+
+    class Meta:
+        verbose_name = "Provodka "
+        verbose_name_plural = "Provodkalar "
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['source_type', 'source_id']),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.source_type.model}:{self.source_id}"
+
+
+class Posting(AppendOnlyModel):
+    entry = models.ForeignKey(JournalEntry, on_delete=models.PROTECT, related_name='postings')
+    account = models.ForeignKey(LedgerAccount, on_delete=models.PROTECT, related_name='postings')
+    date = models.DateField()
+    # hisob valyutasida, musbat qiymat maydonni oshiradi
+    amount = models.FloatField()
+    currency_type = models.CharField(max_length=20, choices=CURRENCY_TYPE)
+    # manba modeldagi asl summa, qayta saqlashda o'zgarish bor-yo'qligini aniqlash uchun
+    source_amount = models.FloatField()
+    source_currency = models.CharField(max_length=20, choices=CURRENCY_TYPE)
+    # Keshlangan maydonga qo'shilganmi (kechiktirilgan hisoblarda fold_balances belgilaydi)
+    folded = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "Yozuv "
+        verbose_name_plural = "Yozuvlar "
+        indexes = [
+            models.Index(fields=['account', 'date']),
+            models.Index(fields=['account'], condition=models.Q(folded=False), name='ledger_posting_unfolded'),
+        ]
+
+    def __str__(self):
+        return f"{self.account} {self.amount} {self.currency_type}"
+
+
+class BalanceSnapshot(models.Model):
+    """
+    Kun oxiridagi qoldiq: balans egasi va sana bo'yicha bitta yozuv.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.PROTECT)
+    object_id = models.PositiveBigIntegerField()
+    holder = GenericForeignKey('content_type', 'object_id')
+    field = models.CharField(max_length=30)
+    date = models.DateField()
+    amount = models.FloatField()
+    currency_type = models.CharField(max_length=20, choices=CURRENCY_TYPE)
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
+
+    class Meta:
+        verbose_name = "Kunlik qoldiq "
+        verbose_name_plural = "Kunlik qoldiqlar "
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id', 'field', 'date'],
+                                    name='unique_balance_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model}:{self.object_id}:{self.field} {self.date}"
@@ -0,0 +1,392 @@
+from collections import Counter, defaultdict, namedtuple
+from datetime import timedelta
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from apps.common.utils import convert_currency, _as_date
+from apps.ledger.models import LedgerAccount, JournalEntry, Posting, BalanceSnapshot, NOMINAL_OBJECT_ID
+
+# Ledger orqali yuritiladigan balanslar: (model, maydon)
+HOLDERS = (
+    ("users.User", "balance"),
+    ("factory.Worker", "balance"),
+    ("garden.Gardener", "balance"),
+    ("factory.Client", "debt"),
+    ("main.Acquaintance", "position"),
+    ("logistic.Contractor", "landing"),
+    ("main.BankAccount", "balance"),
+)
+
+# Bir nechta admin bir vaqtda yozadigan "issiq" qatorlar: maydon har yozuvda emas,
+# fold_balances() orqali yangilanadi, joriy qiymat = maydon + yig'ilmagan yozuvlar
+DEFERRED_HOLDERS = ("users.User",)
+
+FOLD_LOCK_KEY = "ledger_fold_lock"
+
+# holder: balans egasi, field: HOLDERS dagi maydon,
+# amount/currency_type: manba valyutasidagi ishorali summa (musbat - maydon oshadi)
+Leg = namedtuple("Leg", ["holder", "field", "amount", "currency_type"])
+
+
+def _entry_date(source):
+    day = _as_date(getattr(source, "date", None))
+    if day:
+        return day
+    created_at = getattr(source, "created_at", None)
+    return timezone.localdate(created_at) if created_at else timezone.localdate()
+
+
+def _account(content_type, object_id, field, currency_type):
+    account, _ = LedgerAccount.objects.get_or_create(
+        content_type=content_type, object_id=object_id, field=field,
+        defaults={"currency_type": currency_type},
+    )
+    return account
+
+
+def _holder_account(holder, field):
+    return _account(ContentType.objects.get_for_model(holder), holder.pk, field, holder.currency_type)
+
+
+def _nominal_account(source_type, currency_type):
+    return _account(source_type, NOMINAL_OBJECT_ID, f"nominal:{currency_type}", currency_type)
+
+
+def _postings(source_type, legs):
+    """
+    Har bir leg uchun balans egasi yozuvi va shu valyutadagi nominal qarama-qarshi yozuv,
+    shunda har bir provodka valyuta bo'yicha nolga teng bo'ladi.
+    """
+    postings = []
+    for leg in legs:
+        if leg.holder is None or not leg.amount:
+            continue
+        currency = leg.holder.currency_type
+        amount = convert_currency(leg.currency_type, currency, leg.amount)
+        for account, sign in ((_holder_account(leg.holder, leg.field), 1), (_nominal_account(source_type, currency), -1)):
+            postings.append(Posting(
+                account=account, amount=sign * amount, currency_type=currency,
+                source_amount=sign * leg.amount, source_currency=leg.currency_type,
+            ))
+    return postings
+
+
+def _signature(postings):
+    return Counter((p.account_id, round(p.source_amount, 2), p.source_currency) for p in postings)
+
+
+def _apply(postings):
+    """
+    Keshlangan maydonlarni (User.balance va h.k.) yozuvlar bo'yicha yangilaydi, hisob bo'yicha bitta UPDATE.
+    """
+    deltas = defaultdict(float)
+    accounts = {}
+    for posting in postings:
+        if not posting.account.is_nominal:
+            deltas[posting.account_id] += posting.amount
+            accounts[posting.account_id] = posting.account
+
+    for account_id, delta in deltas.items():
+        account = accounts[account_id]
+        if _is_deferred(account.content_type):
+            continue
+        queryset = account.content_type.model_class().objects.filter(pk=account.object_id)
+        if account.field == "position":
+            position = Coalesce(F("landing"), Value(0.0)) - Coalesce(F("debt"), Value(0.0)) + delta
+            queryset.update(landing=Greatest(position, Value(0.0)), debt=Greatest(-position, Value(0.0)))
+        else:
+            queryset.update(**{account.field: Coalesce(F(account.field), Value(0.0)) + delta})
+
+
+def _is_deferred(content_type):
+    return content_type.model_class()._meta.label in DEFERRED_HOLDERS
+
+
+def _unfolded():
+    return Posting.objects.filter(folded=False)
+
+
+def fold_balances():
+    """
+    Kechiktirilgan hisoblarning yig'ilmagan yozuvlarini keshlangan maydonga qo'shadi, hisob bo'yicha bitta UPDATE.
+    Har bir yozuv alohida belgilanadi: hali commit bo'lmagan tranzaksiyalarning yozuvlari ko'rinmaydi
+    va keyingi safar, qachon commit bo'lishidan qat'i nazar, qo'shiladi.
+    """
+    if not cache.add(FOLD_LOCK_KEY, 1, timeout=300):
+        return 0
+
+    try:
+        account_ids = set(_unfolded().values_list("account_id", flat=True))
+        for account_id in account_ids:
+            with transaction.atomic():
+                account = LedgerAccount.objects.select_for_update().select_related("content_type").get(pk=account_id)
+                # Aynan o'qilgan yozuvlar belgilanadi: SUM dan keyin commit bo'lganlari keyingi safarga qoladi
+                postings = list(_unfolded().filter(account=account).values_list("id", "amount"))
+                if not postings:
+                    continue
+                delta = sum(amount for _, amount in postings)
+                account.content_type.model_class().objects.filter(pk=account.object_id).update(
+                    **{account.field: Coalesce(F(account.field), Value(0.0)) + delta}
+                )
+                Posting.objects.filter(id__in=[pk for pk, _ in postings]).update(folded=True)
+        return len(account_ids)
+    finally:
+        cache.delete(FOLD_LOCK_KEY)
+
+
+def current_balance(holder, field="balance"):
+    """
+    Keshlangan qiymat va hali fold qilinmagan yozuvlar yig'indisi.
+    """
+    value = getattr(holder, field) or 0
+    if not _is_deferred(ContentType.objects.get_for_model(holder)):
+        return value
+    unfolded = (_unfolded().filter(account__content_type=ContentType.objects.get_for_model(holder),
+                                   account__object_id=holder.pk, account__field=field)
+                .aggregate(total=Sum("amount"))["total"])
+    return round(value + (unfolded or 0), 2)
+
+
+def _live_entries(source_type, source_id):
+    return (JournalEntry.objects
+            .filter(source_type=source_type, source_id=source_id, reverses__isnull=True, reversed_by__isnull=True)
+            .prefetch_related("postings__account__content_type"))
+
+
+def _write(entry, postings, apply=True):
+    for posting in postings:
+        posting.entry = entry
+        posting.date = entry.date
+        # Kechiktirilgan hisoblarda maydon fold_balances() da yangilanadi
+        posting.folded = not (apply and not posting.account.is_nominal and _is_deferred(posting.account.content_type))
+    Posting.objects.bulk_create(postings)
+    if apply:
+        _apply(postings)
+
+
+def _reverse_entry(entry):
+    reversal = JournalEntry.objects.create(
+        source_type_id=entry.source_type_id, source_id=entry.source_id, date=entry.date,
+        description=f"Storno #{entry.pk}", reverses=entry,
+    )
+    _write(reversal, [
+        Posting(account=p.account, amount=-p.amount, currency_type=p.currency_type,
+                source_amount=-p.source_amount, source_currency=p.source_currency)
+        for p in entry.postings.all()
+    ])
+
+
+def reverse(source):
+    """
+    Manbaning amaldagi provodkalarini storno qiladi (o'chirishda).
+    """
+    source_type = ContentType.objects.get_for_model(source)
+    with transaction.atomic():
+        for entry in _live_entries(source_type, source.pk):
+            _reverse_entry(entry)
+
+
+def repost(source, legs, description=""):
+    """
+    Manbaning provodkasini yangilaydi: summalar va sana o'zgarmagan bo'lsa hech narsa yozilmaydi,
+    aks holda eski provodka storno qilinib yangisi yoziladi.
+    """
+    source_type = ContentType.objects.get_for_model(source)
+    with transaction.atomic():
+        live = list(_live_entries(source_type, source.pk))
+        postings = _postings(source_type, legs)
+        day = _entry_date(source)
+        if (_signature(postings) == _signature(p for entry in live for p in entry.postings.all())
+                and all(entry.date == day for entry in live)):
+            return None
+
+        for entry in live:
+            _reverse_entry(entry)
+        if not postings:
+            return None
+
+        # str(source) ishlatilmaydi: ba'zi __str__ lar bo'sh FK larda yiqiladi
+        entry = JournalEntry.objects.create(
+            source_type=source_type, source_id=source.pk, date=day,
+            description=(description or f"{type(source).__name__} #{source.pk}")[:255],
+        )
+        _write(entry, postings)
+        return entry
+
+
+def _ledger_totals(content_type, field):
+    """
+    {object_id: ledger yig'indisi} berilgan model maydonining barcha hisoblari uchun.
+    """
+    return dict(
+        Posting.objects.filter(account__content_type=content_type, account__field=field)
+        .values("account__object_id").annotate(total=Sum("amount")).values_list("account__object_id", "total")
+    )
+
+
+def _unfolded_totals(content_type, field):
+    if not _is_deferred(content_type):
+        return {}
+    return dict(
+        _unfolded().filter(account__content_type=content_type, account__field=field)
+        .values("account__object_id").annotate(total=Sum("amount")).values_list("account__object_id", "total")
+    )
+
+
+def _cached_value(holder, field):
+    if field == "position":
+        return (holder.landing or 0) - (holder.debt or 0)
+    return getattr(holder, field) or 0
+
+
+def open_balances():
+    """
+    Ledger ishga tushgunga qadar to'plangan qoldiqlar uchun boshlang'ich provodkalar
+    (keshdagi qiymat minus ledger yig'indisi). Keshlangan maydon o'zgarmaydi,
+    boshlang'ich provodkasi bor balans egalari o'tkazib yuboriladi.
+    """
+    count = 0
+    today = timezone.localdate()
+    for label, field in HOLDERS:
+        model = apps.get_model(label)
+        content_type = ContentType.objects.get_for_model(model)
+        opened = JournalEntry.objects.filter(source_type=content_type).values_list("source_id", flat=True)
+        totals = _ledger_totals(content_type, field)
+        values = ("landing", "debt") if field == "position" else (field,)
+        unfolded = _unfolded_totals(content_type, field)
+        for holder in model.objects.exclude(pk__in=opened).only("pk", "currency_type", *values):
+            cached_value = _cached_value(holder, field) + unfolded.get(holder.pk, 0)
+            amount = round(cached_value - totals.get(holder.pk, 0), 2)
+            if not amount:
+                continue
+            with transaction.atomic():
+                entry = JournalEntry.objects.create(
+                    source_type=content_type, source_id=holder.pk, date=today, description="Boshlang'ich qoldiq",
+                )
+                _write(entry, _postings(content_type, [Leg(holder, field, amount, holder.currency_type)]), apply=False)
+            count += 1
+    return count
+
+
+def _totals_as_of(content_type, field, day):
+    """
+    {object_id: kun oxiridagi qoldiq} - day gacha (shu kun ham) sanali yozuvlar yig'indisi, bitta GROUP BY.
+    """
+    return dict(
+        Posting.objects.filter(account__content_type=content_type, account__field=field, date__lte=day)
+        .values("account__object_id").annotate(total=Sum("amount")).values_list("account__object_id", "total")
+    )
+
+
+def close_day(day=None):
+    """
+    Barcha balans egalarining `day` oxiridagi qoldig'ini bitta tranzaksiyada saqlaydi: har bir jadval
+    uchun ledger bo'yicha bitta GROUP BY va bulk upsert. Qoldiq joriy maydonlardan emas, shu kungacha
+    sanali yozuvlardan (balance_as_of kabi) olinadi, shuning uchun yarim tundan keyingi yozuvlar
+    kirmaydi va o'tgan kunni qayta yopish to'g'ri qiymatni qayta yozadi.
+    Standart holatda kecha yopiladi (vazifa yarim tundan keyin ishlaydi).
+    """
+    from apps.main.models import DailyRemainder
+
+    if day is None:
+        day = timezone.localdate() - timedelta(days=1)
+
+    count = 0
+    with transaction.atomic():
+        for label, field in HOLDERS:
+            model = apps.get_model(label)
+            content_type = ContentType.objects.get_for_model(model)
+            totals = _totals_as_of(content_type, field, day)
+            snapshots = []
+            remainders = []
+            for row in model.objects.values("pk", "currency_type").iterator(chunk_size=2000):
+                amount = round(totals.get(row["pk"], 0), 2)
+                snapshots.append(BalanceSnapshot(
+                    content_type=content_type, object_id=row["pk"], field=field, date=day,
+                    amount=amount, currency_type=row["currency_type"],
+                ))
+                if label == "users.User":
+                    remainders.append(DailyRemainder(
+                        user_id=row["pk"], date=day, amount=amount, currency_type=row["currency_type"],
+                    ))
+            BalanceSnapshot.objects.bulk_create(
+                snapshots, batch_size=1000, update_conflicts=True,
+                unique_fields=["content_type", "object_id", "field", "date"], update_fields=["amount", "currency_type"],
+            )
+            DailyRemainder.objects.bulk_create(
+                remainders, batch_size=1000, update_conflicts=True,
+                unique_fields=["user", "date"], update_fields=["amount", "currency_type"],
+            )
+            count += len(snapshots)
+    return count
+
+
+def _holder_account_id(holder, field):
+    return (LedgerAccount.objects
+            .filter(content_type=ContentType.objects.get_for_model(holder), object_id=holder.pk, field=field)
+            .values_list("id", flat=True).first())
+
+
+def balance_as_of(holder, field, day):
+    """
+    Berilgan kun oxiridagi qoldiq, (account, date) indeksi bo'yicha bitta so'rov.
+    """
+    account_id = _holder_account_id(holder, field)
+    if account_id is None:
+        return 0
+    total = Posting.objects.filter(account_id=account_id, date__lte=day).aggregate(total=Sum("amount"))["total"]
+    return round(total or 0, 2)
+
+
+def statement(holder, field, start_date, end_date):
+    """
+    Davr uchun hisob ko'chirmasi: boshlang'ich qoldiq, yozuvlar (yig'ma qoldiq bilan) va yakuniy qoldiq.
+    """
+    opening = balance_as_of(holder, field, start_date - timedelta(days=1))
+    account_id = _holder_account_id(holder, field)
+    rows = []
+    balance = opening
+    if account_id is not None:
+        postings = (Posting.objects
+                    .filter(account_id=account_id, date__gte=start_date, date__lte=end_date)
+                    .order_by("date", "id")
+                    .values("date", "amount", "currency_type", "entry_id", "entry__description",
+                            "entry__source_type__model", "entry__source_id"))
+        for posting in postings:
+            balance += posting["amount"]
+            rows.append({
+                "date": posting["date"],
+                "entry": posting["entry_id"],
+                "source": f"{posting['entry__source_type__model']}:{posting['entry__source_id']}",
+                "description": posting["entry__description"],
+                "amount": posting["amount"],
+                "currency_type": posting["currency_type"],
+                "balance": round(balance, 2),
+            })
+    return {"opening": opening, "rows": rows, "closing": round(balance, 2)}
+
+
+def reconcile(tolerance=0.01):
+    """
+    Keshlangan maydonlarni ledger yig'indisi bilan solishtiradi.
+    Qaytaradi: [(model, id, maydon, keshdagi qiymat, ledger qiymati), ...] faqat farq bo'lganlari.
+    """
+    mismatches = []
+    for label, field in HOLDERS:
+        model = apps.get_model(label)
+        content_type = ContentType.objects.get_for_model(model)
+        totals = _ledger_totals(content_type, field)
+        unfolded = _unfolded_totals(content_type, field)
+        values = ("landing", "debt") if field == "position" else (field,)
+        for holder in model.objects.only("pk", *values):
+            ledger_value = round(totals.get(holder.pk, 0), 2)
+            cached_value = round(_cached_value(holder, field) + unfolded.get(holder.pk, 0), 2)
+            if abs(cached_value - ledger_value) > tolerance:
+                mismatches.append((label, holder.pk, field, cached_value, ledger_value))
+    return mismatches
@@ -0,0 +1,13 @@
+from celery import shared_task
+
+from .services import fold_balances, close_day as _close_day
+
+
+@shared_task
+def fold_ledger_balances():
+    return fold_balances()
+
+
+@shared_task
+def close_day():
+    return _close_day()
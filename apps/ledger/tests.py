@@ -0,0 +1,177 @@
+from datetime import date
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.common import utils
+from apps.common.models import CurrencyRate
+from apps.factory.models import RawMaterial, RawMaterialHistory
+from apps.ledger import services as ledger
+from apps.ledger.models import BalanceSnapshot, JournalEntry
+from apps.logistic.models import Car, CarExpense, Trailer
+from apps.main.models import DailyRemainder, Expense
+from apps.users.models import User
+
+
+class LedgerTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        CurrencyRate.objects.create(usd=12800, rub=140)
+        cls.admin = User.objects.create(username="admin", role="admin", currency_type="UZS", section="general")
+        cls.ceo = User.objects.create(username="ceo", role="ceo", currency_type="UZS", section="general")
+
+    def setUp(self):
+        cache.clear()
+        utils._snapshot = None
+        utils._history = None
+
+    def entries(self, source, live=False):
+        queryset = JournalEntry.objects.filter(
+            source_type=ContentType.objects.get_for_model(source), source_id=source.pk,
+        )
+        if live:
+            queryset = queryset.filter(reverses__isnull=True, reversed_by__isnull=True)
+        return queryset.order_by("id")
+
+    def balance(self, user):
+        user.refresh_from_db()
+        return ledger.current_balance(user)
+
+
+class RepostTests(LedgerTestCase):
+    def create_expense(self, amount=100, user=None):
+        return Expense.objects.create(
+            user=user or self.admin, section="general", reason="Test", amount=amount, currency_type="UZS",
+        )
+
+    def test_create_posts_balanced_entry(self):
+        expense = self.create_expense()
+        entry = self.entries(expense).get()
+        self.assertEqual(entry.description, f"Expense #{expense.pk}")
+        self.assertEqual(sum(p.amount for p in entry.postings.all()), 0)
+        self.assertEqual(self.balance(self.admin), -100)
+        # User kechiktirilgan hisob: maydon fold gacha o'zgarmaydi
+        self.assertEqual(self.admin.balance, 0)
+
+    def test_amount_change_reverses_and_reposts(self):
+        expense = self.create_expense()
+        first = self.entries(expense).get()
+        expense.amount = 150
+        expense.save()
+
+        reversal, new = self.entries(expense).exclude(pk=first.pk)
+        self.assertEqual(reversal.reverses_id, first.pk)
+        self.assertEqual(list(self.entries(expense, live=True)), [new])
+        self.assertEqual(self.balance(self.admin), -150)
+
+    def test_status_only_save_writes_nothing(self):
+        expense = self.create_expense()
+        expense.status = "verified"
+        expense.save()
+        self.assertEqual(self.entries(expense).count(), 1)
+
+    def test_date_change_moves_entry(self):
+        expense = CarExpense.objects.create(
+            creator=self.admin, reason="Yoqilg'i", amount=100, currency_type="UZS", date=date(2026, 10, 1),
+        )
+        expense.date = date(2026, 10, 5)
+        expense.save()
+
+        self.assertEqual(self.entries(expense, live=True).get().date, date(2026, 10, 5))
+        self.assertEqual(ledger.balance_as_of(self.admin, "balance", date(2026, 10, 1)), 0)
+        self.assertEqual(ledger.balance_as_of(self.admin, "balance", date(2026, 10, 5)), -100)
+        self.assertEqual(self.balance(self.admin), -100)
+
+    def test_delete_reverses_entry(self):
+        expense = self.create_expense()
+        pk = expense.pk
+        expense.delete()
+        expense.pk = pk
+        self.assertFalse(self.entries(expense, live=True).exists())
+        self.assertEqual(self.entries(expense).count(), 2)
+        self.assertEqual(self.balance(self.admin), 0)
+
+    def test_sources_with_fragile_str_are_posted(self):
+        material = RawMaterial.objects.create(name="Karton", weight=0)
+        history = RawMaterialHistory.objects.create(
+            raw_material=material, weight=10, amount=500, currency_type="UZS", date=date(2026, 10, 1),
+            creator=self.admin,
+        )
+        car = Car.objects.create(state_number="01A001AA", year="2020")
+        trailer = Trailer.objects.create(state_number="01T001TT")
+        car_expense = CarExpense.objects.create(
+            creator=self.admin, car=car, trailer=trailer, reason="Ta'mir", amount=200, currency_type="UZS",
+        )
+
+        self.assertEqual(self.entries(history).get().description, f"RawMaterialHistory #{history.pk}")
+        self.assertEqual(self.entries(car_expense).get().description, f"CarExpense #{car_expense.pk}")
+        self.assertEqual(self.balance(self.admin), -700)
+
+    def test_ceo_transactions_are_verified(self):
+        self.assertEqual(self.create_expense(user=self.ceo).status, "verified")
+        self.assertEqual(self.create_expense().status, "new")
+        car_expense = CarExpense.objects.create(creator=self.ceo, reason="Yoqilg'i", amount=10, currency_type="UZS")
+        self.assertEqual(car_expense.status, "verified")
+
+
+class ReconcileTests(LedgerTestCase):
+    def test_folded_balances_match_ledger(self):
+        Expense.objects.create(user=self.admin, section="general", reason="Test", amount=100, currency_type="UZS")
+        self.assertEqual(ledger.reconcile(), [])
+
+        ledger.fold_balances()
+        self.admin.refresh_from_db()
+        self.assertEqual(self.admin.balance, -100)
+        self.assertEqual(ledger.current_balance(self.admin), -100)
+        self.assertEqual(ledger.reconcile(), [])
+
+    def test_direct_update_is_reported(self):
+        Expense.objects.create(user=self.admin, section="general", reason="Test", amount=100, currency_type="UZS")
+        ledger.fold_balances()
+        User.objects.filter(pk=self.admin.pk).update(balance=50)
+
+        self.assertEqual(ledger.reconcile(), [("users.User", self.admin.pk, "balance", 50, -100)])
+
+
+class CloseDayTests(LedgerTestCase):
+    def car_expense(self, amount, day):
+        return CarExpense.objects.create(
+            creator=self.admin, reason="Yoqilg'i", amount=amount, currency_type="UZS", date=day,
+        )
+
+    def remainder(self, day):
+        return DailyRemainder.objects.get(user=self.admin, date=day).amount
+
+    def snapshot(self, day):
+        return BalanceSnapshot.objects.get(
+            content_type=ContentType.objects.get_for_model(User), object_id=self.admin.pk, field="balance", date=day,
+        ).amount
+
+    def test_rerun_is_idempotent(self):
+        self.car_expense(100, date(2026, 10, 1))
+        ledger.close_day(date(2026, 10, 1))
+        snapshots = BalanceSnapshot.objects.count()
+        remainders = DailyRemainder.objects.count()
+
+        ledger.close_day(date(2026, 10, 1))
+        self.assertEqual(BalanceSnapshot.objects.count(), snapshots)
+        self.assertEqual(DailyRemainder.objects.count(), remainders)
+        self.assertEqual(self.remainder(date(2026, 10, 1)), -100)
+        self.assertEqual(self.snapshot(date(2026, 10, 1)), -100)
+
+    def test_later_postings_are_excluded(self):
+        self.car_expense(100, date(2026, 10, 1))
+        self.car_expense(40, date(2026, 10, 2))
+        ledger.close_day(date(2026, 10, 1))
+        self.assertEqual(self.remainder(date(2026, 10, 1)), -100)
+        self.assertEqual(self.snapshot(date(2026, 10, 1)), -100)
+
+    def test_rerun_overwrites_stale_value(self):
+        self.car_expense(100, date(2026, 10, 1))
+        ledger.close_day(date(2026, 10, 1))
+        self.car_expense(25, date(2026, 10, 1))
+
+        ledger.close_day(date(2026, 10, 1))
+        self.assertEqual(self.remainder(date(2026, 10, 1)), -125)
+        self.assertEqual(self.snapshot(date(2026, 10, 1)), -125)
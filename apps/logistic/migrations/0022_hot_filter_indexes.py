@@ -0,0 +1,47 @@
+# Generated by Django 5.1.5 on 2026-10-18 12:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logistic', '0021_alter_car_tech_passport'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carexpense',
+            index=models.Index(fields=['date'], name='logistic_ca_date_1e5ed5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carexpense',
+            index=models.Index(fields=['creator', 'date'], name='logistic_ca_creator_5bbd67_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contractincome',
+            index=models.Index(fields=['date'], name='logistic_co_date_a11435_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contractrecord',
+            index=models.Index(fields=['date', 'remaining'], name='logistic_co_date_5c4847_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logisticsalarypayment',
+            index=models.Index(fields=['date'], name='logistic_lo_date_a325ff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logisticsalarypayment',
+            index=models.Index(fields=['creator', 'date'], name='logistic_lo_creator_bac388_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tir',
+            index=models.Index(fields=['status', 'created_at'], name='logistic_ti_status_67147e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waybillpayout',
+            index=models.Index(fields=['date'], name='logistic_wa_date_338c8a_idx'),
+        ),
+    ]
@@ -8,6 +8,9 @@ from rest_framework.exceptions import ValidationError
 from apps.common.models import BaseModel, BasePerson, CURRENCY_TYPE, TRANSFER_TYPE
 from apps.common.services.logging import Telegram
 from apps.common.utils import convert_currency
+from apps.common.services import summary_cache, transaction_index
+from apps.ledger import services as ledger
+from apps.ledger.services import Leg
 from apps.users.models import User
 
 
@@ -35,6 +38,7 @@ class Driver(BasePerson):
         verbose_name = "Haydovchi "
         verbose_name_plural = "Haydovchilar "
 
+    @property
     def full_name(self):
         return f"{self.first_name} {self.middle_name} {self.last_name}" if self.middle_name else f"{self.first_name} {self.last_name}"
 
@@ -197,6 +201,9 @@ class TIR(BaseModel):
         verbose_name = "TIR "
         verbose_name_plural = "TIRlar "
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
 
 
 class Company(BaseModel):
@@ -254,14 +261,32 @@ class WaybillPayout(BaseModel):
         verbose_name = "Haydochi yo'l puli "
         verbose_name_plural = "Haydochi yo'l pullari "
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def summary_buckets(self):
+        return [
+            ("logistic", summary_cache.ALL, self.date),
+        ]
+
+    def index_row(self):
+        return transaction_index.row(self, "LO-WP", "logistic", "waybill_payout", "outcome")
 
     def save(self, *args, **kwargs):
         with transaction.atomic():
-            if self.pk:
-                prev = WaybillPayout.objects.get(pk=self.pk)
-
+            stale = summary_cache.stored_buckets(self)
             super().save(*args, **kwargs)
 
+            transaction_index.index(self)
+            summary_cache.touch(self, stale)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            transaction_index.remove(self)
+            summary_cache.touch(self)
+            super().delete(*args, **kwargs)
+
 
 
 
@@ -294,7 +319,7 @@ class TIRRecord(BaseModel):
                     f"🗓️ Йўл қоғози санаси: {self.waybill.departure_date if self.waybill else 'N/A'}\n"
                 )
                 Telegram.send_log(message, app_button=True)
-            if self.creator.role == "CEO":
+            if self.creator.role == "ceo":
                 self.status = 'verified'
 
             super().save(*args, **kwargs)
@@ -325,18 +350,20 @@ class ContractRecord(BaseModel):
         verbose_name = "Shartnoma "
         verbose_name_plural = "Shartnomalar "
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date', 'remaining']),
+        ]
 
     def __str__(self):
         return self.contract_number
 
+    def ledger_legs(self):
+        # To'lovlar ContractIncome orqali kamayadi, shuning uchun bu yerda to'liq summa
+        return [Leg(self.contractor, "landing", self.amount or 0, self.currency_type)]
+
     def save(self, *args, **kwargs):
         with transaction.atomic():
-            if self.pk:
-                prev = ContractRecord.objects.get(pk=self.pk)
-                Contractor.objects.filter(id=prev.contractor.id).update(
-                    landing=F("landing") - prev.remaining
-                )
-            else:
+            if not self.pk:
                 message = (
                     f"📜 Янги шартнома яратилди:\n"
                     f"🔸 Шартнома рақами: {self.contract_number}\n"
@@ -363,9 +390,14 @@ class ContractRecord(BaseModel):
 
             super().save(*args, **kwargs)
 
-            Contractor.objects.filter(id=self.contractor.id).update(
-                landing=F("landing") + self.remaining
-            )
+            ledger.repost(self, self.ledger_legs())
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            for income in self.contractincome_set.all():
+                ledger.reverse(income)
+            ledger.reverse(self)
+            super().delete(*args, **kwargs)
 
 
 class ContractCars(BaseModel):
@@ -394,30 +426,55 @@ class ContractIncome(BaseModel):
         verbose_name = "Shartnoma to'lovi "
         verbose_name_plural = "Shartnoma to'lovlari "
         ordering = ["-date"]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
 
     def __str__(self):
         return self.contract.contract_number
 
+    def summary_buckets(self):
+        return [
+            ("logistic", summary_cache.ALL, self.date),
+        ]
+
+    def index_row(self):
+        return transaction_index.row(self, "LO-CI", "logistic", "contract_income", "income")
+
+    def ledger_legs(self):
+        return [
+            Leg(self.creator, "balance", self.amount, self.currency_type),
+            Leg(self.contract.contractor, "landing", -self.amount, self.currency_type),
+        ]
+
     def save(self, *args, **kwargs):
         with transaction.atomic():
+            stale = summary_cache.stored_buckets(self)
             if self.pk:
                 prev = ContractIncome.objects.get(pk=self.pk)
-                ContractRecord.objects.filter(id=prev.contract).update(
+                ContractRecord.objects.filter(id=prev.contract.id).update(
                     remaining=F("remaining") +
                               convert_currency(prev.currency_type, prev.contract.currency_type, prev.amount),
                 )
-                User.objects.filter(id=prev.creator.id).update(
-                    balance=F("balance") -
-                            convert_currency(prev.currency_type, prev.creator.currency_type, prev.amount))
             super().save(*args, **kwargs)
 
             ContractRecord.objects.filter(id=self.contract.id).update(
                 remaining=F('remaining') -
                           convert_currency(self.currency_type, self.contract.currency_type, self.amount))
 
-            User.objects.filter(id=self.creator.id).update(
-                balance=F("balance") - convert_currency(self.currency_type, self.creator.currency_type, self.amount)
-            )
+            ledger.repost(self, self.ledger_legs())
+            transaction_index.index(self)
+            summary_cache.touch(self, stale)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            ContractRecord.objects.filter(id=self.contract.id).update(
+                remaining=F('remaining') +
+                          convert_currency(self.currency_type, self.contract.currency_type, self.amount))
+            ledger.reverse(self)
+            transaction_index.remove(self)
+            summary_cache.touch(self)
+            super().delete(*args, **kwargs)
 
 
 class CarExpense(BaseModel):
@@ -433,6 +490,10 @@ class CarExpense(BaseModel):
         verbose_name = "Mashina harajati "
         verbose_name_plural = "Mashina harajatlari "
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date']),
+            models.Index(fields=['creator', 'date']),
+        ]
 
     def __str__(self):
         if self.car and self.trailer:
@@ -443,19 +504,35 @@ class CarExpense(BaseModel):
             return self.trailer.state_number
         return str(self.id)
 
+    def summary_buckets(self):
+        return [
+            ("logistic", summary_cache.ALL, self.date),
+            ("mixed", self.creator_id, self.date),
+        ]
+
+    def index_row(self):
+        return transaction_index.row(self, "LO-CE", "logistic", "car_expense", "outcome")
+
+    def ledger_legs(self):
+        return [Leg(self.creator, "balance", -self.amount, self.currency_type)]
+
     def save(self, *args, **kwargs):
         with transaction.atomic():
-            if self.pk:
-                prev = CarExpense.objects.get(id=self.pk)
-                converted_amount = convert_currency(prev.currency_type, "UZS", prev.amount)
-                User.objects.filter(id=prev.creator.id).update(balance=F('balance') + converted_amount)
-
-            if self.creator.role == "CEO":
+            stale = summary_cache.stored_buckets(self)
+            if self.creator.role == "ceo":
                 self.status = 'verified'
             super().save(*args, **kwargs)
 
-            converted_amount = convert_currency(self.currency_type, "UZS", self.amount)
-            User.objects.filter(id=self.creator.id).update(balance=F('balance') + converted_amount)
+            ledger.repost(self, self.ledger_legs())
+            transaction_index.index(self)
+            summary_cache.touch(self, stale)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            ledger.reverse(self)
+            transaction_index.remove(self)
+            summary_cache.touch(self)
+            super().delete(*args, **kwargs)
 
 
 class LogisticSalaryPayment(BaseModel):
@@ -470,6 +547,10 @@ class LogisticSalaryPayment(BaseModel):
         verbose_name = "Haydovchi maoshi "
         verbose_name_plural = "Haydovchilar maoshlari "
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['date']),
+            models.Index(fields=['creator', 'date']),
+        ]
 
     def __str__(self):
         if self.driver:
@@ -478,20 +559,36 @@ class LogisticSalaryPayment(BaseModel):
             return self.description
         return str(self.id)
 
+    def summary_buckets(self):
+        return [
+            ("logistic", summary_cache.ALL, self.date),
+            ("mixed", self.creator_id, self.date),
+        ]
+
+    def index_row(self):
+        return transaction_index.row(self, "LO-SP", "logistic", "driver_salary", "outcome")
+
+    def ledger_legs(self):
+        return [Leg(self.creator, "balance", -self.amount, self.currency_type)]
+
     def save(self, *args, **kwargs):
         with transaction.atomic():
-            if self.pk:
-                prev = LogisticSalaryPayment.objects.get(id=self.pk)
-                converted_amount = convert_currency(prev.currency_type, "UZS", prev.amount)
-                User.objects.filter(id=prev.creator.id).update(balance=F('balance') + converted_amount)
-
-            if self.creator.role == "CEO":
+            stale = summary_cache.stored_buckets(self)
+            if self.creator.role == "ceo":
                 self.status = 'verified'
 
             super().save(*args, **kwargs)
 
-            converted_amount = convert_currency(self.currency_type, "UZS", self.amount)
-            User.objects.filter(id=self.creator.id).update(balance=F('balance') - converted_amount)
+            ledger.repost(self, self.ledger_legs())
+            transaction_index.index(self)
+            summary_cache.touch(self, stale)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            ledger.reverse(self)
+            transaction_index.remove(self)
+            summary_cache.touch(self)
+            super().delete(*args, **kwargs)
 
 #
 # TRANSIT_STATUS_CHOICES = (
@@ -10,6 +10,7 @@ from .models import (
     TIR, TIRRecord, Company, Waybill, ContractRecord, ContractCars, ContractIncome, WaybillPayout
 )
 from ..main.serializers import IncomeSerializer
+from apps.common.services.logging import Telegram
 
 
 # Driver serilizers
@@ -311,7 +312,7 @@ class ContractRecordCreateSerializer(ModelSerializer):
         return data
 
     def create(self, validated_data):
-        with transaction.atomic():
+        with transaction.atomic(), Telegram.batch():
             cars_data = validated_data.pop('cars', [])
             validated_data['remaining'] = validated_data.get('amount', 0)
             contract_record = ContractRecord.objects.create(**validated_data)
@@ -324,7 +325,7 @@ class ContractRecordCreateSerializer(ModelSerializer):
             return contract_record
 
     def update(self, instance, validated_data):
-        with transaction.atomic():
+        with transaction.atomic(), Telegram.batch():
             cars_data = validated_data.pop('cars', None)
             for attr, value in validated_data.items():
                 setattr(instance, attr, value)
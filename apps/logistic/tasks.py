@@ -0,0 +1,28 @@
+import tempfile
+
+from celery import shared_task
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .utils import render_waybills, waybill_queryset
+
+
+@shared_task
+def render_waybills_file(ids=None, date=None):
+    """
+    Putyovkalarni (id lar yoki jo'nash sanasi bo'yicha) bitta xlsx faylga yozib default_storage ga saqlaydi.
+    Qaytaradi: fayl yo'li
+    """
+    waybills = waybill_queryset().order_by("departure_date", "id")
+    if ids:
+        waybills = waybills.filter(id__in=ids)
+    if date:
+        waybills = waybills.filter(departure_date=parse_date(date))
+
+    name = f"waybills/putyovka-{date or timezone.localdate().isoformat()}-{timezone.now():%H%M%S}.xlsx"
+    with tempfile.TemporaryFile() as handle:
+        render_waybills(waybills, handle)
+        handle.seek(0)
+        return default_storage.save(name, File(handle))
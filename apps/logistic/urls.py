@@ -14,7 +14,7 @@ from .views import (
     TIRListCreateView, TIRDetailView, TIRRecordListCreateView, TIRRecordDetailView,
     CompanyListCreateView, CompanyDetailView, WaybillListCreateView, WaybillDetailView, ContractRecordListCreateView,
     ContractRecordDetailView, ContractIncomeListCreateView, ContractIncomeRetrieveUpdateDestroyView,
-    WaybillPayoutListCreateView, WaybillPayoutRetrieveUpdateDestroyView, LogisticSummaryAPIView
+    WaybillPayoutListCreateView, WaybillPayoutRetrieveUpdateDestroyView, LogisticSummaryAPIView, WaybillPrintView
 )
 
 urlpatterns = [
@@ -49,6 +49,7 @@ urlpatterns = [
     # Waybill URLS
     path('transits/', WaybillListCreateView.as_view(), name='waybill-list-create'),
     path('transits/<int:pk>/', WaybillDetailView.as_view(), name='waybill-detail'),
+    path('transits/print/', WaybillPrintView.as_view(), name='waybill-print'),
 
     path('transit-payouts/', WaybillPayoutListCreateView.as_view(), name='waybill-payout-list-create'),
     path('transit-payouts/<int:pk>/', WaybillPayoutRetrieveUpdateDestroyView.as_view(), name='waybill-payout-detail'),
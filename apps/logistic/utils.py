@@ -1,102 +1,143 @@
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill
-from openpyxl.utils import get_column_letter
-from datetime import datetime
-
-# Create a new workbook and select the active sheet
-wb = openpyxl.Workbook()
-ws = wb.active
-ws.title = "Activity Report"
-
-# Set page layout to mimic the image (A4 size, portrait orientation)
-ws.page_setup.paperSize = ws.PAPERSIZE_A4
-ws.page_setup.orientation = ws.ORIENTATION_PORTRAIT
-
-# Define some styles
-bold_font = Font(bold=True, size=12)
-center_alignment = Alignment(horizontal='center', vertical='center')
-green_fill = PatternFill(start_color='00FF00', end_color='00FF00', fill_type='solid')
-
-# Merge cells and set header information
-ws.merge_cells('B3:N3')
-ws['B3'] = "1413"
-ws['B3'].font = Font(bold=True, size=16)
-ws['B3'].alignment = center_alignment
-
-ws.merge_cells('B4:N4')
-ws['B4'] = "20.03.2025 5инт пубый"
-ws['B4'].alignment = center_alignment
-
-ws.merge_cells('B5:G5')
-ws['B5'] = "20.03.2025 17:00"
-ws['B5'].alignment = center_alignment
-
-ws.merge_cells('I5:N5')
-ws['I5'] = "19.04.2025 24:00"
-ws['I5'].alignment = center_alignment
-
-# Personal and vehicle information
-ws['B7'] = "АБДУЛЛАЕВ АЗАМАТХОЖИ"
-ws['B7'].font = bold_font
-
-ws['B8'] = "ДАФ 40 148 УБА"
-
-ws['B9'] = "БОНУМ 40 0055 СА"
-
-ws['B10'] = "АА№0153428"
-ws['B10'].alignment = Alignment(horizontal='right')
-
-# Company information
-ws.merge_cells('B12:N12')
-ws['B12'] = "ООО ОЛТАРИО КОМФОРТ ТРАНС"
-ws['B12'].font = bold_font
-ws['B12'].alignment = center_alignment
-
-ws.merge_cells('B13:N13')
-ws['B13'] = "page 1"
-ws['B13'].alignment = center_alignment
-
-# Footer information
-ws.merge_cells('B15:N15')
-ws['B15'] = "ПО ТЕРРИТОРИИ СНГ"
-ws['B15'].alignment = center_alignment
-
-ws['B16'] = "Р.СОХНБАЗАРОВ"
-ws['N16'] = "М.ЖК"
-ws['N16'].alignment = Alignment(horizontal='right')
-
-# Add green dots (mimicking the positions in the image)
-# These positions are approximate based on the image
-green_dot_positions = [
-    (3, 2),   # Near the QR code
-    (6, 2),   # Left side
-    (9, 2),   # Left side
-    (12, 3),  # Slightly right
-    (14, 4),  # Further right
-    (16, 5),  # Further right
-    (18, 6),  # Further right
-    (20, 7),  # Further right
-    (22, 8),  # Further right
-    (24, 9),  # Further right
-    (26, 10), # Further right
-    (28, 11), # Further right
-]
-
-for row, col in green_dot_positions:
-    cell = ws.cell(row=row, column=col)
-    cell.fill = green_fill
-
-# Placeholder for QR code (we'll just leave a space for it)
-ws.merge_cells('B2:C3')
-ws['B2'] = "[QR Code Placeholder]"
-ws['B2'].alignment = center_alignment
-
-# Adjust column widths and row heights for better layout
-for col in range(1, 15):  # Columns A to N
-    ws.column_dimensions[get_column_letter(col)].width = 5
-for row in range(1, 30):  # Rows 1 to 29
-    ws.row_dimensions[row].height = 20
-
-# Save the file
-wb.save("activity_report.xlsx")
-print("Excel file 'activity_report.xlsx' has been created.")
\ No newline at end of file
+from io import BytesIO
+
+from django.conf import settings
+
+from apps.common.services.export import ExportUnavailable
+from apps.logistic.models import Waybill
+
+try:
+    import openpyxl
+    from openpyxl.styles import Font, Alignment
+    from openpyxl.utils import get_column_letter
+except ImportError:
+    openpyxl = None
+
+DATE_FORMAT = "%d.%m.%Y"
+
+# Jarayon bo'yicha bir marta yuklanadi: (shablon fayl baytlari, [(katak, "{maydon}" li matn), ...])
+_template = None
+
+
+class _Context(dict):
+    # Shablonda bo'lib, ma'lumotda yo'q maydonlar bo'sh qoladi
+    def __missing__(self, key):
+        return ""
+
+
+def _build_template():
+    """
+    Standart putyovka shakli (A4, portret). settings.WAYBILL_TEMPLATE berilmagan bo'lsa ishlatiladi.
+    """
+    workbook = openpyxl.Workbook()
+    ws = workbook.active
+    ws.title = "Putyovka"
+    ws.page_setup.paperSize = ws.PAPERSIZE_A4
+    ws.page_setup.orientation = ws.ORIENTATION_PORTRAIT
+
+    bold_font = Font(bold=True, size=12)
+    center_alignment = Alignment(horizontal='center', vertical='center')
+
+    cells = (
+        # (katak, birlashtiriladigan oraliq, matn, shrift, tekislash)
+        ('B3', 'B3:N3', "{number}", Font(bold=True, size=16), center_alignment),
+        ('B4', 'B4:N4', "{departure_date}", None, center_alignment),
+        ('B5', 'B5:G5', "{departure_date}", None, center_alignment),
+        ('I5', 'I5:N5', "{arrival_date}", None, center_alignment),
+        ('B7', None, "{driver_1}", bold_font, None),
+        ('B8', None, "{car}", None, None),
+        ('B9', None, "{trailer}", None, None),
+        ('B10', None, "{tir}", None, Alignment(horizontal='right')),
+        ('B12', 'B12:N12', "{company}", bold_font, center_alignment),
+        ('B13', 'B13:N13', "{driver_2}", None, center_alignment),
+        ('B15', 'B15:N15', "ПО ТЕРРИТОРИИ СНГ", None, center_alignment),
+        ('B16', None, "{director}", None, None),
+        ('N16', None, "{page}", None, Alignment(horizontal='right')),
+    )
+    for coordinate, merged, text, font, alignment in cells:
+        if merged:
+            ws.merge_cells(merged)
+        ws[coordinate] = text
+        if font:
+            ws[coordinate].font = font
+        if alignment:
+            ws[coordinate].alignment = alignment
+
+    for col in range(1, 15):
+        ws.column_dimensions[get_column_letter(col)].width = 5
+    for row in range(1, 30):
+        ws.row_dimensions[row].height = 20
+
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def get_template():
+    global _template
+    if openpyxl is None:
+        raise ExportUnavailable("Putyovka chop etish uchun openpyxl o'rnatilmagan.")
+    if _template is None:
+        path = getattr(settings, "WAYBILL_TEMPLATE", None)
+        if path:
+            with open(path, "rb") as handle:
+                content = handle.read()
+        else:
+            content = _build_template()
+        sheet = openpyxl.load_workbook(BytesIO(content)).worksheets[0]
+        placeholders = [(cell.coordinate, cell.value) for row in sheet.iter_rows() for cell in row
+                        if isinstance(cell.value, str) and "{" in cell.value]
+        _template = (content, placeholders)
+    return _template
+
+
+def waybill_queryset():
+    return Waybill.objects.select_related("driver_1", "driver_2", "car", "trailer", "company", "tirrecord__tir")
+
+
+def _driver_name(driver):
+    return f"{driver.last_name} {driver.first_name}".upper() if driver else ""
+
+
+def _vehicle(vehicle, name):
+    return " ".join(part for part in (name, vehicle.state_number) if part).upper() if vehicle else ""
+
+
+def waybill_context(waybill, page):
+    tir_record = getattr(waybill, "tirrecord", None)
+    return _Context(
+        number=waybill.pk,
+        departure_date=waybill.departure_date.strftime(DATE_FORMAT) if waybill.departure_date else "",
+        arrival_date=waybill.arrival_date.strftime(DATE_FORMAT) if waybill.arrival_date else "",
+        driver_1=_driver_name(waybill.driver_1),
+        driver_2=_driver_name(waybill.driver_2),
+        licence=waybill.driver_1.licence if waybill.driver_1 and waybill.driver_1.licence else "",
+        car=_vehicle(waybill.car, waybill.car.brand if waybill.car else None),
+        trailer=_vehicle(waybill.trailer, waybill.trailer.model if waybill.trailer else None),
+        tir=tir_record.tir.serial_number if tir_record and tir_record.tir else "",
+        company=waybill.company.name.upper() if waybill.company else "",
+        director=(waybill.company.director or "") if waybill.company else "",
+        page=f"page {page}",
+    )
+
+
+def render_waybills(waybills, target):
+    """
+    Putyovkalarni bitta faylga yozadi: har biri shablon varag'ining nusxasi alohida varaqda.
+    waybills uchun select_related qilingan queryset kutiladi (waybill_queryset).
+    Qaytaradi: varaqlar soni
+    """
+    content, placeholders = get_template()
+    workbook = openpyxl.load_workbook(BytesIO(content))
+    template = workbook.worksheets[0]
+    pages = 0
+    for waybill in waybills:
+        pages += 1
+        sheet = workbook.copy_worksheet(template)
+        sheet.title = f"Putyovka {waybill.pk}"
+        context = waybill_context(waybill, pages)
+        for coordinate, text in placeholders:
+            sheet[coordinate] = text.format_map(context)
+    if pages:
+        workbook.remove(template)
+    workbook.save(target)
+    return pages
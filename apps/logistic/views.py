@@ -1,4 +1,6 @@
+import tempfile
 from datetime import timedelta
+from django.http import FileResponse
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
@@ -27,8 +29,12 @@ from .serializers import (
 )
 from apps.users.permissions import IsLogisticAdmin, IsCEO
 from apps.main.models import Expense, Income
-from ..common.utils import convert_currency
+from apps.common.filters import DateRangeFilterBackend
+from apps.common.services import rollup, summary_cache
+from apps.common.services.export import CONTENT_TYPES, ExportUnavailable
+from ..common.utils import convert_currency, convert_currency_on
 from ..main.serializers import TransactionHistorySerializer
+from .utils import render_waybills, waybill_queryset
 
 
 # Driver views
@@ -265,7 +271,7 @@ class WaybillListCreateView(ListCreateAPIView):
     queryset = Waybill.objects.all()
     serializer_class = WaybillSerializer
     permission_classes = [IsLogisticAdmin | IsCEO]
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [DateRangeFilterBackend, DjangoFilterBackend, SearchFilter]
     filterset_fields = ['departure_date', 'car',]
     search_fields = [
         'departure_date', 'arrival_date',
@@ -277,16 +283,6 @@ class WaybillListCreateView(ListCreateAPIView):
 
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'car', openapi.IN_QUERY,
                 description="Filter by car ID",
@@ -305,23 +301,6 @@ class WaybillListCreateView(ListCreateAPIView):
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
-    def get_queryset(self):
-
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__lte=end_date)
-
-        return self.queryset
-
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return WaybillDetailSerailizer
@@ -337,6 +316,54 @@ class WaybillDetailView(RetrieveUpdateDestroyAPIView):
     permission_classes = [IsLogisticAdmin | IsCEO]
 
 
+class WaybillPrintView(APIView):
+    permission_classes = [IsLogisticAdmin | IsCEO]
+
+    @swagger_auto_schema(
+        operation_description="Putyovkalarni chop etish uchun bitta xlsx fayl (har biri alohida varaqda).",
+        manual_parameters=[
+            openapi.Parameter(
+                'ids', openapi.IN_QUERY,
+                description="Putyovka id lari, vergul bilan (masalan 1,2,3)",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'date', openapi.IN_QUERY,
+                description="Jo'nash sanasi (YYYY-MM-DD), ids berilmasa standart bugun",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
+            ),
+        ],
+        responses={200: "xlsx fayl", 404: "Putyovka topilmadi"}
+    )
+    def get(self, request):
+        waybills = waybill_queryset().order_by('departure_date', 'id')
+        ids = request.query_params.get('ids')
+        date = request.query_params.get('date')
+        if ids:
+            try:
+                waybills = waybills.filter(id__in=[int(pk) for pk in ids.split(',') if pk.strip()])
+            except ValueError:
+                return Response({"error": "ids must be comma separated integers."}, status=status.HTTP_400_BAD_REQUEST)
+        if date or not ids:
+            day = parse_date(date) if date else timezone.localdate()
+            if day is None:
+                return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+            waybills = waybills.filter(departure_date=day)
+
+        handle = tempfile.TemporaryFile()
+        try:
+            pages = render_waybills(waybills, handle)
+        except ExportUnavailable as e:
+            handle.close()
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not pages:
+            handle.close()
+            return Response({"error": "Waybills not found."}, status=status.HTTP_404_NOT_FOUND)
+        handle.seek(0)
+        return FileResponse(handle, as_attachment=True, filename=f"putyovka-{timezone.localdate():%Y%m%d}.xlsx",
+                            content_type=CONTENT_TYPES["xlsx"])
+
+
 class WaybillPayoutListCreateView(ListCreateAPIView):
     queryset = WaybillPayout.objects.all()
     permission_classes = [IsLogisticAdmin | IsCEO]
@@ -478,6 +505,7 @@ class ContractIncomeListCreateView(ListCreateAPIView):
     filter_backends = [DjangoFilterBackend, SearchFilter]
     filterset_fields = ['date', 'contract', 'currency_type']
     search_fields = ['contract__contract_number', 'bank_name', 'currency_type']
+    keyset_field = "-date"
 
     def get_queryset(self):
         queryset = ContractIncome.objects.all()
@@ -564,6 +592,7 @@ class CarExpenseListCreateView(ListCreateAPIView):
         'car__brand', 'car__model', 'car__tech_passport',
         'trailer__model', 'trailer__trailer_type', 'trailer__tech_passport'
     ]
+    keyset_field = "-date"
 
     @swagger_auto_schema(
         manual_parameters=[
@@ -617,7 +646,7 @@ class CarExpenseRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 class LogisticSalaryPaymentListCreateView(ListCreateAPIView):
     permission_classes = [IsLogisticAdmin | IsCEO]
     queryset = LogisticSalaryPayment.objects.all()
-    filter_backends = [SearchFilter]
+    filter_backends = [DateRangeFilterBackend, SearchFilter]
     search_fields = [
         'id', 'driver__first_name', 'driver__last_name', 'amount', 'description',
         'currency_type', 'driver__middle_name', 'driver__phone_number',
@@ -625,34 +654,8 @@ class LogisticSalaryPaymentListCreateView(ListCreateAPIView):
         'driver__extra_phone_number', 'driver__description'
     ]
 
-    def get_queryset(self):
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__gte=start_date)
-
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__lte=end_date)
-
-        return self.queryset
-
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'search',
                 in_=openapi.IN_QUERY,
@@ -687,6 +690,96 @@ class LogisticSalaryPaymentRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIVie
 
 
 
+def _car_expense_reason(car_expense):
+    parts = []
+    if car_expense.car:
+        parts.append(f"{car_expense.car.brand} {car_expense.car.state_number}")
+    if car_expense.trailer:
+        parts.append(f"{car_expense.trailer.model} {car_expense.trailer.state_number}")
+    return f"{' | '.join(parts)} учун ҳаражат."
+
+
+def logistic_summary_rows(start_date, end_date):
+    """
+    LogisticSummaryAPIView qatorlari: (kun, "incomes"|"outcomes", qator), summary_cache.collect uchun.
+    Har bir manba bog'langan obyektlari bilan bitta so'rovda o'qiladi.
+    """
+    # outcome: WaybillPayout, CarExpense, LogisticSalaryPayment, Expense
+
+    waybill_payouts = WaybillPayout.objects.filter(date__range=[start_date, end_date])
+    car_expenses = CarExpense.objects.filter(date__range=[start_date, end_date]).select_related('car', 'trailer')
+    salary_payments = LogisticSalaryPayment.objects.filter(date__range=[start_date, end_date]).select_related('driver')
+    expenses = Expense.objects.filter(section='logistic', created_at__range=[start_date, end_date])
+
+    for waybill_payout in waybill_payouts:
+        yield waybill_payout.date, "outcomes", {
+            'id': f"WB{waybill_payout.id}",
+            'reason': f"{waybill_payout.waybill_id} рақамидаги путёвка учун йўл ҳақи тўлови",
+            'amount': waybill_payout.amount,
+            'currency_type': waybill_payout.currency_type,
+            'date': waybill_payout.date,
+        }
+
+    for car_expense in car_expenses:
+        yield car_expense.date, "outcomes", {
+            'id': f"CE{car_expense.id}",
+            'reason': _car_expense_reason(car_expense),
+            'amount': car_expense.amount,
+            'currency_type': car_expense.currency_type,
+            'date': car_expense.date,
+        }
+
+    for salary_payment in salary_payments:
+        driver = salary_payment.driver.full_name if salary_payment.driver else "Ҳайдовчи"
+        yield salary_payment.date, "outcomes", {
+            'id': f"SP{salary_payment.id}",
+            'reason': f"{driver}га маош учун.",
+            'amount': salary_payment.amount,
+            'currency_type': salary_payment.currency_type,
+            'date': salary_payment.date,
+        }
+
+    for expense in expenses:
+        yield summary_cache.created_day(expense), "outcomes", {
+            'id': f"EX{expense.id}",
+            'reason': expense.reason,
+            'amount': expense.amount,
+            'currency_type': expense.currency_type,
+            'date': summary_cache.created_day(expense),
+        }
+
+    # income: ContractIncome, Income
+
+    contract_incomes = ContractIncome.objects.filter(date__range=[start_date, end_date]).select_related('contract')
+    incomes = Income.objects.filter(section='logistic', created_at__range=[start_date, end_date])
+
+    for contract_income in contract_incomes:
+        yield contract_income.date, "incomes", {
+            'id': f"CI{contract_income.id}",
+            'reason': f"{contract_income.contract.contract_number} рақамли шартнома пули тўланди.",
+            'amount': contract_income.amount,
+            'currency_type': contract_income.currency_type,
+            'date': contract_income.date,
+        }
+
+    for income in incomes:
+        yield summary_cache.created_day(income), "incomes", {
+            'id': f"IN{income.id}",
+            'reason': income.reason,
+            'amount': income.amount,
+            'currency_type': income.currency_type,
+            'date': summary_cache.created_day(income),
+        }
+
+
+def logistic_summary_totals(start_date, end_date):
+    """
+    Kirim va chiqim jami TransactionRollup ning kunlik qatorlaridan: (yo'nalish, valyuta, kun) yig'indilari
+    o'z sanasidagi kurs bo'yicha UZS ga o'tkaziladi.
+    """
+    return rollup.totals(start_date, end_date, section="logistic")
+
+
 class LogisticSummaryAPIView(APIView):
     permission_classes = [IsLogisticAdmin | IsCEO]
 
@@ -701,6 +794,11 @@ class LogisticSummaryAPIView(APIView):
                 'end_date', openapi.IN_QUERY,
                 description="End date for filtering (YYYY-MM-DD)",
                 type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
+            ),
+            openapi.Parameter(
+                'totals_only', openapi.IN_QUERY,
+                description="Faqat jami summalar, incomes va outcomes ro'yxatlarisiz",
+                type=openapi.TYPE_BOOLEAN
             )
         ],
         responses={
@@ -754,8 +852,7 @@ class LogisticSummaryAPIView(APIView):
                             description="List of outcome transactions"
                         ),
                     },
-                    required=['start_date', 'end_date', 'balance', 'total_income', 'total_outcome', 'incomes',
-                              'outcomes']
+                    required=['start_date', 'end_date', 'balance', 'total_income', 'total_outcome']
                 )
             )
         }
@@ -787,112 +884,36 @@ class LogisticSummaryAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        total_income = 0.00
-        total_outcome = 0.00
-
-
-        # outcome: WaybillPayout, CarExpense, LogisticSalaryPayment, Expense
-
-        outcomes_list = []
-
-        waybill_payouts = WaybillPayout.objects.filter(date__range=[start_date, end_date])
-        car_expenses = CarExpense.objects.filter(date__range=[start_date, end_date])
-        salary_payments = LogisticSalaryPayment.objects.filter(date__range=[start_date, end_date])
-        expense = Expense.objects.filter(section='logistic', created_at__range=[start_date, end_date])
-
-        for waybill_payout in waybill_payouts:
-            total_outcome += waybill_payout.amount
-            outcomes_list.append({
-                'id': f"WB{waybill_payout.id}",
-                'reason': f"{waybill_payout.waybill.id} рақамидаги путёвка учун йўл ҳақи тўлови",
-                'amount': waybill_payout.amount,
-                'currency_type': waybill_payout.currency_type,
-                'date': waybill_payout.date,
-            })
-
-        for car_expense in car_expenses:
-            total_outcome += car_expense.amount
-            reason = ""
-            reason += car_expense.car.brand, car_expense.car.state_number, "|" if car_expense.car else ""
-            reason += car_expense.trailer.model, car_expense.trailer.state_number if car_expense.trailer else ""
-            reason += " учун ҳаражат."
-            outcomes_list.append({
-                'id': f"CE{car_expense.id}",
-                'reason': reason,
-                'amount': car_expense.amount,
-                'currency_type': car_expense.currency_type,
-                'date': car_expense.date,
-            })
-
-        for salary_payment in salary_payments:
-            total_outcome += salary_payment.amount
-            outcomes_list.append({
-                'id': f"SP{salary_payment.id}",
-                'reason': f"{salary_payment.driver.full_name}га маош учун.",
-                'amount': salary_payment.amount,
-                'currency_type': salary_payment.currency_type,
-                'date': salary_payment.date,
-            })
-
-        for expense in expense:
-            total_outcome += expense.amount
-            outcomes_list.append({
-                'id': f"EX{expense.id}",
-                'reason': expense.reason,
-                'amount': expense.amount,
-                'currency_type': expense.currency_type,
-                'date': expense.created_at.strftime('%Y-%m-%d'),
-            })
-
-        # income: ContractIncome, Income
-
-        incomes_list = []
-
-        contract_income = ContractIncome.objects.filter(date__range=[start_date, end_date])
-        income = Income.objects.filter(section='logistic', created_at__range=[start_date, end_date])
-
-        for contract_income in contract_income:
-            total_income += contract_income.amount
-            incomes_list.append({
-                'id': f"CI{contract_income.id}",
-                'reason': f"{contract_income.contract.contract_number} рақамли шартнома пули тўланди.",
-                'amount': contract_income.amount,
-                'currency_type': contract_income.currency_type,
-                'date': contract_income.date,
-            })
-
-        for income in income:
-            total_income += income.amount
-            incomes_list.append({
-                'id': f"IN{income.id}",
-                'reason': income.reason,
-                'amount': income.amount,
-                'currency_type': income.currency_type,
-                'date': income.created_at,
-            })
-
-
-        return Response({
+        totals = logistic_summary_totals(start_date, end_date)
+        total_income, total_outcome = totals["income"], totals["outcome"]
+
+        data = {
             'start_date': start_date_str,
             'end_date': end_date_str,
             'balance': {
-                'uzs': convert_currency(request.user.currency_type, "UZS", request.user.balance),
-                'usd': convert_currency(request.user.currency_type, "USD", request.user.balance),
-                'rub': convert_currency(request.user.currency_type, "RUB", request.user.balance)
+                'uzs': convert_currency(request.user.currency_type, "UZS", request.user.current_balance),
+                'usd': convert_currency(request.user.currency_type, "USD", request.user.current_balance),
+                'rub': convert_currency(request.user.currency_type, "RUB", request.user.current_balance)
             },
             'total_income': {
                 'uzs': total_income,
-                'usd': convert_currency("UZS", "USD", total_income),
-                'rub': convert_currency("UZS", "RUB", total_income)
+                'usd': convert_currency_on("UZS", "USD", total_income, end_date),
+                'rub': convert_currency_on("UZS", "RUB", total_income, end_date)
             },
             'total_outcome': {
                 'uzs': total_outcome,
-                'usd': convert_currency("UZS", "USD", total_outcome),
-                'rub': convert_currency("UZS", "RUB", total_outcome)
+                'usd': convert_currency_on("UZS", "USD", total_outcome, end_date),
+                'rub': convert_currency_on("UZS", "RUB", total_outcome, end_date)
             },
-            'incomes': TransactionHistorySerializer(incomes_list, many=True).data,
-            'outcomes': TransactionHistorySerializer(outcomes_list, many=True).data,
-        })
+        }
+        if request.query_params.get('totals_only', '').lower() in ('1', 'true'):
+            return Response(data)
+
+        rows = summary_cache.collect("logistic", summary_cache.ALL, start_date.date(), end_date.date(),
+                                     logistic_summary_rows)
+        data['incomes'] = TransactionHistorySerializer(rows["incomes"], many=True).data
+        data['outcomes'] = TransactionHistorySerializer(rows["outcomes"], many=True).data
+        return Response(data)
 
 
 
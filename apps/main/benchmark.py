@@ -0,0 +1,238 @@
+import random
+import statistics
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.operations import AddIndex
+from django.utils import timezone
+
+from apps.common.models import CURRENCY_TYPE
+from apps.factory.models import Sale
+from apps.logistic.models import CarExpense, ContractRecord, LogisticSalaryPayment, TIR
+from apps.main.models import Expense, Income, MoneyCirculation, TransactionToSection, DailyRemainder
+from apps.main.utils import _day_bounds
+from apps.users.models import User
+
+# Tekshiriladigan indekslar shu migratsiyalardagi AddIndex lardan olinadi
+INDEX_MIGRATIONS = (
+    ("main", "0017_hot_filter_indexes"),
+    ("logistic", "0022_hot_filter_indexes"),
+    ("factory", "0031_hot_filter_indexes"),
+    ("garden", "0008_hot_filter_indexes"),
+)
+SEED_SECTIONS = ("factory", "fridge", "garden", "logistic", "general")
+PAGE = 50
+
+# section, user - filter qiymatlari; start/end - [start, end) oralig'i, day_start/day_end - bitta kun
+Context = namedtuple("Context", "section user start end start_day end_day day_start day_end")
+
+
+class Rollback(Exception):
+    pass
+
+
+def _page(queryset):
+    return queryset[:PAGE]
+
+
+HOT_QUERIES = {
+    "expense_section_list": lambda ctx: _page(Expense.objects.filter(
+        section=ctx.section, created_at__gte=ctx.start, created_at__lt=ctx.end).order_by("-created_at")),
+    "income_section_list": lambda ctx: _page(Income.objects.filter(
+        section=ctx.section, created_at__gte=ctx.start, created_at__lt=ctx.end).order_by("-created_at")),
+    "expense_user_day": lambda ctx: Expense.objects.filter(
+        user=ctx.user, created_at__range=(ctx.day_start, ctx.day_end)).values_list("currency_type", "amount"),
+    "income_user_day": lambda ctx: Income.objects.filter(
+        user=ctx.user, created_at__range=(ctx.day_start, ctx.day_end)).values_list("currency_type", "amount"),
+    "money_circulation_list": lambda ctx: _page(MoneyCirculation.objects.filter(
+        type="give", created_at__gte=ctx.start, created_at__lt=ctx.end).order_by("-created_at")),
+    "money_circulation_user_day": lambda ctx: MoneyCirculation.objects.filter(
+        creator=ctx.user, created_at__range=(ctx.day_start, ctx.day_end)).values_list("currency_type", "amount"),
+    "section_transfer_list": lambda ctx: _page(TransactionToSection.objects.filter(
+        type="give", created_at__gte=ctx.start, created_at__lt=ctx.end).order_by("-created_at")),
+    "daily_remainder_list": lambda ctx: DailyRemainder.objects.filter(
+        user=ctx.user, created_at__gte=ctx.start, created_at__lt=ctx.end).order_by("created_at"),
+    "car_expense_range": lambda ctx: _page(CarExpense.objects.filter(
+        date__range=(ctx.start_day, ctx.end_day)).order_by("-date")),
+    "car_expense_user": lambda ctx: CarExpense.objects.filter(
+        creator=ctx.user, date__range=(ctx.start_day, ctx.end_day)).values_list("currency_type", "amount"),
+    "driver_salary_user": lambda ctx: LogisticSalaryPayment.objects.filter(
+        creator=ctx.user, date__range=(ctx.start_day, ctx.end_day)).values_list("currency_type", "amount"),
+    "sale_user": lambda ctx: Sale.objects.filter(
+        creator=ctx.user, date__range=(ctx.start_day, ctx.end_day)).values_list("id", "payed_amount"),
+    "contract_open": lambda ctx: _page(ContractRecord.objects.filter(remaining__gt=0).order_by("-date")),
+    "tir_status_list": lambda ctx: _page(TIR.objects.filter(status="new").order_by("-created_at")),
+}
+
+
+def curated_indexes():
+    """
+    [(model, index), ...] - INDEX_MIGRATIONS dagi AddIndex amallari.
+    """
+    loader = MigrationLoader(connection, ignore_no_migrations=True)
+    result = []
+    for app_label, name in INDEX_MIGRATIONS:
+        migration = loader.disk_migrations[(app_label, name)]
+        for operation in migration.operations:
+            if isinstance(operation, AddIndex):
+                result.append((apps.get_model(app_label, operation.model_name), operation.index))
+    return result
+
+
+@contextmanager
+def _explicit_created_at(*models):
+    # auto_now_add bulk_create da ham created_at ni hozirgi vaqtga almashtiradi
+    fields = [model._meta.get_field("created_at") for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def seed(rows, days, rng, batch_size=2000):
+    """
+    Har bir model uchun rows ta yozuv, oxirgi days kunga tasodifiy taqsimlangan. bulk_create save() ni
+    chaqirmaydi: ledger, TransactionIndex va Telegram ga tegilmaydi. Qaytaradi: seed foydalanuvchilari.
+    """
+    users = [User.objects.create(username=f"benchmark_{section}_{rng.randrange(10 ** 9)}", role="admin",
+                                 section=section) for section in SEED_SECTIONS]
+    now = timezone.now()
+    currencies = [currency for currency, _ in CURRENCY_TYPE]
+
+    def moment():
+        return now - timedelta(seconds=rng.randrange(days * 86400))
+
+    def common():
+        created_at = moment()
+        return {"created_at": created_at, "amount": round(rng.uniform(1, 1000), 2),
+                "currency_type": rng.choice(currencies)}, timezone.localdate(created_at)
+
+    def money(model, **extra):
+        values, _ = common()
+        user = rng.choice(users)
+        return model(reason="benchmark", user=user, section=user.section,
+                     status=rng.choice(("new", "verified", "verified", "verified")), **values, **extra)
+
+    def dated(model, **extra):
+        values, day = common()
+        return model(creator=rng.choice(users), date=day, **values, **extra)
+
+    def money_circulation():
+        values, _ = common()
+        return MoneyCirculation(type=rng.choice(("get", "give")), creator=rng.choice(users), **values)
+
+    def section_transfer():
+        values, day = common()
+        return TransactionToSection(type=rng.choice(("get", "give")), section=rng.choice(SEED_SECTIONS),
+                                    creator=rng.choice(users), date=day, **values)
+
+    def contract():
+        values, day = common()
+        return ContractRecord(contract_number=f"B-{rng.randrange(10 ** 6)}", date=day,
+                              remaining=rng.choice((0, 0, 0, values["amount"])), **values)
+
+    def tir():
+        created_at = moment()
+        day = timezone.localdate(created_at)
+        return TIR(serial_number=f"B-{rng.randrange(10 ** 6)}", get_date=day, deadline=day + timedelta(days=60),
+                   status=rng.choice(("new", "given", "accepted", "submitted")), created_at=created_at)
+
+    factories = (
+        (Expense, lambda: money(Expense)),
+        (Income, lambda: money(Income)),
+        (MoneyCirculation, money_circulation),
+        (TransactionToSection, section_transfer),
+        (CarExpense, lambda: dated(CarExpense, reason="benchmark")),
+        (LogisticSalaryPayment, lambda: dated(LogisticSalaryPayment)),
+        (ContractRecord, contract),
+        (TIR, tir),
+    )
+    models = [model for model, _ in factories] + [Sale, DailyRemainder]
+    with _explicit_created_at(*models):
+        for model, factory in factories:
+            model.objects.bulk_create((factory() for _ in range(rows)), batch_size=batch_size)
+        Sale.objects.bulk_create(
+            (Sale(creator=rng.choice(users), date=timezone.localdate(created_at), created_at=created_at,
+                  payed_amount=round(rng.uniform(1, 1000), 2))
+             for created_at in (moment() for _ in range(rows))),
+            batch_size=batch_size,
+        )
+        # (user, date) unique: har bir foydalanuvchi uchun kuniga bitta qoldiq
+        DailyRemainder.objects.bulk_create(
+            (DailyRemainder(user=user, date=timezone.localdate(now - timedelta(days=offset)),
+                            amount=rng.uniform(0, 1000), created_at=now - timedelta(days=offset))
+             for user in users for offset in range(days)),
+            batch_size=batch_size,
+        )
+    return users
+
+
+def context(user, window_days=30):
+    today = timezone.localdate()
+    start_day = today - timedelta(days=window_days - 1)
+    start, end = _day_bounds(start_day, today)
+    # calculate_remainder dagidek: [00:00, 23:59:59.999999]
+    day_start = timezone.make_aware(datetime.combine(today, dt_time.min))
+    day_end = timezone.make_aware(datetime.combine(today, dt_time.max))
+    return Context(user.section or "general", user, start, end, start_day, today, day_start, day_end)
+
+
+def measure(ctx, repeat=5, analyze=False):
+    """
+    Har bir so'rov uchun EXPLAIN reja va repeat ta bajarilishning mediana vaqti (ms), bitta qizdirishdan keyin.
+    """
+    results = {}
+    for name, build in HOT_QUERIES.items():
+        queryset = build(ctx)
+        list(queryset.all())
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = len(list(queryset.all()))
+            timings.append((time.perf_counter() - started) * 1000)
+        plan = queryset.explain(analyze=True) if analyze else queryset.explain()
+        results[name] = {"ms": round(statistics.median(timings), 3), "rows": rows, "plan": plan}
+    return results
+
+
+def run(rows=20000, days=365, repeat=5, seed_data=True, analyze=False, random_seed=0):
+    """
+    Bitta tranzaksiya ichida: (ixtiyoriy) ma'lumot seed qilinadi, indekslar olib tashlanib "before",
+    qayta qo'shilib "after" o'lchanadi. Oxirida hammasi rollback: baza o'zgarmaydi.
+    """
+    if analyze and connection.vendor != "postgresql":
+        analyze = False
+    indexes = curated_indexes()
+    report = {"vendor": connection.vendor, "rows": rows if seed_data else None, "indexes": len(indexes)}
+    # SQLite da schema_editor atomic ichida faqat FK tekshiruvi oldindan o'chirilgan bo'lsa ishlaydi
+    constraints_disabled = connection.disable_constraint_checking()
+    try:
+        with transaction.atomic():
+            if seed_data:
+                user = seed(rows, days, random.Random(random_seed))[0]
+            else:
+                user = User.objects.filter(role="admin").order_by("pk").first() or User.objects.order_by("pk").first()
+            ctx = context(user)
+            with connection.schema_editor() as editor:
+                for model, index in indexes:
+                    editor.remove_index(model, index)
+            report["before"] = measure(ctx, repeat, analyze)
+            with connection.schema_editor() as editor:
+                for model, index in indexes:
+                    editor.add_index(model, index)
+            report["after"] = measure(ctx, repeat, analyze)
+            raise Rollback
+    except Rollback:
+        pass
+    finally:
+        if constraints_disabled:
+            connection.enable_constraint_checking()
+    return report
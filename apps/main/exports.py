@@ -0,0 +1,181 @@
+import logging
+from collections import namedtuple
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.common.models import TransactionIndex, TRANSACTION_DIRECTION_CHOICES, SECTION_CHOICES
+from apps.common.services import export, rollup, summary_cache
+from apps.factory.models import Sale
+from apps.main.models import Expense, Income
+from apps.main.utils import summary_queryset
+
+# scope: "user" - faqat o'z yozuvlari, "section" - CEO yoki o'z bo'limidagi admin, "ceo" - faqat CEO
+Export = namedtuple("Export", "columns rows scope")
+
+DIRECTIONS = dict(TRANSACTION_DIRECTION_CHOICES)
+SECTIONS = dict(SECTION_CHOICES)
+JOB_KEY = "export:job:{}"
+
+logger = logging.getLogger(__name__)
+
+
+def parse_params(query_params, user):
+    """
+    So'rov parametrlarini JSON ga yaroqli ko'rinishga keltiradi (Celery task ham shuni oladi).
+    Sana noto'g'ri bo'lsa ValueError. Admin uchun bo'lim o'z bo'limiga qat'iy o'rnatiladi.
+    """
+    today = timezone.localdate()
+    start_raw = query_params.get("start_date")
+    end_raw = query_params.get("end_date")
+    start_day = parse_date(start_raw) if start_raw else today - timedelta(days=30)
+    end_day = parse_date(end_raw) if end_raw else today
+    if start_day is None or end_day is None:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+    if end_day < start_day:
+        raise ValueError("end_date cannot be before start_date.")
+
+    section = query_params.get("section") or None
+    if user.role != "ceo":
+        section = user.section
+    return {
+        "start_date": start_day.isoformat(),
+        "end_date": end_day.isoformat(),
+        "section": section,
+        "period": query_params.get("period") or rollup.DAY,
+    }
+
+
+def _bounds(params):
+    return summary_cache.day_bounds(parse_date(params["start_date"]), parse_date(params["end_date"]))
+
+
+def _sectioned(queryset, params):
+    return queryset.filter(section=params["section"]) if params["section"] else queryset
+
+
+def history_rows(params, user):
+    return summary_queryset(*_bounds(params), [user]).order_by("-day", "uid")
+
+
+def transaction_rows(params, user):
+    queryset = TransactionIndex.objects.filter(date__range=(params["start_date"], params["end_date"]))
+    return (_sectioned(queryset, params).order_by("-date", "-created_at")
+            .values("unique_id", "section", "kind", "direction", "status", "creator__username", "description",
+                    "amount", "currency_type", "amount_uzs", "date", "created_at"))
+
+
+def rollup_rows(params, user):
+    period = params["period"] if params["period"] in rollup.PERIODS else rollup.DAY
+    filters = {"section": params["section"]} if params["section"] else {}
+    return rollup.series(params["start_date"], params["end_date"], period, ("section",), **filters)
+
+
+def _money_rows(model):
+    def rows(params, user):
+        queryset = model.objects.filter(created_at__range=_bounds(params))
+        return (_sectioned(queryset, params).order_by("-created_at")
+                .values("id", "section", "reason", "description", "amount", "currency_type", "status",
+                        "user__username", "created_at"))
+    return rows
+
+
+def sale_rows(params, user):
+    return (Sale.objects.with_totals().filter(date__range=(params["start_date"], params["end_date"]))
+            .order_by("-date", "-id")
+            .values("id", "date", "client__first_name", "client__last_name", "items_quantity", "items_amount",
+                    "payed_amount", "status", "creator__username", "description"))
+
+
+def _section_name(key):
+    return lambda row: SECTIONS.get(row[key], row[key])
+
+
+MONEY_COLUMNS = (
+    ("ID", "id"), ("Bo'lim", _section_name("section")), ("Sabab", "reason"), ("Izoh", "description"),
+    ("Summa", "amount"), ("Valyuta", "currency_type"), ("Status", "status"), ("Foydalanuvchi", "user__username"),
+    ("Sana", "created_at"),
+)
+
+EXPORTS = {
+    "history": Export((
+        ("ID", "uid"), ("Bo'lim", "section_name"), ("Tur", lambda row: DIRECTIONS.get(row["kind"])),
+        ("Izoh", "note"), ("Summa", "amount_value"), ("Valyuta", "currency"), ("Sana", "day"),
+    ), history_rows, "user"),
+    "transactions": Export((
+        ("ID", "unique_id"), ("Bo'lim", _section_name("section")), ("Manba", "kind"),
+        ("Tur", lambda row: DIRECTIONS.get(row["direction"])), ("Status", "status"),
+        ("Foydalanuvchi", "creator__username"), ("Izoh", "description"), ("Summa", "amount"),
+        ("Valyuta", "currency_type"), ("Summa (UZS)", "amount_uzs"), ("Sana", "date"), ("Yaratilgan", "created_at"),
+    ), transaction_rows, "section"),
+    "rollup": Export((
+        ("Sana", "date"), ("Bo'lim", _section_name("section")), ("Kirim (UZS)", "income"),
+        ("Chiqim (UZS)", "outcome"), ("Soni", "count"),
+    ), rollup_rows, "ceo"),
+    "expenses": Export(MONEY_COLUMNS, _money_rows(Expense), "section"),
+    "incomes": Export(MONEY_COLUMNS, _money_rows(Income), "section"),
+    "sales": Export((
+        ("ID", "id"), ("Sana", "date"), ("Mijoz ismi", "client__first_name"), ("Mijoz familiyasi", "client__last_name"),
+        ("Savatlar soni", "items_quantity"), ("Summa", "items_amount"), ("To'langan", "payed_amount"),
+        ("Status", "status"), ("Sotuvchi", "creator__username"), ("Izoh", "description"),
+    ), sale_rows, "ceo"),
+}
+
+
+def allowed(spec, user):
+    if user.role == "ceo":
+        return True
+    if spec.scope == "user":
+        return True
+    return spec.scope == "section" and user.role == "admin" and bool(user.section)
+
+
+def stream(rows):
+    """
+    Queryset lar server tomonidagi cursor bilan bo'laklab o'qiladi, butun natija xotiraga olinmaydi.
+    """
+    if hasattr(rows, "iterator"):
+        return rows.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    return iter(rows)
+
+
+def row_count(rows):
+    return len(rows) if isinstance(rows, list) else rows.count()
+
+
+def get_job(job_id):
+    return cache.get(JOB_KEY.format(job_id))
+
+
+def update_job(job_id, **values):
+    job = get_job(job_id) or {}
+    job.update(values)
+    cache.set(JOB_KEY.format(job_id), job, timeout=settings.EXPORT_JOB_TIMEOUT)
+    return job
+
+
+def start_job(name, file_format, params, user):
+    """
+    Katta eksportni Celery ga topshiradi. Broker ishlamasa None (view 503 qaytaradi).
+    """
+    from apps.main.tasks import build_export
+
+    job_id = uuid4().hex
+    update_job(job_id, status="pending", name=name, format=file_format, user=user.pk)
+    try:
+        build_export.apply_async((job_id, name, file_format, params, user.pk), retry=False)
+    except Exception:
+        logger.exception("Eksport vazifasini Celery ga yuborib bo'lmadi")
+        cache.delete(JOB_KEY.format(job_id))
+        return None
+    return job_id
+
+
+def build(job_id, name, file_format, params, user):
+    spec = EXPORTS[name]
+    path = f"exports/{job_id}/{export.filename(name, file_format)}"
+    return export.save(path, file_format, spec.columns, stream(spec.rows(params, user)))
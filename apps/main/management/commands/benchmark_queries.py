@@ -0,0 +1,39 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.main import benchmark
+
+
+class Command(BaseCommand):
+    help = ("Asosiy filter so'rovlarini indekslarsiz (before) va indekslar bilan (after) o'lchaydi. "
+            "Hammasi bitta tranzaksiyada bajarilib rollback qilinadi, baza o'zgarmaydi")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=20000, help="Har bir model uchun seed yozuvlar soni")
+        parser.add_argument("--days", type=int, default=365, help="Seed yozuvlar taqsimlanadigan kunlar")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0, help="Tasodifiy sonlar generatori uchun seed")
+        parser.add_argument("--no-seed", action="store_true", help="Mavjud ma'lumotlar ustida o'lchash")
+        parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (faqat PostgreSQL)")
+        parser.add_argument("--output", help="Natijani (rejalar bilan) JSON faylga yozish")
+
+    def handle(self, *args, **options):
+        report = benchmark.run(
+            rows=options["rows"], days=options["days"], repeat=options["repeat"], seed_data=not options["no_seed"],
+            analyze=options["analyze"], random_seed=options["seed"],
+        )
+        self.stdout.write(f"{report['vendor']}, rows={report['rows']}, indexes={report['indexes']}")
+        self.stdout.write(f"{'query':<28}{'rows':>6}{'before ms':>12}{'after ms':>12}{'x':>8}")
+        for name, before in report["before"].items():
+            after = report["after"][name]
+            speedup = before["ms"] / after["ms"] if after["ms"] else 0
+            self.stdout.write(f"{name:<28}{after['rows']:>6}{before['ms']:>12.2f}{after['ms']:>12.2f}{speedup:>8.1f}")
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  before: {before['plan']}\n  after:  {after['plan']}")
+
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, cls=DjangoJSONEncoder, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Saved: {options['output']}"))
@@ -6,9 +6,8 @@ from django.db.models import Case, When, Value, CharField
 from apps.common.services.logging import Telegram
 from apps.common.utils import fetch_currency_rate
 from apps.main.utils import calculate_remainder
-from apps.main.models import DailyRemainder
+from apps.ledger.services import close_day
 from apps.logistic.models import ContractRecord
-from apps.users.models import User
 
 
 class Command(BaseCommand):
@@ -32,12 +31,8 @@ class Command(BaseCommand):
         )
 
     def save_user_remainder(self):
-        for user in User.objects.all():
-            DailyRemainder.objects.create(
-                user=user,
-                amount=round(user.balance, 2),
-                currency_type=user.currency_type
-            )
+        # Kechagi kun yopiladi: foydalanuvchilar, ishchilar, mijozlar va boshqa barcha balanslar
+        return close_day()
 
     def handle(self, *args, **kwargs):
 
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:55
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_dates(apps, schema_editor):
+    # Yozuvlar yarim tunda yaratilgan, ya'ni oldingi kun qoldig'i. Bir kunda bir nechta bo'lsa oxirgisi olinadi
+    DailyRemainder = apps.get_model('main', 'DailyRemainder')
+    seen = set()
+    for remainder in DailyRemainder.objects.filter(user__isnull=False).order_by('-created_at'):
+        day = timezone.localdate(remainder.created_at) - timedelta(days=1)
+        if (remainder.user_id, day) not in seen:
+            seen.add((remainder.user_id, day))
+            DailyRemainder.objects.filter(pk=remainder.pk).update(date=day)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_alter_accounthistory_reason'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyremainder',
+            name='date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_dates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailyremainder',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='unique_daily_remainder'),
+        ),
+    ]
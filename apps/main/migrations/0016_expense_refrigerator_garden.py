@@ -0,0 +1,85 @@
+# Generated by Django 5.1.5 on 2026-10-18 12:12
+
+import re
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Eski yozuvlar: fridge "expense|<id>", "electricity|<id>", "income|<id>";
+# garden "... <nomi> учун харажат | <id>", "... учун кирим | <id>"
+FRIDGE_REASON = re.compile(r"^(?:expense|electricity|income)\|(\d+)$")
+GARDEN_REASON = re.compile(r"учун (?:харажат|кирим) \| (\d+)$")
+
+
+def link_cost_centers(apps, schema_editor):
+    Refrigerator = apps.get_model('fridge', 'Refrigerator')
+    Garden = apps.get_model('garden', 'Garden')
+    refrigerators = set(Refrigerator.objects.values_list('id', flat=True))
+    gardens = set(Garden.objects.values_list('id', flat=True))
+
+    for model_name in ('Expense', 'Income'):
+        model = apps.get_model('main', model_name)
+        changed = []
+        for obj in model.objects.filter(section__in=('fridge', 'garden')).only('id', 'section', 'reason').iterator():
+            if obj.section == 'fridge':
+                match = FRIDGE_REASON.match(obj.reason or "")
+                if match and int(match.group(1)) in refrigerators:
+                    obj.refrigerator_id = int(match.group(1))
+                    changed.append(obj)
+            else:
+                match = GARDEN_REASON.search(obj.reason or "")
+                if match and int(match.group(1)) in gardens:
+                    obj.garden_id = int(match.group(1))
+                    changed.append(obj)
+        model.objects.bulk_update(changed, ['refrigerator', 'garden'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fridge', '0002_remove_refrigerator_status'),
+        ('garden', '0007_remove_gardener_debt_remove_gardener_landing_and_more'),
+        ('main', '0015_dailyremainder_date_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='garden',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='expenses', to='garden.garden'),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='refrigerator',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='expenses', to='fridge.refrigerator'),
+        ),
+        migrations.AddField(
+            model_name='income',
+            name='garden',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='incomes', to='garden.garden'),
+        ),
+        migrations.AddField(
+            model_name='income',
+            name='refrigerator',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='incomes', to='fridge.refrigerator'),
+        ),
+        migrations.RunPython(link_cost_centers, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['section', 'refrigerator', 'created_at'], name='main_expens_section_e8dec1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['section', 'garden', 'created_at'], name='main_expens_section_b7e8f5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['section', 'refrigerator', 'created_at'], name='main_income_section_d30e35_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['section', 'garden', 'created_at'], name='main_income_section_2b948c_idx'),
+        ),
+    ]
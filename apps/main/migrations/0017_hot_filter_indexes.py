@@ -0,0 +1,53 @@
+# Generated by Django 5.1.5 on 2026-10-18 12:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fridge', '0002_remove_refrigerator_status'),
+        ('garden', '0008_hot_filter_indexes'),
+        ('main', '0016_expense_refrigerator_garden'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyremainder',
+            index=models.Index(fields=['user', 'created_at'], name='main_dailyr_user_id_821de7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['section', 'created_at'], name='main_expens_section_a51937_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'created_at'], name='main_expens_user_id_07da4e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['section', 'created_at'], name='main_income_section_6140a4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'created_at'], name='main_income_user_id_8e67a6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moneycirculation',
+            index=models.Index(fields=['type', 'created_at'], name='main_moneyc_type_6d1317_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moneycirculation',
+            index=models.Index(fields=['creator', 'created_at'], name='main_moneyc_creator_707a00_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transactiontosection',
+            index=models.Index(fields=['type', 'created_at'], name='main_transa_type_145f6e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transactiontosection',
+            index=models.Index(fields=['creator', 'created_at'], name='main_transa_creator_203fc2_idx'),
+        ),
+    ]
@@ -2,11 +2,12 @@ from pyexpat.errors import messages
 
 from django.core.cache import cache
 from django.db import models, transaction
-from django.db.models import F
 from rest_framework.exceptions import ValidationError
 from apps.common.services.logging import Telegram
 from apps.common.models import BaseModel, SECTION_CHOICES, BasePerson, CURRENCY_TYPE, SECTION_TO_KIRILL
-from apps.common.utils import convert_currency
+from apps.common.services import summary_cache, transaction_index
+from apps.ledger import services as ledger
+from apps.ledger.services import Leg
 from apps.users.models import User
 
 
@@ -17,40 +18,55 @@ class Expense(BaseModel):
     currency_type = models.CharField(max_length=20, choices=CURRENCY_TYPE, default="UZS")
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="expenses_created")
     section = models.CharField(max_length=30, choices=SECTION_CHOICES, null=True, blank=True)
+    refrigerator = models.ForeignKey('fridge.Refrigerator', on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='expenses')
+    garden = models.ForeignKey('garden.Garden', on_delete=models.SET_NULL, null=True, blank=True,
+                               related_name='expenses')
     creator = None
 
     class Meta:
         verbose_name = "Xarajat"
         verbose_name_plural = "Xarajatlar"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['section', 'refrigerator', 'created_at']),
+            models.Index(fields=['section', 'garden', 'created_at']),
+            models.Index(fields=['section', 'created_at']),
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+    def summary_buckets(self):
+        return [
+            (self.section, summary_cache.ALL, summary_cache.created_day(self)),
+            ("mixed", self.user_id, summary_cache.created_day(self)),
+        ]
+
+    def index_row(self):
+        return transaction_index.row(self, "MA-EX", self.section, "expense", "outcome", creator=self.user)
+
+    def ledger_legs(self):
+        return [Leg(self.user, "balance", -self.amount, self.currency_type)]
 
     def save(self, *args, **kwargs):
         with transaction.atomic():
-            if self.pk:
-                prev = Expense.objects.get(id=self.pk)
-                User.objects.filter(id=prev.user.id).update(
-                    balance=F("balance") + convert_currency(prev.currency_type, prev.user.currency_type, prev.amount))
+            stale = summary_cache.stored_buckets(self)
+            if self.user.role == "ceo":
+                self.status = 'verified'
 
             super().save(*args, **kwargs)
 
-            User.objects.filter(id=self.user.id).update(
-                balance=F("balance") - convert_currency(self.currency_type, self.user.currency_type, self.amount)
-            )
-
-            if self.user.role == "CEO":
-                self.status = 'verified'
-                self.save(update_fields=['status'])
+            ledger.repost(self, self.ledger_legs())
+            transaction_index.index(self)
+            summary_cache.touch(self, stale)
 
             message = f"💸 Харажат\n🔣 {SECTION_TO_KIRILL[self.section]}\n🆔 {self.id}\n🏷 {self.reason}\n📝 {self.description}\n👤 {self.user.get_full_name()}\n➖ {self.amount} {self.currency_type}"
             Telegram.send_log(message, app_button=True)
 
     def delete(self, *args, **kwargs):
         with transaction.atomic():
-            User.objects.filter(id=self.user.id).update(
-                balance=F('balance') + convert_currency(
-                    self.currency_type, self.user.currency_type, self.amount
-                )
-            )
+            ledger.reverse(self)
+            transaction_index.remove(self)
+            summary_cache.touch(self)
             super().delete(*args, **kwargs)
 
     def __str__(self):
@@ -64,43 +80,58 @@ class Income(BaseModel):
     currency_type = models.CharField(max_length=20, choices=CURRENCY_TYPE, default="UZS")
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     section = models.CharField(max_length=30, choices=SECTION_CHOICES, null=True, blank=True)
+    refrigerator = models.ForeignKey('fridge.Refrigerator', on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='incomes')
+    garden = models.ForeignKey('garden.Garden', on_delete=models.SET_NULL, null=True, blank=True,
+                               related_name='incomes')
     creator = None
 
     class Meta:
         verbose_name = "Kirim "
         verbose_name_plural = "Kirimlar "
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['section', 'refrigerator', 'created_at']),
+            models.Index(fields=['section', 'garden', 'created_at']),
+            models.Index(fields=['section', 'created_at']),
+            models.Index(fields=['user', 'created_at']),
+        ]
 
     def __str__(self):
         return self.reason
 
+    def summary_buckets(self):
+        return [
+            (self.section, summary_cache.ALL, summary_cache.created_day(self)),
+            ("mixed", self.user_id, summary_cache.created_day(self)),
+        ]
+
+    def index_row(self):
+        return transaction_index.row(self, "MA-IN", self.section, "income", "income", creator=self.user)
+
+    def ledger_legs(self):
+        return [Leg(self.user, "balance", self.amount, self.currency_type)]
+
     def save(self, *args, **kwargs):
         with transaction.atomic():
-            if self.pk:
-                prev = Income.objects.get(id=self.pk)
-                User.objects.filter(id=prev.user.id).update(
-                    balance=F("balance") - convert_currency(prev.currency_type, prev.user.currency_type, prev.amount))
+            stale = summary_cache.stored_buckets(self)
+            if self.user.role == "ceo":
+                self.status = 'verified'
 
             super().save(*args, **kwargs)
 
-            User.objects.filter(id=self.user.id).update(
-                balance=F("balance") + convert_currency(self.currency_type, self.user.currency_type, self.amount)
-            )
-
-            if self.user.role == "CEO":
-                self.status = 'verified'
-                self.save(update_fields=['status'])
+            ledger.repost(self, self.ledger_legs())
+            transaction_index.index(self)
+            summary_cache.touch(self, stale)
 
             message = f"💸 Кирим\n🔣 {SECTION_TO_KIRILL[self.section]}\n🆔 {self.id}\n🏷 {self.reason}\n📝 {self.description}\n👤 {self.user.get_full_name()}\n➕ {self.amount} {self.currency_type}"
             Telegram.send_log(message, app_button=True)
 
     def delete(self, *args, **kwargs):
         with transaction.atomic():
-            User.objects.filter(id=self.user.id).update(
-                balance=F('balance') - convert_currency(
-                    self.currency_type, self.user.currency_type, self.amount
-                )
-            )
+            ledger.reverse(self)
+            transaction_index.remove(self)
+            summary_cache.touch(self)
             super().delete(*args, **kwargs)
 
 
@@ -133,127 +164,42 @@ class MoneyCirculation(BaseModel):
         verbose_name = "Pul oldi-berdi "
         verbose_name_plural = "Pul oldi-berdilari "
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['type', 'created_at']),
+            models.Index(fields=['creator', 'created_at']),
+        ]
+
+    def index_row(self):
+        return transaction_index.row(self, "MA-MC", "general", "money_circulation", "income" if self.type == "get" else "outcome")
+
+    def ledger_legs(self):
+        # Acquaintance holati: landing - debt. Berilganda oshadi, olinganda kamayadi
+        sign = 1 if self.type == "give" else -1
+        return [
+            Leg(self.creator, "balance", -sign * self.amount, self.currency_type),
+            Leg(self.acquaintance, "position", sign * self.amount, self.currency_type),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.acquaintance:
             raise ValidationError("Acquaintance is required")
         with transaction.atomic():
-            if self.pk:
-                prev = MoneyCirculation.objects.get(id=self.pk)
-                prev_converted_amount = prev.amount
-                if prev.acquaintance.currency_type != prev.currency_type:
-                    prev_converted_amount = convert_currency(prev.currency_type, prev.acquaintance.currency_type,
-                                                             prev.amount)
-
-                if prev.type == "get":
-                    User.objects.filter(id=prev.creator.id).update(
-                        balance=F('balance') - convert_currency(prev.currency_type, prev.creator.currency_type,
-                                                                prev.amount)
-                    )
-                    if prev.acquaintance.landing > 0:
-                        if prev.acquaintance.landing >= prev_converted_amount:
-                            prev.acquaintance.landing += prev_converted_amount
-                        else:
-                            extra_debt_reversed = prev_converted_amount - prev.acquaintance.landing
-                            prev.acquaintance.landing = 0
-                            prev.acquaintance.debt -= extra_debt_reversed
-                    else:
-                        prev.acquaintance.debt -= prev_converted_amount
-
-                elif prev.type == "give":
-                    User.objects.filter(id=prev.creator.id).update(
-                        balance=F('balance') + convert_currency(prev.currency_type, prev.creator.currency_type,
-                                                                prev.amount)
-                    )
-                    if prev.acquaintance.debt > 0:
-                        if prev.acquaintance.debt >= prev_converted_amount:
-                            prev.acquaintance.debt += prev_converted_amount
-                        else:
-                            extra_landing_reversed = prev_converted_amount - prev.acquaintance.debt
-                            prev.acquaintance.debt = 0
-                            prev.acquaintance.landing -= extra_landing_reversed
-                    else:
-                        prev.acquaintance.landing -= prev_converted_amount
-                prev.acquaintance.save()
-            else:
+            if not self.pk:
                 message = f"💸 Пул олди-берди\n🏷 {self.description}\n👤 {self.acquaintance.full_name}\n➕ {self.amount} {self.currency_type}"
                 Telegram.send_log(message, app_button=True)
 
-            converted_amount = self.amount
-            if self.acquaintance.currency_type != self.currency_type:
-                converted_amount = convert_currency(self.currency_type, self.acquaintance.currency_type, self.amount)
-            if self.type == 'get':
-                if self.acquaintance.landing > 0:
-                    if self.acquaintance.landing >= converted_amount:
-                        self.acquaintance.landing -= converted_amount
-                    else:
-                        extra_debt = converted_amount - self.acquaintance.landing
-                        self.acquaintance.landing = 0
-                        self.acquaintance.debt += extra_debt
-                else:
-                    self.acquaintance.debt += converted_amount
-                User.objects.filter(id=self.creator.id).update(
-                    balance=F('balance') + convert_currency(self.currency_type, self.creator.currency_type, self.amount)
-                )
-            elif self.type == 'give':
-                if self.acquaintance.debt > 0:
-                    if self.acquaintance.debt >= converted_amount:
-                        self.acquaintance.debt -= converted_amount
-                    else:
-                        extra_landing = converted_amount - self.acquaintance.debt
-                        self.acquaintance.debt = 0
-                        self.acquaintance.landing += extra_landing
-                else:
-                    self.acquaintance.landing += converted_amount
-                User.objects.filter(id=self.creator.id).update(
-                    balance=F('balance') - convert_currency(self.currency_type, self.creator.currency_type, self.amount)
-                )
-            self.acquaintance.landing = round(self.acquaintance.landing, 2)
-            self.acquaintance.debt = round(self.acquaintance.debt, 2)
-            self.acquaintance.save()
-
-            if self.creator.role == "CEO":
+            if self.creator.role == "ceo":
                 self.status = 'verified'
 
             super().save(*args, **kwargs)
 
+            ledger.repost(self, self.ledger_legs())
+            transaction_index.index(self)
+
     def delete(self, *args, **kwargs):
         with transaction.atomic():
-            converted_amount = self.amount
-            if self.acquaintance.currency_type != self.currency_type:
-                converted_amount = convert_currency(self.currency_type, self.acquaintance.currency_type, self.amount)
-
-            if self.type == "get":
-                User.objects.filter(id=self.creator.id).update(
-                    balance=F('balance') - convert_currency(self.currency_type, self.creator.currency_type, self.amount)
-                )
-                if self.acquaintance.landing > 0:
-                    if self.acquaintance.landing >= converted_amount:
-                        self.acquaintance.landing += converted_amount
-                    else:
-                        extra_debt_reversed = converted_amount - self.acquaintance.landing
-                        self.acquaintance.landing = 0
-                        self.acquaintance.debt -= extra_debt_reversed
-                else:
-                    self.acquaintance.debt -= converted_amount
-
-            elif self.type == "give":
-                User.objects.filter(id=self.creator.id).update(
-                    balance=F('balance') + convert_currency(self.currency_type, self.creator.currency_type, self.amount)
-                )
-                if self.acquaintance.debt > 0:
-                    if self.acquaintance.debt >= converted_amount:
-                        self.acquaintance.debt += converted_amount
-                    else:
-                        extra_landing_reversed = converted_amount - self.acquaintance.debt
-                        self.acquaintance.debt = 0
-                        self.acquaintance.landing -= extra_landing_reversed
-                else:
-                    self.acquaintance.landing -= converted_amount
-
-            self.acquaintance.landing = round(self.acquaintance.landing, 2)
-            self.acquaintance.debt = round(self.acquaintance.debt, 2)
-            self.acquaintance.save()
+            ledger.reverse(self)
+            transaction_index.remove(self)
 
             message = f"🗑 Пул олди-берди ўчирилди\n🏷 {self.description}\n👤 {self.acquaintance.full_name}\n➖ {self.amount} {self.currency_type}"
             Telegram.send_log(message, app_button=True)
@@ -280,17 +226,19 @@ class TransactionToAdmin(BaseModel):
         verbose_name_plural = "Admin hisobiga pul o'tkazishlar"
         ordering = ["-created_at"]
 
+    def ledger_legs(self):
+        return [Leg(self.admin, "balance", self.amount, self.currency_type)]
+
     def save(self, *args, **kwargs):
         with transaction.atomic():
-            if self.pk:
-                prev = TransactionToAdmin.objects.get(id=self.pk)
-                converted_amount = convert_currency(prev.currency_type, "UZS", prev.amount)
-                User.objects.filter(id=prev.creator.id).update(balance=F('balance') + converted_amount)
-
             super().save(*args, **kwargs)
 
-            converted_amount = convert_currency(self.currency_type, "UZS", self.amount)
-            User.objects.filter(id=self.creator.id).update(balance=F('balance') - converted_amount)
+            ledger.repost(self, self.ledger_legs())
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            ledger.reverse(self)
+            super().delete(*args, **kwargs)
 
 
 TRANSACTION_TYPE = (
@@ -314,42 +262,25 @@ class TransactionToSection(BaseModel):
         verbose_name = "Bo'lim hisobiga pul o'tkazish"
         verbose_name_plural = "Bo'lim hisobiga pul o'tkazishlar"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['type', 'created_at']),
+            models.Index(fields=['creator', 'created_at']),
+        ]
+
+    def ledger_legs(self):
+        sign = -1 if self.type == "get" else 1
+        return [Leg(self.creator, "balance", sign * self.amount, self.currency_type)]
 
     def save(self, *args, **kwargs):
         with transaction.atomic():
-            if self.pk:
-                prev = TransactionToSection.objects.get(id=self.pk)
-                if prev.type == "get":
-                    if prev.creator.role == 'admin':
-                        User.objects.filter(id=prev.creator.id).update(
-                            balance=F('balance') + convert_currency(prev.currency_type, prev.creator.currency_type, prev.amount))
-                    else:
-                        User.objects.filter(id=prev.creator.id).update(
-                            balance=F('balance') + convert_currency(prev.currency_type, prev.creator.currency_type, prev.amount))
-                else:
-                    if prev.creator.role == 'admin':
-                        User.objects.filter(id=prev.creator.id).update(
-                            balance=F('balance') - convert_currency(prev.currency_type, prev.creator.currency_type, prev.amount))
-                    else:
-                        User.objects.filter(id=prev.creator.id).update(
-                            balance=F('balance') - convert_currency(prev.currency_type, prev.creator.currency_type, prev.amount))
-
             super().save(*args, **kwargs)
 
-            if self.type == "get":
-                if self.creator.role == "admin":
-                    User.objects.filter(id=self.creator.id).update(
-                        balance=F('balance') - convert_currency(self.currency_type, self.creator.currency_type, self.amount))
-                else:
-                    User.objects.filter(id=self.creator.id).update(
-                        balance=F('balance') - convert_currency(self.currency_type, self.creator.currency_type, self.amount))
-            else:
-                if self.creator.role == "admin":
-                    User.objects.filter(id=self.creator.id).update(
-                        balance=F('balance') + convert_currency(self.currency_type, self.creator.currency_type, self.amount))
-                else:
-                    User.objects.filter(id=self.creator.id).update(
-                        balance=F('balance') + convert_currency(self.currency_type, self.creator.currency_type, self.amount))
+            ledger.repost(self, self.ledger_legs())
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            ledger.reverse(self)
+            super().delete(*args, **kwargs)
 
 
 class BankAccount(BaseModel):
@@ -397,46 +328,31 @@ class AccountHistory(BaseModel):
 
     def __str__(self):
         return f"{self.account} - {self.transaction_type} - {self.amount}"
+    def ledger_legs(self):
+        if self.transaction_type not in ("income", "outcome"):
+            raise ValidationError("Invalid transaction type")
+        sign = 1 if self.transaction_type == "income" else -1
+        return [Leg(self.account, "balance", sign * self.amount, self.currency_type)]
+
     def save(self, *args, **kwargs):
         with transaction.atomic():
-            if self.pk:
-                prev = AccountHistory.objects.get(id=self.pk)
-                if prev.transaction_type == "income":
-                    BankAccount.objects.filter(id=prev.account.id).update(
-                        balance=F('balance') - convert_currency(prev.currency_type, prev.account.currency_type, prev.amount))
-                else:
-                    BankAccount.objects.filter(id=prev.account.id).update(
-                        balance=F('balance') + convert_currency(prev.currency_type, prev.account.currency_type, prev.amount))
-            else:
+            legs = self.ledger_legs()
+            if not self.pk:
                 if self.transaction_type == "income":
                     t_type = "💰 Кирим"
                     arithmetic = "➕"
-                elif self.transaction_type == "outcome":
+                else:
                     t_type = "💸 Чиқим"
                     arithmetic = "➖"
-                else:
-                    raise ValidationError("Invalid transaction type")
                 message = f"🏦 Банк амалиёти\n{t_type}\n💳{self.account.bank_name} | {self.account.account_number}\n🏷 {self.reason }\n📝 { self.description }\n{arithmetic} {self.amount} {self.currency_type}"
                 Telegram.send_log(message, app_button=True)
             super().save(*args, **kwargs)
 
-            if self.transaction_type == "income":
-                BankAccount.objects.filter(id=self.account.id).update(
-                    balance=F('balance') + convert_currency(self.currency_type, self.account.currency_type, self.amount))
-            elif self.transaction_type == "outcome":
-                BankAccount.objects.filter(id=self.account.id).update(
-                    balance=F('balance') - convert_currency(self.currency_type, self.account.currency_type, self.amount))
-            else:
-                raise ValidationError("Invalid transaction type")
+            ledger.repost(self, legs)
 
     def delete(self, *args, **kwargs):
         with transaction.atomic():
-            if self.transaction_type == "income":
-                BankAccount.objects.filter(id=self.account.id).update(
-                    balance=F('balance') - convert_currency(self.currency_type, self.account.currency_type, self.amount))
-            elif self.transaction_type == "outcome":
-                BankAccount.objects.filter(id=self.account.id).update(
-                    balance=F('balance') + convert_currency(self.currency_type, self.account.currency_type, self.amount))
+            ledger.reverse(self)
             super().delete(*args, **kwargs)
 
 
@@ -444,6 +360,7 @@ class DailyRemainder(BaseModel):
     amount = models.FloatField()
     currency_type = models.CharField(max_length=20, choices=CURRENCY_TYPE, default="UZS")
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    date = models.DateField(null=True, blank=True)
 
     status = None
     creator = None
@@ -452,6 +369,12 @@ class DailyRemainder(BaseModel):
         verbose_name = "Kunlik qoldiq "
         verbose_name_plural = "Kunlik qoldiqlar "
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='unique_daily_remainder'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
 
     def __str__(self):
         return str(self.created_at)
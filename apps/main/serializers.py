@@ -6,7 +6,8 @@ from tutorial.quickstart.serializers import UserSerializer
 from .models import Acquaintance, MoneyCirculation, Income, Expense, DailyRemainder, TransactionToAdmin, \
     TransactionToSection, AccountHistory, BankAccount
 
-from apps.common.models import CurrencyRate
+from apps.common.models import CurrencyRate, SECTION_CHOICES
+from apps.users.models import User
 from apps.users.serializers import UserDetailSerializer
 
 class CurrencyRateSerializer(serializers.ModelSerializer):
@@ -160,4 +161,14 @@ class TransactionVerifyActionSerializer(serializers.Serializer):
         choices=['verify', 'cancel'],
         required=True,
         help_text="Amal: verify yoki cancel"
+    )
+    section = serializers.ChoiceField(
+        choices=SECTION_CHOICES, required=False,
+        help_text="Faqat 'ALL' uchun: shu bo'lim tranzaksiyalari"
+    )
+    start_date = serializers.DateField(required=False, help_text="Faqat 'ALL' uchun: shu sanadan (YYYY-MM-DD)")
+    end_date = serializers.DateField(required=False, help_text="Faqat 'ALL' uchun: shu sanagacha (YYYY-MM-DD)")
+    creator = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.filter(role="admin"), required=False,
+        help_text="Faqat 'ALL' uchun: shu admin kiritgan tranzaksiyalar"
     )
\ No newline at end of file
@@ -1,18 +1,64 @@
 from celery import shared_task
+from django.conf import settings
+from django.core.files.storage import default_storage
 from django.utils.timezone import now, localtime, timedelta
-from .models import DailyRemainder  # Adjust import as needed
+from apps.users.models import User
+from . import exports
+from .models import DailyRemainder
 from .utils import get_remainder_data
+from apps.common.utils import convert_currency_on
+
+
+def _to_uzs(tx):
+    return convert_currency_on(tx["currency_type"], "UZS", tx["amount"], tx["created_at"])
+
 
 @shared_task
 def save_daily_remainder():
     """
-    This task calculates and saves the daily remainder at 23:59.
+    Kechagi kunning umumiy (foydalanuvchisiz) kirim-chiqim farqini so'mda saqlaydi.
+    Qayta ishga tushirilsa shu kun yozuvi yangilanadi.
     """
     yesterday = localtime(now()).date() - timedelta(days=1)
-    start_date = yesterday
-    end_date = yesterday
 
-    amount = get_remainder_data(start_date, end_date)
+    data = get_remainder_data(yesterday, yesterday)
+    total_income = sum(_to_uzs(tx) for tx in data["sorted_income"])
+    total_outcome = sum(_to_uzs(tx) for tx in data["sorted_outcome"])
+    amount = round(total_income - total_outcome, 2)
+
+    DailyRemainder.objects.update_or_create(
+        user=None, date=yesterday, defaults={"amount": amount, "currency_type": "UZS"}
+    )
+    return f"Daily remainder saved: {amount}"
 
-    DailyRemainder.objects.create(amount=amount)
-    return f"Daily remainder saved: {amount}"
\ No newline at end of file
+
+@shared_task
+def build_export(job_id, name, file_format, params, user_id):
+    """
+    Katta eksportni faylga yozadi, holati keshdagi job yozuvida (exports.get_job).
+    """
+    try:
+        path = exports.build(job_id, name, file_format, params, User.objects.get(pk=user_id))
+    except Exception as e:
+        exports.update_job(job_id, status="failed", error=str(e))
+        raise
+    exports.update_job(job_id, status="done", path=path)
+    return path
+
+
+@shared_task
+def purge_exports():
+    """
+    Muddati o'tgan (job yozuvi keshdan o'chgan) eksport fayllarini o'chiradi.
+    """
+    if not default_storage.exists("exports"):
+        return "Removed: 0"
+    expired = now() - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT)
+    removed = 0
+    for job_id in default_storage.listdir("exports")[0]:
+        for name in default_storage.listdir(f"exports/{job_id}")[1]:
+            path = f"exports/{job_id}/{name}"
+            if default_storage.get_modified_time(path) < expired:
+                default_storage.delete(path)
+                removed += 1
+    return f"Removed: {removed}"
@@ -1,3 +1,145 @@
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.common import utils
+from apps.common.models import CurrencyRate, TransactionIndex
+from apps.common.services import approval_queue
+from apps.logistic.models import CarExpense
+from apps.main.models import Expense, Income
+from apps.main.utils import (VERIFICATION_MODELS, bulk_verify_transactions, encode_summary_cursor, summary_page,
+                             summary_rows)
+from apps.users.models import User
+
+
+class MainTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        CurrencyRate.objects.create(usd=12800, rub=140)
+        cls.ceo = User.objects.create(username="ceo", role="ceo", currency_type="UZS", section="general")
+        cls.admin = User.objects.create(username="admin", role="admin", currency_type="UZS", section="general")
+
+    def setUp(self):
+        cache.clear()
+        utils._snapshot = None
+        utils._history = None
+        self.client = APIClient()
+        self.client.force_authenticate(self.ceo)
+
+
+class SummaryPageTests(MainTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        today = timezone.localdate()
+        cls.start = timezone.make_aware(datetime.combine(today - timedelta(days=7), time.min))
+        cls.end = timezone.make_aware(datetime.combine(today, time.max))
+        for amount in (10, 20, 30):
+            Expense.objects.create(user=cls.ceo, section="general", reason="Chiqim", amount=amount, currency_type="UZS")
+            Income.objects.create(user=cls.ceo, section="general", reason="Kirim", amount=amount, currency_type="UZS")
+        for days in (1, 1, 3, 6):
+            CarExpense.objects.create(creator=cls.ceo, reason="Yoqilg'i", amount=5, currency_type="UZS",
+                                      date=today - timedelta(days=days))
+        # Boshqa foydalanuvchining va davrdan tashqaridagi yozuvlar kirmaydi
+        Expense.objects.create(user=cls.admin, section="general", reason="Chiqim", amount=1, currency_type="UZS")
+        CarExpense.objects.create(creator=cls.ceo, reason="Yoqilg'i", amount=5, currency_type="UZS",
+                                  date=today - timedelta(days=30))
+
+    def expected(self):
+        return [row["id"] for _, _, row in summary_rows(self.start, self.end, [self.ceo])]
+
+    def test_pages_follow_summary_order(self):
+        ids, cursor = [], None
+        while True:
+            rows, cursor = summary_page(self.start, self.end, [self.ceo], cursor, limit=3)
+            self.assertLessEqual(len(rows), 3)
+            ids += [row["uid"] for row in rows]
+            if cursor is None:
+                break
+        self.assertEqual(len(ids), 10)
+        self.assertEqual(ids, self.expected())
+
+    def test_cursor_after_last_row_is_empty(self):
+        last = list(summary_rows(self.start, self.end, [self.ceo]))[-1]
+        rows, cursor = summary_page(self.start, self.end, [self.ceo], encode_summary_cursor(last[0], last[2]["id"]))
+        self.assertEqual((rows, cursor), ([], None))
+
+    def test_history_view_pages(self):
+        params = {"start_date": self.start.strftime("%Y-%m-%d"), "end_date": self.end.strftime("%Y-%m-%d")}
+        full = self.client.get("/mixed/history/", params).data
+
+        ids = []
+        response = self.client.get("/mixed/history/", {**params, "page_size": 4})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["total_income"], full["total_income"])
+            self.assertEqual(response.data["total_outcome"], full["total_outcome"])
+            ids += [row["id"] for row in response.data["incomes"] + response.data["outcomes"]]
+            if response.data["next_cursor"] is None:
+                break
+            response = self.client.get("/mixed/history/", {**params, "cursor": response.data["next_cursor"]})
+
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertCountEqual(ids, [row["id"] for row in full["incomes"] + full["outcomes"]])
+
+    def test_history_view_rejects_bad_paging(self):
+        for params in ({"cursor": "garbage"}, {"page_size": 0}, {"page_size": "x"}):
+            self.assertEqual(self.client.get("/mixed/history/", params).status_code, 400)
+
+
+class BulkVerifyTests(MainTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.pending = [
+            Expense.objects.create(user=cls.admin, section="general", reason="Chiqim", amount=10, currency_type="UZS"),
+            Income.objects.create(user=cls.admin, section="general", reason="Kirim", amount=20, currency_type="UZS"),
+            CarExpense.objects.create(creator=cls.admin, reason="Yoqilg'i", amount=5, currency_type="UZS"),
+        ]
+        cls.verified = Expense.objects.create(user=cls.ceo, section="general", reason="Chiqim", amount=1,
+                                              currency_type="UZS")
+
+    def statuses(self):
+        return [type(obj).objects.get(pk=obj.pk).status for obj in self.pending]
+
+    def test_all_pending_are_updated_with_one_update_per_model(self):
+        self.assertEqual(sum(approval_queue.counts().values()), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                counts = bulk_verify_transactions("verify")
+
+        updates = [query["sql"] for query in queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), len(VERIFICATION_MODELS) + 1)
+        self.assertEqual(counts, {**dict.fromkeys(VERIFICATION_MODELS, 0), "expense": 1, "income": 1, "car_expense": 1})
+        self.assertEqual(self.statuses(), ["verified"] * 3)
+        self.assertFalse(TransactionIndex.objects.filter(status="new").exists())
+        self.assertEqual(sum(approval_queue.counts().values()), 0)
+
+    def test_filters_limit_the_update(self):
+        approval_queue.counts()
+        with self.captureOnCommitCallbacks(execute=True):
+            counts = bulk_verify_transactions("cancel", section="general")
+        self.assertEqual(sum(counts.values()), 2)
+        self.assertEqual(self.statuses(), ["canceled", "canceled", "new"])
+        # Keshdagi hisoblagich bazadan qayta hisoblangani bilan bir xil
+        cached = approval_queue.counts()
+        approval_queue.reset()
+        self.assertEqual(cached, approval_queue.counts())
+        self.assertEqual(cached["logistic"], 1)
+
+    def test_unknown_action_is_rejected(self):
+        with self.assertRaises(ValueError):
+            bulk_verify_transactions("approve")
+        self.assertEqual(self.statuses(), ["new"] * 3)
 
-# Create your tests here.
+    def test_endpoint_verifies_all(self):
+        response = self.client.post("/mixed/verifications/", {"unique_id": "ALL", "action": "verify"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total"], 3)
+        self.assertEqual(self.statuses(), ["verified"] * 3)
+        self.assertEqual(self.client.get("/mixed/verifications/counts/").data["total"], 0)
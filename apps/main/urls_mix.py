@@ -1,8 +1,14 @@
 from django.urls import path
 
-from .views import MixedHistoryView, TransactionApprovalView
+from .views import MixedHistoryView, TransactionApprovalView, RollupSummaryView, ExportView, \
+    ExportJobView, ApprovalQueueView, ApprovalCountsView
 
 urlpatterns = [
     path('history/', MixedHistoryView.as_view(), name='history'),
+    path('rollup/', RollupSummaryView.as_view(), name='rollup'),
+    path('export/jobs/<str:job_id>/', ExportJobView.as_view(), name='export-job'),
+    path('export/<str:name>/', ExportView.as_view(), name='export'),
     path('verifications/', TransactionApprovalView.as_view(), name='verification'),
+    path('verifications/queue/', ApprovalQueueView.as_view(), name='verification-queue'),
+    path('verifications/counts/', ApprovalCountsView.as_view(), name='verification-counts'),
 ]
\ No newline at end of file
@@ -1,8 +1,18 @@
-from datetime import datetime, time
+import heapq
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from operator import itemgetter
+
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import (
+    Case, CharField, Count, DateField, ExpressionWrapper, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce, Concat, TruncDate
 from django.utils import timezone
-from apps.common.utils import convert_currency
-from apps.factory.models import RawMaterialHistory, Sale, SalaryPayment as WorkerSalaryPayment
+from apps.common.services import approval_queue, rollup, transaction_index
+from apps.common.utils import convert_values, decode_cursor, encode_cursor, _as_date
+from apps.factory.models import RawMaterialHistory, Sale, SaleItem, SalaryPayment as WorkerSalaryPayment
 # from apps.fridge.models import Something
 from apps.garden.models import GardenSalaryPayment
 from apps.logistic.models import (
@@ -13,204 +23,151 @@ from apps.main.models import Income, Expense, MoneyCirculation, DailyRemainder
 from apps.users.models import User
 
 
-def get_remainder_data(start_date, end_date):
-    incomes = list(Income.objects.all().values("created_at", "description", "amount", "currency_type"))
-    expenses = list(Expense.objects.all().values("created_at", "description", "amount", "currency_type"))
-    circulations = list(
-        MoneyCirculation.objects.all().values("created_at", "description", "amount", "currency_type", "type"))
-
-    money_income = [
-        {
-            "created_at": tx["created_at"],
-            "description": tx["description"],
-            "amount": tx["amount"],
-            "currency_type": tx["currency_type"]
-        }
-        for tx in circulations if tx["type"] == "get"
-    ]
-    money_outcome = [
-        {
-            "created_at": tx["created_at"],
-            "description": tx["description"],
-            "amount": tx["amount"],
-            "currency_type": tx["currency_type"]
-         }
-        for tx in circulations if tx["type"] == "give"]
-
-    sorted_income = sorted(incomes + money_income, key=lambda x: x["created_at"], reverse=True)
-    sorted_outcome = sorted(expenses + money_outcome, key=lambda x: x["created_at"], reverse=True)
+REMAINDER_FIELDS = ("created_at", "description", "amount", "currency_type")
+
+
+def _day_bounds(start_date, end_date):
+    # [start_date 00:00, end_date + 1 kun 00:00) mahalliy vaqtda
+    start = timezone.make_aware(datetime.combine(_as_date(start_date), time.min))
+    end = timezone.make_aware(datetime.combine(_as_date(end_date) + timedelta(days=1), time.min))
+    return start, end
+
+
+def _stream(queryset, bounds, chunk_size):
+    start, end = bounds
+    return (queryset.filter(created_at__gte=start, created_at__lt=end)
+            .order_by("-created_at")
+            .values(*REMAINDER_FIELDS)
+            .iterator(chunk_size=chunk_size))
+
+
+def get_remainder_data(start_date, end_date, chunk_size=2000):
+    """
+    Davr ichidagi kirim va chiqimlar, created_at bo'yicha kamayish tartibida.
+    Har bir manba SQL da filtrlanib saralanadi va bo'laklab o'qiladi, heapq.merge ularni
+    xotiraga yig'masdan birlashtiradi. Natijadagi qiymatlar generator, bir marta o'qiladi.
+    """
+    bounds = _day_bounds(start_date, end_date)
+    key = itemgetter("created_at")
+    sorted_income = heapq.merge(
+        _stream(Income.objects.all(), bounds, chunk_size),
+        _stream(MoneyCirculation.objects.filter(type="get"), bounds, chunk_size),
+        key=key, reverse=True,
+    )
+    sorted_outcome = heapq.merge(
+        _stream(Expense.objects.all(), bounds, chunk_size),
+        _stream(MoneyCirculation.objects.filter(type="give"), bounds, chunk_size),
+        key=key, reverse=True,
+    )
     return {"sorted_income": sorted_income, "sorted_outcome": sorted_outcome}
 
 
 def calculate_remainder(date, user):
     start_of_day = timezone.make_aware(datetime.combine(date, time.min))
     end_of_day = timezone.make_aware(datetime.combine(date, time.max))
+    day_range = (start_of_day, end_of_day)
 
-    remainder = 0
     incomes = [
-        Sale.objects.filter(creator__in=user, created_at__range=(start_of_day, end_of_day)),
-        # TransitIncome.objects.filter(creator__in=user, created_at__range=(start_of_day, end_of_day)),
-        Income.objects.filter(user=user, created_at__range=(start_of_day, end_of_day)),
-        MoneyCirculation.objects.filter(creator__in=user, created_at__range=(start_of_day, end_of_day), type='get')
+        [("UZS", amount) for amount in Sale.objects.filter(
+            creator=user, created_at__range=day_range).values_list("payed_amount", flat=True)],
+        # TransitIncome.objects.filter(creator=user, created_at__range=day_range),
+        Income.objects.filter(user=user, created_at__range=day_range),
+        MoneyCirculation.objects.filter(creator=user, created_at__range=day_range, type='get')
     ]
     outcomes = [
-        RawMaterialHistory.objects.filter(creator__in=user, created_at__range=(start_of_day, end_of_day)),
-        CarExpense.objects.filter(creator__in=user, created_at__range=(start_of_day, end_of_day)),
-        GardenSalaryPayment.objects.filter(creator__in=user, created_at__range=(start_of_day, end_of_day)),
-        LogisticSalaryPayment.objects.filter(creator__in=user, created_at__range=(start_of_day, end_of_day)),
-        # TransitExpense.objects.filter(creator__in=user, created_at__range=(start_of_day, end_of_day)),
-        Expense.objects.filter(user=user, created_at__range=(start_of_day, end_of_day)),
-        MoneyCirculation.objects.filter(creator__in=user, created_at__range=(start_of_day, end_of_day), type='give'),
+        RawMaterialHistory.objects.filter(creator=user, created_at__range=day_range),
+        CarExpense.objects.filter(creator=user, created_at__range=day_range),
+        GardenSalaryPayment.objects.filter(creator=user, created_at__range=day_range),
+        LogisticSalaryPayment.objects.filter(creator=user, created_at__range=day_range),
+        # TransitExpense.objects.filter(creator=user, created_at__range=day_range),
+        Expense.objects.filter(user=user, created_at__range=day_range),
+        MoneyCirculation.objects.filter(creator=user, created_at__range=day_range, type='give'),
     ]
 
-    for outcome in outcomes:
-        for obj in outcome:
-            if obj.currency_type == "UZS":
-                remainder -= obj.amount
+    def rows(sources):
+        for source in sources:
+            if isinstance(source, list):
+                yield from source
             else:
-                remainder -= convert_currency("UZS", obj.currency_type, obj.amount)
+                yield from source.values_list("currency_type", "amount")
+
+    _, total_income = convert_values(rows(incomes))
+    _, total_outcome = convert_values(rows(outcomes))
+    return round(total_income - total_outcome, 2)
+
+
+# Admin kiritgan va tasdiq kutayotgan tranzaksiyalar turlari: TransactionIndex.kind -> manba model
+VERIFICATION_MODELS = {
+    "raw_material": RawMaterialHistory,
+    "worker_salary": WorkerSalaryPayment,
+    "sale": Sale,
+    "gardener_salary": GardenSalaryPayment,
+    "car_expense": CarExpense,
+    "driver_salary": LogisticSalaryPayment,
+    "expense": Expense,
+    "income": Income,
+}
+VERIFICATION_KINDS = approval_queue.KINDS
+VERIFICATION_STATUSES = {"verify": "verified", "cancel": "canceled"}
+
+
+def pending_verifications(section=None, start_date=None, end_date=None, creator=None):
+    """
+    Tasdiq kutayotgan yozuvlar TransactionIndex dan, ixtiyoriy bo'lim, sana (TransactionIndex.date) va
+    yaratuvchi bo'yicha filter bilan.
+    """
+    entries = approval_queue.pending()
+    if section:
+        entries = entries.filter(section=section)
+    if start_date:
+        entries = entries.filter(date__gte=start_date)
+    if end_date:
+        entries = entries.filter(date__lte=end_date)
+    if creator:
+        entries = entries.filter(creator=creator)
+    return entries
 
-    for income in incomes:
-        for obj in income:
-            if obj.currency_type == "UZS":
-                remainder += obj.amount
-            else:
-                remainder += convert_currency("UZS", obj.currency_type, obj.amount)
 
-    return remainder
+def verification_transaction():
+    entries = pending_verifications().select_related("creator").order_by("-created_at")
+    return [verification_item(entry) for entry in entries]
+
+
+def verification_item(entry):
+    # Xarajat va kirimlarda bo'lim kodi o'zi ko'rsatiladi
+    if entry.kind in ("expense", "income"):
+        section = entry.section
+    else:
+        section = SUMMARY_SECTIONS[entry.section][1]
+    return {
+        "unique_id": entry.unique_id,
+        "creator": str(entry.creator.get_full_name()),
+        "section": section,
+        "description": entry.description,
+        "amount": float(entry.amount or 0.0),
+        "currency_type": entry.currency_type,
+        "updated_at": entry.updated_at,
+        "created_at": entry.created_at,
+    }
 
 
-def verification_transaction():
-    transactions = []
-
-    ###### Factory #######
-    raw_material_objects = RawMaterialHistory.objects.filter(creator__role="admin", status="new").select_related('creator')
-    for obj in raw_material_objects:
-        unique_id = f"FA-RM-{obj.id}"
-        transactions.append({
-            "unique_id": unique_id,
-            "creator": str(obj.creator.get_full_name()),
-            "section": "Корзинка цех",
-            "description": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'curren cy_type', 'UZS'),
-            "updated_at": obj.updated_at if hasattr(obj, 'updated_at') else obj.created_at,
-            "created_at": obj.created_at,
-        })
-
-    worker_salary = WorkerSalaryPayment.objects.filter(creator__role="admin", status="new").select_related('creator')
-    for obj in worker_salary:
-        unique_id = f"FA-SP-{obj.id}"
-        transactions.append({
-            "unique_id": unique_id,
-            "creator": str(obj.creator.get_full_name()),
-            "section": "Корзинка цех",
-            "description": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "updated_at": obj.updated_at if hasattr(obj, 'updated_at') else obj.created_at,
-            "created_at": obj.created_at,
-        })
-
-
-    sales = Sale.objects.filter(creator__role="admin", status="new").select_related('creator')
-    for obj in sales:
-        unique_id = f"FA-SL-{obj.id}"
-        transactions.append({
-            "unique_id": unique_id,
-            "creator": str(obj.creator.get_full_name()),
-            "section": "Корзинка цех",
-            "description": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "updated_at": obj.updated_at if hasattr(obj, 'updated_at') else obj.created_at,
-            "created_at": obj.created_at,
-        })
-
-    ####### Fridge #############
-
-
-    ######## Garden ###########
-
-    gardener_salary = GardenSalaryPayment.objects.filter(creator__role="admin", status="new").select_related('creator')
-    for obj in gardener_salary:
-        unique_id = f"GA-SP-{obj.id}"
-        transactions.append({
-            "unique_id": unique_id,
-            "creator": str(obj.creator.get_full_name()),
-            "section": "Боғ",
-            "description": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "updated_at": obj.updated_at if hasattr(obj, 'updated_at') else obj.created_at,
-            "created_at": obj.created_at,
-        })
-
-
-    ###### Logistic ###########
-
-    car_expenses = CarExpense.objects.filter(creator__role="admin", status="new").select_related('creator')
-    for obj in car_expenses:
-        unique_id = f"LO-CE-{obj.id}"
-        transactions.append({
-            "unique_id": unique_id,
-            "creator": str(obj.creator.get_full_name()),
-            "section": "Логистика",
-            "description": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "updated_at": obj.updated_at if hasattr(obj, 'updated_at') else obj.created_at,
-            "created_at": obj.created_at,
-        })
-
-
-    driver_salary = LogisticSalaryPayment.objects.filter(creator__role="admin", status="new").select_related('creator')
-    for obj in driver_salary:
-        unique_id = f"LO-SP-{obj.id}"
-        transactions.append({
-            "unique_id": unique_id,
-            "creator": str(obj.creator.get_full_name()),
-            "section": "Логистика",
-            "description": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "updated_at": obj.updated_at if hasattr(obj, 'updated_at') else obj.created_at,
-            "created_at": obj.created_at,
-        })
-
-
-
-    ######## Main ############
-
-    expenses = Expense.objects.filter(user__role="admin", status="new").select_related('user')
-    for obj in expenses:
-        unique_id = f"MA-EX-{obj.id}"
-        transactions.append({
-            "unique_id": unique_id,
-            "creator":str(obj.user.get_full_name()),
-            "section": obj.section,
-            "description": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "updated_at": obj.updated_at if hasattr(obj, 'updated_at') else obj.created_at,
-            "created_at": obj.created_at,
-        })
-
-    incomes = Income.objects.filter(user__role="admin", status="new").select_related('user')
-    for obj in incomes:
-        unique_id = f"MA-IN-{obj.id}"
-        transactions.append({
-            "unique_id": unique_id,
-            "creator":str(obj.user.get_full_name()),
-            "section": obj.section,
-            "description": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "updated_at": obj.updated_at if hasattr(obj, 'updated_at') else obj.created_at,
-            "created_at": obj.created_at,
-        })
+def verification_page(cursor=None, limit=50, **filters):
+    """
+    Tasdiq navbatidan (created_at, id) kamayish tartibida bitta sahifa, status='new' qisman indeksi bo'yicha.
+    Qaytaradi: (qatorlar, keyingi sahifa cursori yoki None)
+    """
+    entries = pending_verifications(**filters).select_related("creator").order_by("-created_at", "-id")
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        created_at = datetime.fromisoformat(created_at)
+        entries = entries.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    entries = list(entries[:limit + 1])
 
-    return transactions
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor(entries[-1].created_at.isoformat(), entries[-1].pk)
+    return [verification_item(entry) for entry in entries], next_cursor
 
 
 def verify_transaction(unique_id, action):
@@ -226,19 +183,19 @@ def verify_transaction(unique_id, action):
         "FA": {"RM": RawMaterialHistory, "SP": WorkerSalaryPayment, "SL": Sale},
         # "FR": {"ST": "Storage"},
         "GA": {"SP": GardenSalaryPayment},
-        # "LO": {"CE": CarExpense, "SP": LogisticSalaryPayment, "TE": TransitExpense, "TI": TransitIncome},
+        "LO": {"CE": CarExpense, "SP": LogisticSalaryPayment},
+        # "LO": {"TE": TransitExpense, "TI": TransitIncome},
         "MA": {"EX": Expense, "IN": Income},
     }
 
-    if app_label not in app_model_map.keys():
+    # Avval TransactionIndex orqali, indeksda qator bo'lmasa prefikslar jadvali bo'yicha
+    obj = transaction_index.resolve(unique_id)
+    if obj is None and model_label not in app_model_map.get(app_label, {}):
         raise ValueError(f"Noto'g'ri unique_id: {unique_id}")
 
-    if model_label not in app_model_map[app_label].keys():
-        raise ValueError(f"Noto'g'ri unique_id: {unique_id}")
-
-    model = app_model_map[app_label][model_label]
     try:
-        obj = model.objects.get(id=obj_id)
+        if obj is None:
+            obj = app_model_map[app_label][model_label].objects.get(id=obj_id)
         if action == "verify":
             if hasattr(obj, "status"):
                 obj.status = "verified"
@@ -247,7 +204,7 @@ def verify_transaction(unique_id, action):
                 raise AttributeError(f"{model_label} modelida 'status' maydoni yo'q")
         elif action == "cancel":
             if hasattr(obj, "status"):
-                obj.status = "cancelled"
+                obj.status = VERIFICATION_STATUSES["cancel"]
                 obj.save(update_fields=["status"])
             else:
                 raise AttributeError(f"{model_label} modelida 'status' maydoni yo'q")
@@ -258,284 +215,194 @@ def verify_transaction(unique_id, action):
         raise Exception(f"Xatolik yuz berdi: {str(e)}")
 
 
+def bulk_verify_transactions(action, **filters):
+    """
+    "ALL" uchun: har bir manba modelda bitta UPDATE ... WHERE status='new' (id lar navbatdagi
+    TransactionIndex yozuvlaridan), keyin TransactionIndex da bitta UPDATE, hammasi bitta tranzaksiyada.
+    save() chaqirilmaydi: status ledger, rollup va summary qatorlariga ta'sir qilmaydi.
+    Qaytaradi: {kind: yangilangan yozuvlar soni}
+    """
+    if action not in VERIFICATION_STATUSES:
+        raise ValueError("Action faqat 'verify' yoki 'cancel' bo'lishi mumkin")
 
+    status = VERIFICATION_STATUSES[action]
+    entries = pending_verifications(**filters)
+    now = timezone.now()
+    counts = {}
+    with transaction.atomic():
+        sections = dict(entries.order_by().values_list("section").annotate(total=Count("id")))
+        for kind, model in VERIFICATION_MODELS.items():
+            object_ids = entries.filter(kind=kind).values("object_id")
+            counts[kind] = model.objects.filter(pk__in=object_ids, status="new").update(status=status, updated_at=now)
+        entries.update(status=status, updated_at=now)
+        approval_queue.adjust({section or "": -total for section, total in sections.items()})
+    return counts
+
+
+
+
+
+SUMMARY_SECTIONS = {
+    "factory": ("FA", "Корзинка цех"),
+    "fridge": ("FR", "Холодилник"),
+    "garden": ("GA", "Боғ"),
+    "logistic": ("LO", "Логистика"),
+    "general": ("MA", "Умумий"),
+}
+# summary_parts dagi Expense/Income dan boshqa manbalarning TransactionIndex.kind lari
+SUMMARY_SOURCES = ("raw_material", "worker_salary", "sale", "gardener_salary", "car_expense", "driver_salary")
+SUMMARY_COLUMNS = ("uid", "section_name", "kind", "note", "amount_value", "currency", "day")
+
+
+def _by_section(mapping):
+    return Case(
+        *[When(section=section, then=Value(mapping(section))) for section in SUMMARY_SECTIONS],
+        output_field=CharField(),
+    )
+
+
+def _summary_part(queryset, kind, prefix, section_name, user_field, date_field, amount=None, currency=None):
+    """
+    Bitta manbani umumiy ustunlarga keltiradi. Annotatsiyalar bir xil tartibda qo'shiladi,
+    shunda UNION ALL dagi ustunlar mos keladi.
+    """
+    day = F(date_field) if date_field == "date" else TruncDate(date_field)
+    return queryset.annotate(**{
+        "uid": Concat(prefix, Cast("id", CharField()), output_field=CharField()),
+        "section_name": section_name,
+        "kind": Value(kind, output_field=CharField()),
+        "note": F("description"),
+        "amount_value": amount if amount is not None else F("amount"),
+        "currency": currency if currency is not None else F("currency_type"),
+        "day": ExpressionWrapper(day, output_field=DateField()),
+    }).values(*SUMMARY_COLUMNS).order_by()
+
+
+def summary_parts(start_date, end_date, users):
+    """
+    get_summary manbalari, har biri (uid, section_name, kind, note, amount_value, currency, day) ustunlari bilan.
+    """
+    date_range = (start_date, end_date)
+    factory_name = Value(SUMMARY_SECTIONS["factory"][1], output_field=CharField())
+    sale_total = Coalesce(
+        Subquery(SaleItem.objects.filter(sale=OuterRef("pk")).order_by()
+                 .values("sale").annotate(total=Sum("amount")).values("total")),
+        Value(0.0), output_field=FloatField(),
+    )
+
+    parts = [
+        _summary_part(RawMaterialHistory.objects.filter(creator__in=users, date__range=date_range),
+                      "outcome", Value("FA-RM-"), factory_name, "creator", "date"),
+        _summary_part(WorkerSalaryPayment.objects.filter(creator__in=users, date__range=date_range),
+                      "outcome", Value("FA-SP-"), factory_name, "creator", "date"),
+        _summary_part(Sale.objects.filter(creator__in=users, date__range=date_range),
+                      "income", Value("FA-SL-"), factory_name, "creator", "date",
+                      amount=sale_total, currency=Value("UZS", output_field=CharField())),
+        _summary_part(GardenSalaryPayment.objects.filter(creator__in=users, created_at__range=date_range),
+                      "outcome", Value("GA-SP-"), Value(SUMMARY_SECTIONS["garden"][1], output_field=CharField()),
+                      "creator", "created_at"),
+        _summary_part(CarExpense.objects.filter(creator__in=users, date__range=date_range),
+                      "outcome", Value("LO-CE-"), Value(SUMMARY_SECTIONS["logistic"][1], output_field=CharField()),
+                      "creator", "date"),
+        _summary_part(LogisticSalaryPayment.objects.filter(creator__in=users, date__range=date_range),
+                      "outcome", Value("LO-SP-"), Value(SUMMARY_SECTIONS["logistic"][1], output_field=CharField()),
+                      "creator", "date"),
+    ]
+    for model, kind, suffix in ((Expense, "outcome", "EX"), (Income, "income", "IN")):
+        queryset = model.objects.filter(user__in=users, section__in=SUMMARY_SECTIONS, created_at__range=date_range)
+        parts.append(_summary_part(
+            queryset, kind, _by_section(lambda section: f"{SUMMARY_SECTIONS[section][0]}-{suffix}-"),
+            _by_section(lambda section: SUMMARY_SECTIONS[section][1]), "user", "created_at",
+        ))
+    return parts
 
 
-def get_summary(start_date, end_date, user:list):
-    transactions = {
-        "total_income": 0.0,
-        "total_outcome": 0.0,
-        "incomes_list": [],
-        "outcomes_list": []
-    }
-
-    ###### Factory #######
-    raw_material_objects = RawMaterialHistory.objects.filter(creator__in=user, date__range=(start_date, end_date))
-    for obj in raw_material_objects:
-        unique_id = f"FA-RM-{obj.id}"
-        transactions["outcomes_list"].append({
-            "id": unique_id,
-            "section": "Корзинка цех",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'curren cy_type', 'UZS'),
-            "date": obj.date,
-        })
-        transactions["total_outcome"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-    worker_salary = WorkerSalaryPayment.objects.filter(creator__in=user, date__range=(start_date, end_date))
-    for obj in worker_salary:
-        unique_id = f"FA-SP-{obj.id}"
-        transactions["outcomes_list"].append({
-            "id": unique_id,
-            "section": "Корзинка цех",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.date,
-        })
-        transactions["total_outcome"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-
-    sales = Sale.objects.filter(creator__in=user, date__range=(start_date, end_date))
-    for obj in sales:
-        unique_id = f"FA-SL-{obj.id}"
-        transactions["incomes_list"].append({
-            "id": unique_id,
-            "section": "Корзинка цех",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.date,
-        })
-        transactions["total_income"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-    expenses = Expense.objects.filter(user__in=user, section='factory',
-                                      created_at__range=(start_date, end_date)).select_related('user')
-    for obj in expenses:
-        unique_id = f"FA-EX-{obj.id}"
-        transactions["outcomes_list"].append({
-            "id": unique_id,
-            "section": "Корзинка цех",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.created_at.date(),
-        })
-        transactions["total_outcome"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-    incomes = Income.objects.filter(user__in=user, section='factory',
-                                    created_at__range=(start_date, end_date)).select_related('user')
-    for obj in incomes:
-        unique_id = f"FA-IN-{obj.id}"
-        transactions["incomes_list"].append({
-            "id": unique_id,
-            "section": "Корзинка цех",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.created_at.date(),
-        })
-        transactions["total_income"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-    ####### Fridge #############
-
-    expenses = Expense.objects.filter(user__in=user, section='fridge',
-                                      created_at__range=(start_date, end_date)).select_related('user')
-    for obj in expenses:
-        unique_id = f"FR-EX-{obj.id}"
-        transactions["outcomes_list"].append({
-            "id": unique_id,
-            "section": "Холодилник",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.created_at.date(),
-        })
-        transactions["total_outcome"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-    incomes = Income.objects.filter(user__in=user, section='fridge',
-                                    created_at__range=(start_date, end_date)).select_related('user')
-    for obj in incomes:
-        unique_id = f"FR-IN-{obj.id}"
-        transactions["incomes_list"].append({
-            "id": unique_id,
-            "section": "Холодилник",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.created_at.date(),
-        })
-        transactions["total_income"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-    ######## Garden ###########
-
-    gardener_salary = GardenSalaryPayment.objects.filter(creator__in=user, created_at__range=(start_date, end_date))
-    for obj in gardener_salary:
-        unique_id = f"GA-SP-{obj.id}"
-        transactions["outcomes_list"].append({
-            "id": unique_id,
-            "section": "Боғ",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.created_at.date(),
-        })
-        transactions["total_outcome"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-
-    expenses = Expense.objects.filter(user__in=user, section='garden',
-                                      created_at__range=(start_date, end_date)).select_related('user')
-    for obj in expenses:
-        unique_id = f"GA-EX-{obj.id}"
-        transactions["outcomes_list"].append({
-            "id": unique_id,
-            "section": "Боғ",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.created_at.date(),
-        })
-        transactions["total_outcome"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-    incomes = Income.objects.filter(user__in=user, section='garden',
-                                    created_at__range=(start_date, end_date)).select_related('user')
-    for obj in incomes:
-        unique_id = f"GA-IN-{obj.id}"
-        transactions["incomes_list"].append({
-            "id": unique_id,
-            "section": "Боғ",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.created_at.date(),
-        })
-        transactions["total_income"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-
-    ###### Logistic ###########
-
-    car_expenses = CarExpense.objects.filter(creator__in=user, date__range=(start_date, end_date))
-    for obj in car_expenses:
-        unique_id = f"LO-CE-{obj.id}"
-        transactions["outcomes_list"].append({
-            "id": unique_id,
-            "section": "Логистика",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.date,
-        })
-        transactions["total_outcome"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-
-    driver_salary = LogisticSalaryPayment.objects.filter(creator__in=user, date__range=(start_date, end_date))
-    for obj in driver_salary:
-        unique_id = f"LO-SP-{obj.id}"
-        transactions["outcomes_list"].append({
-            "id": unique_id,
-            "section": "Логистика",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.date,
-        })
-        transactions["total_outcome"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-
-    expenses = Expense.objects.filter(user__in=user, section='logistic',
-                                      created_at__range=(start_date, end_date)).select_related('user')
-    for obj in expenses:
-        unique_id = f"LO-EX-{obj.id}"
-        transactions["outcomes_list"].append({
-            "id": unique_id,
-            "section": "Логистика",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.created_at.date(),
-        })
-        transactions["total_outcome"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-    incomes = Income.objects.filter(user__in=user, section='logistic',
-                                    created_at__range=(start_date, end_date)).select_related('user')
-    for obj in incomes:
-        unique_id = f"LO-IN-{obj.id}"
-        transactions["incomes_list"].append({
-            "id": unique_id,
-            "section": "Логистика",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.created_at.date(),
-        })
-        transactions["total_income"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-
-
-    # transit_expenses = TransitExpense.objects.filter(creator__in=user, created_at__range=(start_date, end_date))
-    # for obj in transit_expenses:
-    #     unique_id = f"LO-TE-{obj.id}"
-    #     transactions["outcomes_list"].append({
-    #         "id": unique_id,
-    #         "section": "Логистика",
-    #         "reason": getattr(obj, 'description', 'No description'),
-    #         "amount": float(getattr(obj, 'amount', 0.0)),
-    #         "currency_type": getattr(obj, 'currency_type', 'UZS'),
-    #         "updated_at": obj.updated_at if hasattr(obj, 'updated_at') else obj.created_at,
-    #         "created_at": obj.created_at,
-    #     })
-    #
-    #
-    # transit_incomes = TransitIncome.objects.filter(creator__in=user, created_at__range=(start_date, end_date))
-    # for obj in transit_incomes:
-    #     unique_id = f"LO-TI-{obj.id}"
-    #     transactions["incomes_list"].append({
-    #         "id": unique_id,
-    #         "section": "Логистика",
-    #         "reason": getattr(obj, 'description', 'No description'),
-    #         "amount": float(getattr(obj, 'amount', 0.0)),
-    #         "currency_type": getattr(obj, 'currency_type', 'UZS'),
-    #         "updated_at": obj.updated_at if hasattr(obj, 'updated_at') else obj.created_at,
-    #         "created_at": obj.created_at,
-    #     })
-
-
-    ######## Main ############
-
-    expenses = Expense.objects.filter(user__in=user, section='general', created_at__range=(start_date, end_date)).select_related('user')
-    for obj in expenses:
-        unique_id = f"MA-EX-{obj.id}"
-        transactions["outcomes_list"].append({
-            "id": unique_id,
-            "section": "Умумий",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.created_at.date(),
-        })
-        transactions["total_outcome"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-    incomes = Income.objects.filter(user__in=user, section='general', created_at__range=(start_date, end_date)).select_related('user')
-    for obj in incomes:
-        unique_id = f"MA-IN-{obj.id}"
-        transactions["incomes_list"].append({
-            "id": unique_id,
-            "section": "Умумий",
-            "reason": getattr(obj, 'description', 'No description'),
-            "amount": float(getattr(obj, 'amount', 0.0)),
-            "currency_type": getattr(obj, 'currency_type', 'UZS'),
-            "date": obj.created_at.date(),
-        })
-        transactions["total_income"] += convert_currency(obj.currency_type, "UZS", obj.amount)
-
-
-    return transactions
-
+def summary_queryset(start_date, end_date, users):
+    """
+    get_summary manbalarining barchasi bitta UNION ALL so'rovida.
+    """
+    parts = summary_parts(start_date, end_date, users)
+    return parts[0].union(*parts[1:], all=True)
 
 
+def encode_summary_cursor(day, uid):
+    return encode_cursor(_as_date(day).isoformat(), uid)
 
 
+def decode_summary_cursor(cursor):
+    try:
+        day, uid = decode_cursor(cursor)
+        day = date.fromisoformat(day)
+    except (ValueError, TypeError):
+        raise ValueError("Noto'g'ri cursor")
+    return day, str(uid)
+
+
+def _summary_order(row):
+    # ORDER BY day DESC, uid bilan bir xil tartib
+    return -_as_date(row["day"]).toordinal(), row["uid"]
+
+
+def summary_page(start_date, end_date, users, cursor=None, limit=50):
+    """
+    Kirim va chiqimlarning (kun kamayish, uid) tartibidagi umumiy oqimidan bitta sahifa.
+    Har bir manbadan cursor dan keyingi limit + 1 ta qator tartiblangan holda o'qiladi va
+    heapq.merge bilan birlashtiriladi, shuning uchun sahifa narxi davr uzunligiga bog'liq emas.
+    Qaytaradi: (qatorlar, keyingi sahifa cursori yoki None)
+    """
+    parts = summary_parts(start_date, end_date, users)
+    if cursor:
+        day, uid = decode_summary_cursor(cursor)
+        parts = [part.filter(Q(day__lt=day) | Q(day=day, uid__gt=uid)) for part in parts]
+    streams = [part.order_by("-day", "uid")[:limit + 1] for part in parts]
+    rows = list(islice(heapq.merge(*streams, key=_summary_order), limit + 1))
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_summary_cursor(rows[-1]["day"], rows[-1]["uid"])
+    return rows, next_cursor
+
+
+def summary_totals(start_date, end_date, users, target="UZS"):
+    """
+    get_summary manbalari bo'yicha kirim/chiqim jami, TransactionRollup ning kunlik qatorlaridan.
+    """
+    return rollup.totals(
+        start_date, end_date,
+        Q(source__in=SUMMARY_SOURCES) | Q(source__in=("expense", "income"), section__in=SUMMARY_SECTIONS),
+        target=target, creator_id__in=[user.pk for user in users],
+    )
+
+
+def summary_rows(start_date, end_date, users):
+    """
+    get_summary qatorlari (kun, "incomes"|"outcomes", qator) ko'rinishida, kun kamayish tartibida.
+    """
+    for row in summary_queryset(start_date, end_date, users).order_by("-day", "uid"):
+        yield _as_date(row["day"]), f"{row['kind']}s", summary_item(row)
+
+
+def summary_item(row):
+    return {
+        "id": row["uid"],
+        "section": row["section_name"],
+        "reason": row["note"],
+        "amount": row["amount_value"] or 0.0,
+        "currency_type": row["currency"],
+        "date": _as_date(row["day"]),
+    }
 
 
+def get_summary(start_date, end_date, user:list):
+    totals = summary_totals(start_date, end_date, user)
+    transactions = {
+        "total_income": totals["income"],
+        "total_outcome": totals["outcome"],
+        "incomes_list": [],
+        "outcomes_list": []
+    }
 
+    for _, kind, row in summary_rows(start_date, end_date, user):
+        transactions[f"{kind}_list"].append(row)
+    return transactions
@@ -1,3 +1,6 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse
 from django.utils.dateparse import parse_date
 from django.shortcuts import redirect
 from django.core.exceptions import ObjectDoesNotExist
@@ -12,8 +15,11 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from datetime import timedelta
 from apps.users.permissions import IsCEO, IsAdmin
-from apps.common.models import CurrencyRate
-from apps.common.utils import convert_currency
+from apps.common.filters import DateRangeFilterBackend
+from apps.common.models import CurrencyRate, SECTION_CHOICES
+from apps.common.services.logging import Telegram
+from apps.common.services import approval_queue, export, rollup, summary_cache
+from apps.common.utils import convert_currency, convert_currency_on, convert_values
 from .models import Acquaintance, MoneyCirculation, Expense, Income, DailyRemainder, TransactionToAdmin, \
     TransactionToSection, BankAccount, AccountHistory, ACCOUNT_HISTORY_TYPE_CHOICES
 from .serializers import AcquaintanceSerializer, AcquaintanceDetailSerializer, MoneyCirculationSerializer, \
@@ -22,7 +28,9 @@ from .serializers import AcquaintanceSerializer, AcquaintanceDetailSerializer, M
     TransactionToAdminCreateSerializer, TransactionToSectionSerializer, \
     CurrencyRateSerializer, TransactionHistorySerializer, MoneyCirculationPostSerializer, BankAccountsSerializer, \
     AccountHistoryGetSerializer, AccountHistoryPostSerializer
-from .utils import get_remainder_data, calculate_remainder, verification_transaction, verify_transaction, get_summary
+from . import exports
+from .utils import get_remainder_data, calculate_remainder, verification_transaction, verify_transaction, summary_rows, \
+    summary_page, summary_item, summary_totals, bulk_verify_transactions, verification_page
 
 
 class CurrencyRateListCreateView(ListCreateAPIView):
@@ -59,34 +67,13 @@ class AcquaintanceRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 class GiveMoneyListCreateView(ListCreateAPIView):
     queryset = MoneyCirculation.objects.all()
     permission_classes = [IsCEO]
+    filter_backends = [DateRangeFilterBackend]
+    keyset_field = "-created_at"
 
     def get_queryset(self):
-        self.queryset = self.queryset.filter(type='give')
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__gte=start_date)
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__lte=end_date)
-        return self.queryset
+        return self.queryset.filter(type='give')
 
     @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-        ],
         responses={200: MoneyCirculationSerializer(many=True)}
     )
     def get(self, request, *args, **kwargs):
@@ -104,34 +91,13 @@ class GiveMoneyListCreateView(ListCreateAPIView):
 class GetMoneyListCreateView(ListCreateAPIView):
     queryset = MoneyCirculation.objects.all()
     permission_classes = [IsCEO]
+    filter_backends = [DateRangeFilterBackend]
+    keyset_field = "-created_at"
 
     def get_queryset(self):
-        self.queryset = self.queryset.filter(type='get')
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__gte=start_date)
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__lte=end_date)
-        return self.queryset
+        return self.queryset.filter(type='get')
 
     @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-        ],
         responses={200: MoneyCirculationSerializer(many=True)}
     )
     def get(self, request, *args, **kwargs):
@@ -156,34 +122,13 @@ class GeneralExpenseListCreateView(ListCreateAPIView):
     queryset = Expense.objects.all()
     serializer_class = ExpenseSerializer
     permission_classes = [IsCEO]
+    filter_backends = [DateRangeFilterBackend]
+    keyset_field = "-created_at"
 
     def get_queryset(self):
-        self.queryset = self.queryset.filter(section="general")
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__gte=start_date)
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            self.queryset = self.queryset.filter(created_at__date__lte=end_date)
-        return self.queryset
+        return self.queryset.filter(section="general")
 
     @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-        ],
         responses={200: ExpenseSerializer(many=True)}
     )
     def get(self, request, *args, **kwargs):
@@ -205,34 +150,14 @@ class GeneralExpenseRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 class GeneralIncomeListCreateView(ListCreateAPIView):
     serializer_class = IncomeSerializer
     permission_classes = [IsCEO]
+    filter_backends = [DateRangeFilterBackend]
+    keyset_field = "-created_at"
 
     def get_queryset(self):
         queryset = Income.objects.filter(section="general")
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        if start_date:
-            if not parse_date(start_date):
-                raise ValidationError({"start_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__gte=start_date)
-        if end_date:
-            if not parse_date(end_date):
-                raise ValidationError({"end_date": "Invalid date format. Use YYYY-MM-DD."})
-            queryset = queryset.filter(created_at__date__lte=end_date)
         return queryset
 
     @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-        ],
         responses={200: IncomeSerializer(many=True)}
     )
     def get(self, request, *args, **kwargs):
@@ -253,33 +178,12 @@ class GeneralIncomeRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 
 class TransactionToAdminListCreateView(ListCreateAPIView):
     permission_classes = [IsCEO]
+    filter_backends = [DateRangeFilterBackend]
 
     def get_queryset(self):
         queryset = TransactionToAdmin.objects.all()
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        if start_date:
-            queryset = queryset.filter(created_at__date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(created_at__date__lte=end_date)
-
         return queryset
-    @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-        ]
-    )
-    def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return TransactionToAdminSerializer
@@ -299,16 +203,11 @@ class TransactionToAdminDetailView(RetrieveUpdateDestroyAPIView):
 class TransactionToSectionListCreateView(ListCreateAPIView):
     serializer_class = TransactionToSectionSerializer
     permission_classes = [IsCEO | IsAdmin]
+    filter_backends = [DateRangeFilterBackend]
     def get_queryset(self):
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
         section = self.request.query_params.get('section')
         is_for = self.request.query_params.get('is_for')
         queryset = TransactionToSection.objects.filter(type='give')
-        if start_date:
-            queryset = queryset.filter(created_at__date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(created_at__date__lte=end_date)
         if is_for is None:
             raise ValidationError({"error": "'is_for' is required"})
         if is_for == "ceo":
@@ -333,16 +232,6 @@ class TransactionToSectionListCreateView(ListCreateAPIView):
         return queryset
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'section', openapi.IN_QUERY,
                 description="Section to filter by. Options: 'logistic', 'fridge', 'garden', 'factory'",
@@ -374,16 +263,11 @@ class TransactionToSectionDetailView(RetrieveUpdateDestroyAPIView):
 class TransactionFromSectionListCreateView(ListCreateAPIView):
     serializer_class = TransactionToSectionSerializer
     permission_classes = [IsCEO | IsAdmin]
+    filter_backends = [DateRangeFilterBackend]
     def get_queryset(self):
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
         section = self.request.query_params.get('section')
         is_for = self.request.query_params.get('is_for')
         queryset = TransactionToSection.objects.filter(type='get')
-        if start_date:
-            queryset = queryset.filter(created_at__date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(created_at__date__lte=end_date)
         if is_for is None:
             raise ValidationError({"error": "'is_for' is required"})
         if is_for == "ceo":
@@ -408,16 +292,6 @@ class TransactionFromSectionListCreateView(ListCreateAPIView):
         return queryset
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'section', openapi.IN_QUERY,
                 description="Section to filter by. Options: 'logistic', 'fridge', 'garden', 'factory'",
@@ -462,19 +336,11 @@ class BankAccountsRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 
 class AccountHistoryListCreateView(ListCreateAPIView):
     permission_classes = [IsCEO]
+    filter_backends = [DateRangeFilterBackend]
+    keyset_field = "-date"
 
     @swagger_auto_schema(
         manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
             openapi.Parameter(
                 'transaction_type', openapi.IN_QUERY,
                 description="Filter by transaction type (income or outcome)",
@@ -488,15 +354,9 @@ class AccountHistoryListCreateView(ListCreateAPIView):
         return super().get(request, *args, **kwargs)
 
     def get_queryset(self):
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
         transaction_type = self.request.query_params.get('transaction_type')
 
         queryset = AccountHistory.objects.all()
-        if start_date:
-            queryset = queryset.filter(created_at__date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(created_at__date__lte=end_date)
 
         if transaction_type is not None and transaction_type in ["income", "outcome"]:
             queryset = queryset.filter(transaction_type=transaction_type)
@@ -526,35 +386,15 @@ class AccountHistoryRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 class DailyRemainderView(ListAPIView):
     serializer_class = DailyRemainderSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [DateRangeFilterBackend]
+    date_range_field = "date"
+    date_range_default_days = 30
 
     def get_queryset(self):
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-
-        queryset = DailyRemainder.objects.filter(user=self.request.user)
-        if start_date or end_date:
-            if start_date:
-                queryset = queryset.filter(created_at__date__gte=start_date)
-            if end_date:
-                queryset = queryset.filter(created_at__date__lte=end_date)
-        else:
-            queryset = queryset[:30]
-        queryset = queryset.distinct('created_at__date').order_by('created_at__date')
-        return queryset
+        # (user, date) unique: kuniga bitta qoldiq, distinct kerak emas
+        return DailyRemainder.objects.filter(user=self.request.user).order_by('date')
 
     @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter(
-                'start_date', openapi.IN_QUERY,
-                description="Start date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-            openapi.Parameter(
-                'end_date', openapi.IN_QUERY,
-                description="End date for filtering (YYYY-MM-DD)",
-                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
-            ),
-        ],
         responses={200: IncomeSerializer(many=True)}
     )
     def get(self, request, *args, **kwargs):
@@ -562,6 +402,10 @@ class DailyRemainderView(ListAPIView):
 
 
 ###################################################
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 500
+
+
 class MixedHistoryView(APIView):
     @swagger_auto_schema(
         manual_parameters=[
@@ -575,6 +419,16 @@ class MixedHistoryView(APIView):
                 description="End date for filtering (YYYY-MM-DD)",
                 type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
             ),
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY,
+                description="Oldingi javobdagi next_cursor. cursor yoki page_size berilsa javob sahifalanadi",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY,
+                description=f"Sahifadagi kirim va chiqimlar soni (standart {HISTORY_PAGE_SIZE}, ko'pi bilan {HISTORY_MAX_PAGE_SIZE})",
+                type=openapi.TYPE_INTEGER
+            ),
         ],
         responses={200: MoneyCirculationSerializer(many=True)}
     )
@@ -606,15 +460,32 @@ class MixedHistoryView(APIView):
             )
 
         if end_date.date() == timezone.now().date():
-            balance = request.user.balance
+            balance = request.user.current_balance
         else:
-            remainder = DailyRemainder.objects.filter(user=request.user, created_at=(end_date + timedelta(days=1)))
-            balance = remainder.last().amount if remainder.exists() else 0
-
-
-
-        transactions_data = get_summary(start_date, end_date, [request.user])
-
+            remainder = DailyRemainder.objects.filter(user=request.user, date=end_date.date()).first()
+            balance = remainder.amount if remainder else 0
+
+
+
+        cursor = request.query_params.get('cursor')
+        page_size = request.query_params.get('page_size')
+        if cursor or page_size:
+            return self.paginated(request, start_date, end_date, cursor, page_size, balance)
+
+        rows = summary_cache.collect(
+            "mixed", request.user.pk, start_date.date(), end_date.date(),
+            lambda start, end: summary_rows(start, end, [request.user]),
+        )
+        _, total_income = convert_values(
+            (item['currency_type'], item['amount'], item['date']) for item in rows["incomes"])
+        _, total_outcome = convert_values(
+            (item['currency_type'], item['amount'], item['date']) for item in rows["outcomes"])
+        transactions_data = {
+            "total_income": total_income,
+            "total_outcome": total_outcome,
+            "incomes_list": rows["incomes"],
+            "outcomes_list": rows["outcomes"],
+        }
 
         return Response({
             'start_date': start_date_str,
@@ -626,18 +497,63 @@ class MixedHistoryView(APIView):
             },
             'total_income': {
                 'uzs': transactions_data["total_income"],
-                'usd': convert_currency("UZS", "USD", transactions_data["total_income"]),
-                'rub': convert_currency("UZS", "RUB", transactions_data["total_income"])
+                'usd': convert_currency_on("UZS", "USD", transactions_data["total_income"], end_date),
+                'rub': convert_currency_on("UZS", "RUB", transactions_data["total_income"], end_date)
             },
             'total_outcome': {
                 'uzs': transactions_data["total_outcome"],
-                'usd': convert_currency("UZS", "USD", transactions_data["total_outcome"]),
-                'rub': convert_currency("UZS", "RUB", transactions_data["total_outcome"])
+                'usd': convert_currency_on("UZS", "USD", transactions_data["total_outcome"], end_date),
+                'rub': convert_currency_on("UZS", "RUB", transactions_data["total_outcome"], end_date)
             },
             'incomes': MixedDataSerializer(transactions_data["incomes_list"], many=True).data,
             'outcomes': MixedDataSerializer(transactions_data["outcomes_list"], many=True).data,
         })
 
+    def paginated(self, request, start_date, end_date, cursor, page_size, balance):
+        try:
+            limit = min(int(page_size or HISTORY_PAGE_SIZE), HISTORY_MAX_PAGE_SIZE)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return Response({"error": "page_size must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            rows, next_cursor = summary_page(start_date, end_date, [request.user], cursor, limit)
+        except ValueError:
+            return Response({"error": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+        totals = summary_totals(start_date, end_date, [request.user])
+        page = {"income": [], "outcome": []}
+        for row in rows:
+            page[row["kind"]].append(summary_item(row))
+
+        return Response({
+            'start_date': start_date.strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d'),
+            'balance': {
+                'uzs': convert_currency(request.user.currency_type, "UZS", balance),
+                'usd': convert_currency(request.user.currency_type, "USD", balance),
+                'rub': convert_currency(request.user.currency_type, "RUB", balance)
+            },
+            'total_income': {
+                'uzs': totals["income"],
+                'usd': convert_currency_on("UZS", "USD", totals["income"], end_date),
+                'rub': convert_currency_on("UZS", "RUB", totals["income"], end_date)
+            },
+            'total_outcome': {
+                'uzs': totals["outcome"],
+                'usd': convert_currency_on("UZS", "USD", totals["outcome"], end_date),
+                'rub': convert_currency_on("UZS", "RUB", totals["outcome"], end_date)
+            },
+            'incomes': MixedDataSerializer(page["income"], many=True).data,
+            'outcomes': MixedDataSerializer(page["outcome"], many=True).data,
+            'next_cursor': next_cursor,
+        })
+
+
+QUEUE_PAGE_SIZE = 50
+QUEUE_MAX_PAGE_SIZE = 200
+
 
 class TransactionApprovalView(APIView):
     permission_classes = [IsCEO]
@@ -662,13 +578,19 @@ class TransactionApprovalView(APIView):
                 properties={
                     "message": openapi.Schema(type=openapi.TYPE_STRING,
                                               description="Tasdiqlash yoki bekor qilish xabari"),
+                    "total": openapi.Schema(type=openapi.TYPE_INTEGER,
+                                            description="Faqat 'ALL' uchun: o'zgartirilgan tranzaksiyalar soni"),
+                    "counts": openapi.Schema(type=openapi.TYPE_OBJECT,
+                                             description="Faqat 'ALL' uchun: tur bo'yicha soni"),
                 }
             )),
             400: "Serializer xatoligi",
             404: "Obyekt topilmadi",
             500: "Server xatoligi",
         },
-        operation_description="CEO tomonidan tranzaksiyani tasdiqlash yoki bekor qilish uchun POST so'rov."
+        operation_description="CEO tomonidan tranzaksiyani tasdiqlash yoki bekor qilish uchun POST so'rov. "
+                              "unique_id='ALL' da navbatdagi (ixtiyoriy section, start_date, end_date, creator "
+                              "bo'yicha filtrlangan) tranzaksiyalar bir nechta UPDATE bilan o'zgartiriladi."
     )
     def post(self, request, *args, **kwargs):
         serializer = TransactionVerifyActionSerializer(data=request.data)
@@ -679,8 +601,241 @@ class TransactionApprovalView(APIView):
         action = serializer.validated_data['action']
 
         if unique_id == "ALL":
-            for transaction in verification_transaction():
-                verify_transaction(transaction['unique_id'], action)
-            return Response({"message": "All transactions are successfully {}".format(action)})
+            counts = bulk_verify_transactions(
+                action,
+                section=serializer.validated_data.get('section'),
+                start_date=serializer.validated_data.get('start_date'),
+                end_date=serializer.validated_data.get('end_date'),
+                creator=serializer.validated_data.get('creator'),
+            )
+            total = sum(counts.values())
+            if total:
+                Telegram.send_log(f"{'✅ Тасдиқланди' if action == 'verify' else '❌ Бекор қилинди'}: {total} та транзакция")
+            return Response({
+                "message": "All transactions are successfully {}".format(action),
+                "total": total,
+                "counts": counts,
+            })
+
+        return Response({"message": verify_transaction(unique_id, action)})
+
+
+class ApprovalQueueView(APIView):
+    permission_classes = [IsCEO]
+
+    @swagger_auto_schema(
+        operation_description="Tasdiq kutayotgan tranzaksiyalar sahifalab (yangilari birinchi), "
+                              "javobda bo'limlar bo'yicha keshlangan sonlar ham bor.",
+        manual_parameters=[
+            openapi.Parameter(
+                'section', openapi.IN_QUERY, description="Bo'lim bo'yicha filter",
+                type=openapi.TYPE_STRING, enum=[section for section, _ in SECTION_CHOICES]
+            ),
+            openapi.Parameter('creator', openapi.IN_QUERY, description="Admin id si", type=openapi.TYPE_INTEGER),
+            openapi.Parameter(
+                'start_date', openapi.IN_QUERY,
+                description="Start date for filtering (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
+            ),
+            openapi.Parameter(
+                'end_date', openapi.IN_QUERY,
+                description="End date for filtering (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
+            ),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Oldingi javobdagi next_cursor",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY,
+                description=f"Sahifadagi yozuvlar soni (standart {QUEUE_PAGE_SIZE}, ko'pi bilan {QUEUE_MAX_PAGE_SIZE})",
+                type=openapi.TYPE_INTEGER
+            ),
+        ],
+        responses={200: TransactionVerifyDetailSerializer(many=True)}
+    )
+    def get(self, request):
+        params = request.query_params
+        try:
+            limit = min(int(params.get('page_size') or QUEUE_PAGE_SIZE), QUEUE_MAX_PAGE_SIZE)
+            creator = int(params['creator']) if params.get('creator') else None
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return Response({"error": "page_size and creator must be positive integers."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        filters = {'section': params.get('section'), 'creator': creator}
+        for name in ('start_date', 'end_date'):
+            if params.get(name):
+                filters[name] = parse_date(params[name])
+                if filters[name] is None:
+                    return Response({"error": "Invalid date format. Use YYYY-MM-DD."},
+                                    status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            rows, next_cursor = verification_page(params.get('cursor'), limit, **filters)
+        except ValueError:
+            return Response({"error": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+        counts = approval_queue.counts()
+        return Response({
+            'pending': {'total': sum(counts.values()), 'sections': counts},
+            'results': TransactionVerifyDetailSerializer(rows, many=True).data,
+            'next_cursor': next_cursor,
+        })
+
+
+class ApprovalCountsView(APIView):
+    permission_classes = [IsCEO]
+
+    @swagger_auto_schema(
+        operation_description="Tasdiq kutayotgan tranzaksiyalar soni (badge uchun), bo'limlar bo'yicha keshdan.",
+    )
+    def get(self, request):
+        counts = approval_queue.counts()
+        return Response({'total': sum(counts.values()), 'sections': counts})
+
 
-        return Response({"message": verify_transaction(unique_id, action)})
\ No newline at end of file
+class RollupSummaryView(APIView):
+    permission_classes = [IsCEO]
+
+    @swagger_auto_schema(
+        operation_description="Bo'limlar bo'yicha kunlik yoki oylik kirim/chiqim (UZS), TransactionRollup jadvalidan.",
+        manual_parameters=[
+            openapi.Parameter(
+                'start_date', openapi.IN_QUERY,
+                description="Start date for filtering (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
+            ),
+            openapi.Parameter(
+                'end_date', openapi.IN_QUERY,
+                description="End date for filtering (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
+            ),
+            openapi.Parameter(
+                'period', openapi.IN_QUERY,
+                description="day yoki month (month da to'liq oylar olinadi)",
+                type=openapi.TYPE_STRING, enum=list(rollup.PERIODS), default=rollup.DAY
+            ),
+            openapi.Parameter(
+                'section', openapi.IN_QUERY,
+                description="Bo'lim bo'yicha filter",
+                type=openapi.TYPE_STRING, enum=[section for section, _ in SECTION_CHOICES]
+            ),
+        ],
+    )
+    def get(self, request):
+        period = request.query_params.get('period', rollup.DAY)
+        if period not in rollup.PERIODS:
+            return Response({"error": f"period must be one of {rollup.PERIODS}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        today = timezone.localdate()
+        default_start = today - timedelta(days=30 if period == rollup.DAY else 365)
+        start_date = parse_date(request.query_params.get('start_date', '')) or default_start
+        end_date = parse_date(request.query_params.get('end_date', '')) or today
+        if end_date < start_date:
+            return Response({"error": "end_date cannot be before start_date."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        filters = {}
+        if request.query_params.get('section'):
+            filters['section'] = request.query_params['section']
+        results = rollup.series(start_date, end_date, period, ("section",), **filters)
+
+        return Response({
+            'period': period,
+            'start_date': rollup.period_start(start_date, period).strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d'),
+            'total_income': round(sum(row['income'] for row in results), 2),
+            'total_outcome': round(sum(row['outcome'] for row in results), 2),
+            'results': results,
+        })
+
+
+class ExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Ro'yxat yoki hisobotni CSV/XLSX fayl sifatida yuklab olish. Qatorlar bazadan bo'laklab o'qiladi va "
+            "oqim bilan yuboriladi. EXPORT_ASYNC_ROWS dan ko'p qatorli eksport Celery da tayyorlanadi: javob 202 "
+            "va job_id, fayl /mixed/export/jobs/<job_id>/ dan olinadi."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                'file_format', openapi.IN_QUERY, description="Fayl turi",
+                type=openapi.TYPE_STRING, enum=list(export.FORMATS), default="csv"
+            ),
+            openapi.Parameter(
+                'start_date', openapi.IN_QUERY,
+                description="Start date for filtering (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
+            ),
+            openapi.Parameter(
+                'end_date', openapi.IN_QUERY,
+                description="End date for filtering (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
+            ),
+            openapi.Parameter(
+                'section', openapi.IN_QUERY, description="Bo'lim bo'yicha filter (faqat CEO uchun)",
+                type=openapi.TYPE_STRING, enum=[section for section, _ in SECTION_CHOICES]
+            ),
+            openapi.Parameter(
+                'period', openapi.IN_QUERY, description="rollup eksporti uchun: day yoki month",
+                type=openapi.TYPE_STRING, enum=list(rollup.PERIODS)
+            ),
+        ],
+        responses={200: "Fayl", 202: "Eksport navbatga qo'yildi", 503: "Navbat ishlamayapti, keyinroq qayta urining"},
+    )
+    def get(self, request, name):
+        spec = exports.EXPORTS.get(name)
+        if spec is None:
+            return Response({"error": f"Unknown export. Use one of {tuple(exports.EXPORTS)}."},
+                            status=status.HTTP_404_NOT_FOUND)
+        if not exports.allowed(spec, request.user):
+            return Response({"error": "You do not have permission to perform this action."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in export.FORMATS:
+            return Response({"error": f"file_format must be one of {export.FORMATS}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if file_format == "xlsx" and export.openpyxl is None:
+            return Response({"error": "xlsx eksport uchun openpyxl o'rnatilmagan, csv dan foydalaning."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            params = exports.parse_params(request.query_params, request.user)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = spec.rows(params, request.user)
+        count = exports.row_count(rows)
+        if count > settings.EXPORT_ASYNC_ROWS:
+            job_id = exports.start_job(name, file_format, params, request.user)
+            if job_id is None:
+                # Katta eksport web workerda tayyorlanmaydi
+                return Response({"error": "Export queue is unavailable, please retry later."},
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "60"})
+            return Response({"job_id": job_id, "status": "pending", "rows": count},
+                            status=status.HTTP_202_ACCEPTED)
+
+        return export.response(name, file_format, spec.columns, exports.stream(rows))
+
+
+class ExportJobView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Celery dagi eksport holati; tayyor bo'lsa fayl qaytariladi.",
+        responses={200: "Fayl yoki {status: pending|failed}", 404: "Topilmadi"},
+    )
+    def get(self, request, job_id):
+        job = exports.get_job(job_id)
+        if job is None or job.get("user") != request.user.pk:
+            return Response({"error": "Export not found or expired."}, status=status.HTTP_404_NOT_FOUND)
+        if job["status"] != "done":
+            return Response({"job_id": job_id, "status": job["status"], "error": job.get("error")})
+        return FileResponse(default_storage.open(job["path"]), as_attachment=True,
+                            filename=export.filename(job["name"], job["format"]),
+                            content_type=export.CONTENT_TYPES[job["format"]])
@@ -33,4 +33,11 @@ class User(AbstractUser):
     def __str__(self):
         return self.get_full_name() if self.get_full_name() else self.username
 
+    @property
+    def current_balance(self):
+        # balance maydoni fold jarayonida yangilanadi, hali qo'shilmagan yozuvlar ledgerdan olinadi
+        from apps.ledger.services import current_balance
+
+        return current_balance(self)
+
 
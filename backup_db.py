@@ -2,10 +2,11 @@ import os
 from pathlib import Path
 import subprocess
 from datetime import datetime
-import requests
 import environ
 import shutil
 
+from apps.common.services.http import http_client
+
 BASE_DIR = Path(__file__).resolve().parent
 
 env = environ.Env()
@@ -71,7 +72,8 @@ def send_to_telegram(backup_path):
         with open(backup_path, "rb") as f:
             files = {"document": (os.path.basename(backup_path), f)}
             data = {"chat_id": BACKUP_CHANNEL_ID, "caption": f"Database backup: {os.path.basename(backup_path)}"}
-            response = requests.post(url, files=files, data=data)
+            # Katta fayl yuklanishi uchun read timeout uzunroq
+            response = http_client.post(url, files=files, data=data, timeout=(3.05, 300))
 
         if response.status_code == 200:
             print(f"Backup sent to Telegram channel: {backup_path}")
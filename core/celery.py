@@ -18,9 +18,25 @@ def debug_task():
 
 app.conf.beat_schedule = {
     'update_currency_every_midnight': {
-        'task': 'common.tasks.fetch_currency_rate',
+        'task': 'apps.common.tasks.fetch_currency_rate',
         'schedule': crontab(hour=0, minute=0),
     },
+    'retry_telegram_outbox_every_minute': {
+        'task': 'apps.common.tasks.retry_telegram_outbox',
+        'schedule': crontab(minute='*'),
+    },
+    'close_day_after_midnight': {
+        'task': 'apps.ledger.tasks.close_day',
+        'schedule': crontab(hour=0, minute=5),
+    },
+    'fold_ledger_balances_every_minute': {
+        'task': 'apps.ledger.tasks.fold_ledger_balances',
+        'schedule': crontab(minute='*'),
+    },
+    'purge_exports_every_hour': {
+        'task': 'apps.main.tasks.purge_exports',
+        'schedule': crontab(minute=30),
+    },
 }
 
 
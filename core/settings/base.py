@@ -58,6 +58,7 @@ CUSTOM_APPS = [
     'apps.factory',
     'apps.fridge',
     'apps.main',
+    'apps.ledger',
 ]
 
 THIRD_PARTY_APPS = [
@@ -78,7 +79,7 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_FILTER_BACKENDS": ("django_filters.rest_framework.DjangoFilterBackend",),
     "DEFAULT_RENDERER_CLASSES": ("rest_framework.renderers.JSONRenderer",),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    "DEFAULT_PAGINATION_CLASS": "apps.common.pagination.KeysetPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_THROTTLE_RATES": {"anon": "10/second", "user": "10/second"},
     # "EXCEPTION_HANDLER": "utils.exceptionhandler.custom_exception_handler",
@@ -91,7 +92,12 @@ SWAGGER_SETTINGS = {
             'name': 'Authorization',
             'in': 'header'
       }
-   }
+   },
+   'DEFAULT_FILTER_INSPECTORS': [
+      'apps.common.inspectors.DateRangeFilterInspector',
+      'drf_yasg.inspectors.DrfAPICompatInspector',
+      'drf_yasg.inspectors.CoreAPICompatInspector',
+   ],
 }
 
 SIMPLE_JWT = {
@@ -181,6 +187,30 @@ CACHES = {
     }
 }
 
+# Har bir jarayon valyuta kurslari versiyasini necha soniyada bir tekshiradi
+CURRENCY_RATES_CHECK_INTERVAL = env.int("CURRENCY_RATES_CHECK_INTERVAL", default=5)
+
+# Telegram chatiga yuborish cheklovi: soniyasiga token va bucket hajmi (guruh uchun ~20 ta xabar/daqiqa)
+TELEGRAM_CHAT_RATE = env.float("TELEGRAM_CHAT_RATE", default=20 / 60)
+TELEGRAM_CHAT_BURST = env.int("TELEGRAM_CHAT_BURST", default=5)
+
+# Summary endpointlari uchun kunlik keshlangan qismlar: yashash muddati (soniya) va
+# keshdan o'qiladigan eng uzun davr (kun), undan uzun davrlar to'g'ridan-to'g'ri hisoblanadi
+SUMMARY_CACHE_TIMEOUT = env.int("SUMMARY_CACHE_TIMEOUT", default=60 * 60 * 24)
+SUMMARY_CACHE_MAX_DAYS = env.int("SUMMARY_CACHE_MAX_DAYS", default=92)
+
+# Eksport: shundan ko'p qatorli eksportlar Celery da faylga yoziladi, iterator() bo'lagi
+# va tayyor faylning saqlanish muddati (soniya)
+EXPORT_ASYNC_ROWS = env.int("EXPORT_ASYNC_ROWS", default=20000)
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", default=2000)
+EXPORT_JOB_TIMEOUT = env.int("EXPORT_JOB_TIMEOUT", default=60 * 60 * 24)
+
+# Tasdiq navbati hisoblagichlari keshda farq bilan yangilanadi, shu muddatdan keyin bazadan qayta hisoblanadi
+APPROVAL_COUNTS_TIMEOUT = env.int("APPROVAL_COUNTS_TIMEOUT", default=60 * 60)
+
+# Putyovka chop etish shabloni (.xlsx, kataklarda {number}, {driver_1}, {car} ...), berilmasa standart shakl
+WAYBILL_TEMPLATE = env.str("WAYBILL_TEMPLATE", default=None)
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 